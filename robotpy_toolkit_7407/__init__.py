@@ -2,5 +2,5 @@ __version__ = '0.5.11'
 
 from robotpy_toolkit_7407.subsystem import Subsystem
 from robotpy_toolkit_7407.command import BasicCommand, SubsystemCommand
-from robotpy_toolkit_7407.motor import Motor, PIDMotor, EncoderMotor
+from robotpy_toolkit_7407.motor import Motor, PIDMotor, EncoderMotor, MotorGroup, GainProfile
 import robotpy_toolkit_7407.unum
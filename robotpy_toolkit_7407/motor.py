@@ -1,13 +1,60 @@
-from robotpy_toolkit_7407.utils.units import radians, radians_per_second
+from dataclasses import dataclass
+from typing import Optional
+
+from robotpy_toolkit_7407.utils.cycle import CycleCache
+from robotpy_toolkit_7407.utils.units import radians, radians_per_second, radians_per_second_squared, volts
 
 
 class Motor:
+    _output_stage = None
+    follow_family: str | None = None  # Motors of the same family can follow each other in hardware
+
     def init(self): ...
 
     def set_raw_output(self, x: float): ...
 
+    def follow(self, leader: "Motor"): ...
+
+    def set_status_frame_periods(self, general_ms: int | None = None, feedback_ms: int | None = None): ...
+
+    def minimize_status_frames(self): ...
+
+    def read_health(self) -> tuple[float, float, float, int, bool]:
+        """
+        Read the motor's health from the controller. Readings the controller does not provide are NaN.
+
+        Returns:
+            (temperature in celsius, supply current in amps, stator current in amps, fault bitfield, brownout fault)
+        """
+        ...
+
+    def set_output_stage(self, stage):
+        """
+        Buffer this motor's setpoints in an OutputStage instead of sending them immediately. Pass None to send
+        setpoints immediately again.
+        """
+        if self._output_stage is not None:
+            self._output_stage.forget(self)
+        self._output_stage = stage
 
-class EncoderMotor(Motor):
+    def _write(self, mode, *args):
+        if self._output_stage is None:
+            self._transmit(mode, *args)
+        else:
+            self._output_stage.write(self, mode, *args)
+
+    def _transmit(self, mode, *args): ...
+
+    def _output_tolerance(self, mode, epsilon: float) -> tuple[float, ...]:
+        """
+        Convert an OutputStage epsilon, in the units this motor's setters take, to the largest suppressed change of
+        each _transmit argument, in the units sent to the controller. By default the arguments are (setpoint,
+        feedforward, slot) and are sent in the setters' units.
+        """
+        return epsilon, epsilon, 0
+
+
+class EncoderMotor(Motor, CycleCache):
     def get_sensor_position(self) -> radians: ...
 
     def get_sensor_velocity(self) -> radians_per_second: ...
@@ -16,6 +63,246 @@ class EncoderMotor(Motor):
 
 
 class PIDMotor(EncoderMotor):
-    def set_target_position(self, pos: radians): ...
+    def set_target_position(self, pos: radians, arbitrary_feedforward: volts = 0, slot: int | str = 0): ...
+
+    def set_target_velocity(self, vel: radians_per_second, arbitrary_feedforward: volts | None = None,
+                            accel: radians_per_second_squared = 0, slot: int | str = 0): ...
+
+
+@dataclass
+class GainProfile:
+    """
+    Set of closed loop gains preloaded into a motor controller slot, selected per setpoint without re-sending
+    configs. Units are those of the top-level gains of the config it belongs to.
+
+    Args:
+        k_P: Proportional gain
+        k_I: Integral gain
+        k_D: Derivative gain
+        k_F: Feedforward gain
+        integral_zone: Error beyond which the integral accumulator is reset
+        k_S: Static feedforward in volts
+        k_V: Velocity feedforward in volts per unit per second
+        k_A: Acceleration feedforward in volts per unit per second squared
+    """
+    k_P: Optional[float] = None
+    k_I: Optional[float] = None
+    k_D: Optional[float] = None
+    k_F: Optional[float] = None
+    integral_zone: Optional[float] = None
+    k_S: Optional[volts] = None
+    k_V: Optional[float] = None
+    k_A: Optional[float] = None
+
+
+k_max_gain_profiles = 3  # Slot 0 holds the config's top-level gains, slots 1-3 the named profiles
+
+
+def gain_profile_slots(config) -> dict[str, int]:
+    """
+    Get the controller slot of each named gain profile of a motor config. Profiles fill slots 1 to 3 in the order
+    they are listed.
+
+    Args:
+        config: TalonConfig/SparkMaxConfig, or None
+
+    Returns:
+        dict[str, int]: Slot index keyed by profile name
+    """
+    if config is None or not config.gain_profiles:
+        return {}
+    if len(config.gain_profiles) > k_max_gain_profiles:
+        raise ValueError(f"At most {k_max_gain_profiles} gain profiles fit in a controller, got "
+                         f"{len(config.gain_profiles)}")
+    return {name: idx + 1 for idx, name in enumerate(config.gain_profiles)}
+
+
+def resolve_gain_slot(config, slot: int | str):
+    """
+    Resolve a gain slot index or profile name.
+
+    Args:
+        config: TalonConfig/SparkMaxConfig, or None
+        slot (int | str): Slot index, or the name of a gain profile
+
+    Returns:
+        (slot index, gains): The gains are the config itself for slot 0 and the GainProfile otherwise
+    """
+    if slot == 0:
+        return 0, config
+    slots = gain_profile_slots(config)
+    if isinstance(slot, str):
+        if slot not in slots:
+            raise KeyError(f"Unknown gain profile {slot}")
+        return slots[slot], config.gain_profiles[slot]
+    for name, idx in slots.items():
+        if idx == slot:
+            return slot, config.gain_profiles[name]
+    raise KeyError(f"No gain profile in slot {slot}")
+
+
+def velocity_feedforward(config, vel: radians_per_second, accel: radians_per_second_squared = 0) -> volts:
+    """
+    Compute the static/velocity/acceleration feedforward for a velocity setpoint from a motor config's (or gain
+    profile's) k_S, k_V and k_A gains. Gains that are not set contribute nothing.
+
+    Args:
+        config: TalonConfig/SparkMaxConfig/GainProfile, or None
+        vel: Target velocity, in the motor's units
+        accel: Target acceleration, in the motor's units
+
+    Returns:
+        volts: Feedforward voltage
+    """
+    if config is None:
+        return 0
+    feedforward = 0
+    if config.k_S is not None and vel != 0:
+        feedforward += config.k_S if vel > 0 else -config.k_S
+    if config.k_V is not None:
+        feedforward += config.k_V * vel
+    if config.k_A is not None:
+        feedforward += config.k_A * accel
+    return feedforward
+
+
+class MotorGroup(PIDMotor):
+    """
+    Vendor-agnostic group of motors acting as a single unit with a leader motor. When every motor shares the
+    leader's follow family the followers follow the leader in hardware, so each setpoint is a single write to the
+    leader. Otherwise each setpoint is fanned out to every motor from a single call.
+
+    Sensor reads always come from the leader. Call leader.enable_read_cache() to cache them per cycle, which needs
+    cycle.advance_cycle() to run every robot loop.
+    """
+    motors: list[PIDMotor]
+
+    def __init__(self, *motors: PIDMotor, leader_idx: int = 0):
+        super().__init__()
+        self.motors = list(motors)
+        self._leader_idx = leader_idx
+
+    @property
+    def leader(self) -> PIDMotor:
+        """
+        The leader motor of the group
+        """
+        return self.motors[self._leader_idx]
+
+    @property
+    def hardware_follow(self) -> bool:
+        """
+        Whether the followers follow the leader in hardware
+        """
+        family = self.leader.follow_family
+        return family is not None and all(motor.follow_family == family for motor in self.motors)
+
+    def init(self):
+        """
+        Initialize the leader, then every follower
+        """
+        self._init_leader()
+        for idx, motor in enumerate(self.motors):
+            if idx != self._leader_idx:
+                self._init_follower(motor)
+
+    def _init_leader(self):
+        self.leader.init()
+
+    def _init_follower(self, motor: PIDMotor):
+        motor.init()
+        if self.hardware_follow:
+            motor.follow(self.leader)
+            motor.minimize_status_frames()
+
+    def set_leader_idx(self, idx: int):
+        """
+        Set the leader motor index (in the list of motors)
+
+        Args:
+            idx (int): Index of the leader motor
+        """
+        self._leader_idx = idx
+        self.leader.set_status_frame_periods()
+        if self.hardware_follow:
+            for idx, motor in enumerate(self.motors):
+                if idx != self._leader_idx:
+                    motor.follow(self.leader)
+                    motor.minimize_status_frames()
+
+    def get_sensor_position(self) -> radians:
+        """
+        Get the sensor position of the leader motor
+
+        Returns:
+            position: Sensor position of the leader motor, in the leader's units
+        """
+        return self.leader.get_sensor_position()
+
+    def set_sensor_position(self, pos: radians):
+        """
+        Set the sensor position of the leader motor, or of every motor if they do not follow in hardware
+
+        Args:
+            pos: Sensor position, in the motors' units
+        """
+        if self.hardware_follow:
+            self.leader.set_sensor_position(pos)
+        else:
+            for motor in self.motors:
+                motor.set_sensor_position(pos)
+
+    def get_sensor_velocity(self) -> radians_per_second:
+        """
+        Get the sensor velocity of the leader motor
+
+        Returns:
+            velocity: Sensor velocity of the leader motor, in the leader's units
+        """
+        return self.leader.get_sensor_velocity()
+
+    def set_raw_output(self, x: float):
+        """
+        Set the raw output of the group
+
+        Args:
+            x (float): Raw output (between -1 and 1)
+        """
+        if self.hardware_follow:
+            self.leader.set_raw_output(x)
+        else:
+            for motor in self.motors:
+                motor.set_raw_output(x)
+
+    def set_target_position(self, pos: radians, arbitrary_feedforward: volts = 0, slot: int | str = 0):
+        """
+        Set the target position of the group
+
+        Args:
+            pos: Target position, in the motors' units
+            arbitrary_feedforward (volts, optional): Feedforward added by the controllers. Defaults to 0.
+            slot (int | str, optional): Gain slot index or gain profile name. Defaults to 0.
+        """
+        if self.hardware_follow:
+            self.leader.set_target_position(pos, arbitrary_feedforward, slot)
+        else:
+            for motor in self.motors:
+                motor.set_target_position(pos, arbitrary_feedforward, slot)
+
+    def set_target_velocity(self, vel: radians_per_second, arbitrary_feedforward: volts | None = None,
+                            accel: radians_per_second_squared = 0, slot: int | str = 0):
+        """
+        Set the target velocity of the group
 
-    def set_target_velocity(self, vel: radians_per_second): ...
+        Args:
+            vel: Target velocity, in the motors' units
+            arbitrary_feedforward (volts, optional): Feedforward added by the controllers. Defaults to the
+                feedforward computed from each motor's config.
+            accel: Target acceleration used by the config feedforward, in the motors' units. Defaults to 0.
+            slot (int | str, optional): Gain slot index or gain profile name. Defaults to 0.
+        """
+        if self.hardware_follow:
+            self.leader.set_target_velocity(vel, arbitrary_feedforward, accel, slot)
+        else:
+            for motor in self.motors:
+                motor.set_target_velocity(vel, arbitrary_feedforward, accel, slot)
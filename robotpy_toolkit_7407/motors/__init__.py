@@ -1,2 +1,4 @@
 from robotpy_toolkit_7407.motors.ctre_motors import TalonSRX, TalonFX, TalonGroup, TalonConfig
-from robotpy_toolkit_7407.motors.rev_motors import SparkMax, SparkMaxConfig
+from robotpy_toolkit_7407.motors.rev_motors import SparkMax, SparkMaxGroup, SparkMaxConfig
+from robotpy_toolkit_7407.motors.output_stage import OutputStage
+from robotpy_toolkit_7407.motors.health_monitor import MotorHealthMonitor, HealthEvent
@@ -0,0 +1,237 @@
+import dataclasses
+import hashlib
+import json
+import math
+import os
+import threading
+from typing import Any, Callable, Iterable, Optional
+
+from robotpy_toolkit_7407.utils import logger
+
+"""
+Persisted cache of the motor controller configs that were last applied, keyed by controller type and CAN ID.
+
+Motor wrappers only re-send config fields that changed since the last successful apply, so a restart with an
+unchanged TalonConfig/SparkMaxConfig costs no config traffic at all.
+
+Example usage:
+    config_cache.set_config_cache(config_cache.AppliedConfigCache(verify=True))
+"""
+
+default_cache_path = os.path.join(os.path.expanduser("~"), ".robotpy_toolkit_7407", "applied_configs.json")
+
+
+def _normalize(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if dataclasses.is_dataclass(value):
+        return {f.name: _normalize(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    try:
+        return int(value)  # Vendor enums (e.g. CANSparkMax.IdleMode)
+    except (TypeError, ValueError):
+        return repr(value)
+
+
+def config_values(config) -> dict[str, Any]:
+    """
+    Get the set (non-None) fields of a motor config as JSON-compatible values.
+
+    Args:
+        config: TalonConfig/SparkMaxConfig dataclass
+
+    Returns:
+        dict[str, Any]: Normalized field values keyed by field name
+    """
+    return {
+        f.name: _normalize(getattr(config, f.name))
+        for f in dataclasses.fields(config)
+        if getattr(config, f.name) is not None
+    }
+
+
+def config_hash(config) -> str:
+    """
+    Stable hash of a motor config. Equal configs hash equally across runs and processes.
+
+    Args:
+        config: TalonConfig/SparkMaxConfig dataclass
+
+    Returns:
+        str: Hex digest of the config
+    """
+    return hashlib.sha1(json.dumps(config_values(config), sort_keys=True).encode()).hexdigest()
+
+
+def _values_match(a: Any, b: Any) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        try:
+            return math.isclose(a, b, rel_tol=1e-3, abs_tol=1e-6)
+        except TypeError:
+            return False
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_values_match(x, y) for x, y in zip(a, b))
+    return a == b
+
+
+class AppliedConfigCache:
+    """
+    Stores the hash and values of the last config applied to each motor controller in a local JSON file.
+    """
+
+    def __init__(self, path: str = default_cache_path, verify: bool = False):
+        """
+        Args:
+            path (str, optional): JSON file the cache is persisted to. Defaults to ~/.robotpy_toolkit_7407.
+            verify (bool, optional): Read each cached field back from the controller and re-send it if the controller
+                disagrees (e.g. after a factory reset or a swapped controller). Defaults to False.
+        """
+        self.path = path
+        self.verify = verify
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            self._entries = {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"ignoring unreadable config cache {self.path}: {e}", "[config_cache]")
+            self._entries = {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._entries, f, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"could not write config cache {self.path}: {e}", "[config_cache]")
+
+    def pending_fields(self, key: str, config, read_back: Optional[Callable[[str], Any]] = None,
+                       volatile: Iterable[str] = ()) -> set[str]:
+        """
+        Get the config fields that still need to be sent to a controller.
+
+        Args:
+            key (str): Controller key, e.g. "TalonFX:5"
+            config: The config about to be applied
+            read_back (Callable[[str], Any], optional): Reads a field's current value from the controller, in config
+                units. Returns None for fields that cannot be read. Only used in verify mode.
+            volatile (Iterable[str], optional): Fields the controller does not persist, which are always sent.
+
+        Returns:
+            set[str]: Names of the fields to apply, including fields cleared to None since the last apply
+        """
+        values = config_values(config)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return set(values)
+
+        if entry["hash"] == config_hash(config):
+            fields = set()
+        else:
+            # Fields cleared to None since the last apply are pending too, so the wrapper can revert them
+            applied = entry["values"]
+            fields = {
+                name for name in set(values) | set(applied) if not _values_match(applied.get(name), values.get(name))
+            }
+
+        if self.verify and read_back is not None:
+            for name, value in values.items():
+                if name in fields:
+                    continue
+                current = read_back(name)
+                if current is not None and not _values_match(_normalize(current), value):
+                    logger.warning(f"{key} {name} reads back {current}, expected {value}", "[config_cache]")
+                    fields.add(name)
+
+        return fields | (set(volatile) & set(values))
+
+    def mark_applied(self, key: str, config, failed: Iterable[str] = ()):
+        """
+        Record that a config was applied to a controller and persist the cache.
+
+        Args:
+            key (str): Controller key, e.g. "TalonFX:5"
+            config: The config that was applied
+            failed (Iterable[str], optional): Fields the controller rejected or did not acknowledge. They are left
+                out of the cache, so they are sent again on the next init.
+        """
+        failed = set(failed)
+        values = config_values(config)
+        if failed:
+            logger.warning(f"{key} did not apply {', '.join(sorted(failed))}", "[config_cache]")
+            values = {name: value for name, value in values.items() if name not in failed}
+        # A partially applied config never matches a hash, so its fields are diffed against the cached values
+        digest = None if failed else config_hash(config)
+        with self._lock:
+            if digest is not None and self._entries.get(key, {}).get("hash") == digest:
+                return
+            self._entries[key] = {"hash": digest, "values": values}
+            self._save()
+
+    def forget(self, key: str):
+        """
+        Drop a controller from the cache so its full config is re-sent on the next init.
+
+        Args:
+            key (str): Controller key, e.g. "TalonFX:5"
+        """
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._save()
+
+    def clear(self):
+        """
+        Drop every controller from the cache.
+        """
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+
+_cache: Optional[AppliedConfigCache] = None
+
+
+def set_config_cache(cache: Optional[AppliedConfigCache]):
+    """
+    Set the process-wide applied-config cache used by the motor wrappers. Pass None to always send full configs.
+    """
+    global _cache
+    _cache = cache
+
+
+def get_config_cache() -> Optional[AppliedConfigCache]:
+    """
+    Get the process-wide applied-config cache, or None if config caching is disabled.
+    """
+    return _cache
+
+
+def fields_to_apply(key: str, config, read_back: Optional[Callable[[str], Any]] = None,
+                    volatile: Iterable[str] = ()) -> set[str]:
+    """
+    Get the config fields a motor wrapper should send, using the process-wide cache if one is set.
+
+    Args:
+        key (str): Controller key, e.g. "TalonFX:5"
+        config: The config about to be applied
+        read_back (Callable[[str], Any], optional): Reads a field's current value from the controller
+        volatile (Iterable[str], optional): Fields the controller does not persist
+
+    Returns:
+        set[str]: Names of the fields to apply
+    """
+    if _cache is None:
+        return set(config_values(config))
+    return _cache.pending_fields(key, config, read_back, volatile)
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+import math
+from dataclasses import dataclass, replace
+from typing import Optional, Sequence
 
 import ctre
 from robotpy_toolkit_7407.unum import Unum
 
-from robotpy_toolkit_7407.motor import PIDMotor
-from robotpy_toolkit_7407.utils.units import rad, rev, s, radians_per_second, radians_per_second_squared, radians
+from robotpy_toolkit_7407.motor import PIDMotor, MotorGroup, GainProfile, velocity_feedforward, gain_profile_slots, \
+    resolve_gain_slot, k_max_gain_profiles
+from robotpy_toolkit_7407.motors import config_cache
+from robotpy_toolkit_7407.utils.cycle import cycle_cached
+from robotpy_toolkit_7407.utils.units import rad, rev, s, radians_per_second, radians_per_second_squared, radians, \
+    seconds, volts
 
 
 @dataclass
@@ -22,6 +27,17 @@ class TalonConfig:
         kF: Feedforward gain
         closed_loop_peak_output: The maximum output of the controller
         neutral_brake: Whether to brake or coast when the motor is not moving
+        k_S: Static feedforward in volts, sent with velocity setpoints as arbitrary feedforward
+        k_V: Velocity feedforward in volts per radian per second
+        k_A: Acceleration feedforward in volts per radian per second squared
+        gain_profiles: Named gain profiles preloaded into slots 1-3 (in order), selected with the slot argument of
+            the setpoint methods. The top-level gains are slot 0.
+        forward_soft_limit: Position in radians past which the controller refuses forward output
+        reverse_soft_limit: Position in radians past which the controller refuses reverse output
+        forward_limit_switch: Whether the controller stops forward output on its forward limit switch input
+        reverse_limit_switch: Whether the controller stops reverse output on its reverse limit switch input
+        limit_switches_normally_closed: Whether the controller's limit switches are normally closed
+        zero_on_reverse_limit: Whether the controller zeroes its sensor position when the reverse limit switch closes
     """
     k_P: Optional[float] = None
     k_I: Optional[float] = None
@@ -33,6 +49,16 @@ class TalonConfig:
     neutral_brake: Optional[bool] = None
     integral_zone: Optional[float] = None
     max_integral_accumulator: Optional[float] = None
+    k_S: Optional[volts] = None
+    k_V: Optional[float] = None
+    k_A: Optional[float] = None
+    gain_profiles: Optional[dict[str, GainProfile]] = None
+    forward_soft_limit: Optional[radians] = None
+    reverse_soft_limit: Optional[radians] = None
+    forward_limit_switch: Optional[bool] = None
+    reverse_limit_switch: Optional[bool] = None
+    limit_switches_normally_closed: Optional[bool] = None
+    zero_on_reverse_limit: Optional[bool] = None
 
 
 talon_sensor_unit = Unum.unit("talon_sensor_u", rev / 2048, "talon sensor unit")
@@ -47,9 +73,41 @@ k_rad_per_sec_to_sensor_vel = (rad / s).asNumber(talon_sensor_unit / hundred_ms)
 k_sensor_accel_to_rad_per_sec_sq = talon_sensor_accel_unit.asNumber(rad / (s * s))
 k_rad_per_sec_sq_to_sensor_accel = (rad / (s * s)).asNumber(talon_sensor_unit / (s * hundred_ms))
 
+# Factory defaults of the Talon, sent for fields cleared to None since the last apply. Cleared soft limits are
+# disabled and cleared gain profiles are zeroed instead.
+k_factory_defaults = TalonConfig(
+    k_P=0, k_I=0, k_D=0, k_F=0, closed_loop_peak_output=1, motion_cruise_velocity=0, motion_acceleration=0,
+    neutral_brake=False, integral_zone=0, max_integral_accumulator=0, forward_limit_switch=True,
+    reverse_limit_switch=True, limit_switches_normally_closed=False, zero_on_reverse_limit=False
+)
+k_zero_gains = GainProfile(k_P=0, k_I=0, k_D=0, k_F=0, integral_zone=0)
+
+k_nominal_voltage = 12
+k_config_read_timeout_ms = 50
+k_default_general_status_ms = 10
+k_default_feedback_status_ms = 20
+k_max_status_ms = 255
+
+# Controller parameters used to read config fields back in config cache verify mode
+_talon_config_params = {
+    "k_P": ctre.ParamEnum.eProfileParamSlot_P,
+    "k_I": ctre.ParamEnum.eProfileParamSlot_I,
+    "k_D": ctre.ParamEnum.eProfileParamSlot_D,
+    "k_F": ctre.ParamEnum.eProfileParamSlot_F,
+    "closed_loop_peak_output": ctre.ParamEnum.eProfileParamSlot_PeakOutput,
+    "motion_cruise_velocity": ctre.ParamEnum.eMotMag_VelCruise,
+    "motion_acceleration": ctre.ParamEnum.eMotMag_Accel,
+    "integral_zone": ctre.ParamEnum.eProfileParamSlot_IZone,
+    "max_integral_accumulator": ctre.ParamEnum.eProfileParamSlot_MaxIAccum,
+    "forward_soft_limit": ctre.ParamEnum.eForwardSoftLimitThreshold,
+    "reverse_soft_limit": ctre.ParamEnum.eReverseSoftLimitThreshold,
+}
+
 
 class _Talon(PIDMotor):
     _motor: ctre.BaseTalon
+    follow_family = "ctre"
+    _selected_slot: int = 0
 
     def __init__(self, can_id: int, inverted: bool = False, config: TalonConfig = None):
         super().__init__()
@@ -57,50 +115,304 @@ class _Talon(PIDMotor):
         self._config = config
         self._inverted = inverted
 
+    @cycle_cached
     def get_sensor_position(self) -> radians:
         return self._motor.getSelectedSensorPosition(0) * k_sensor_pos_to_radians
 
     def set_sensor_position(self, pos: radians):
         self._motor.setSelectedSensorPosition(pos * k_radians_to_sensor_pos)
+        self.invalidate_read_cache()
 
+    @cycle_cached
     def get_sensor_velocity(self) -> radians_per_second:
         return self._motor.getSelectedSensorVelocity(0) * k_sensor_vel_to_rad_per_sec
 
     def set_raw_output(self, x: float):
-        self._motor.set(ctre.ControlMode.PercentOutput, x)
+        self._write(ctre.ControlMode.PercentOutput, x, 0.0, self._selected_slot)
 
-    def set_target_position(self, pos: radians):
-        self._motor.set(ctre.ControlMode.MotionMagic, pos * k_radians_to_sensor_pos)
+    def set_target_position(self, pos: radians, arbitrary_feedforward: volts = 0, slot: int | str = 0):
+        """
+        Set the target position, reached with MotionMagic
 
-    def set_target_velocity(self, vel: radians_per_second):
-        self._motor.set(ctre.ControlMode.Velocity, vel * k_rad_per_sec_to_sensor_vel)
+        Args:
+            pos (radians): Target position in radians
+            arbitrary_feedforward (volts, optional): Feedforward added by the controller, e.g. to hold against
+                gravity. Defaults to 0.
+            slot (int | str, optional): Gain slot index or gain profile name. Defaults to 0.
+        """
+        slot, _ = resolve_gain_slot(self._config, slot)
+        self._write(
+            ctre.ControlMode.MotionMagic, pos * k_radians_to_sensor_pos, arbitrary_feedforward / k_nominal_voltage,
+            slot
+        )
+
+    def set_target_velocity(self, vel: radians_per_second, arbitrary_feedforward: volts | None = None,
+                            accel: radians_per_second_squared = 0, slot: int | str = 0):
+        """
+        Set the target velocity. The feedforward is sent with the setpoint and added by the controller's onboard
+        loop.
+
+        Args:
+            vel (radians_per_second): Target velocity in radians per second
+            arbitrary_feedforward (volts, optional): Feedforward added by the controller. Defaults to the k_S/k_V/k_A
+                feedforward of the selected gains.
+            accel (radians_per_second_squared, optional): Target acceleration used by the config feedforward.
+                Defaults to 0.
+            slot (int | str, optional): Gain slot index or gain profile name. Defaults to 0.
+        """
+        slot, gains = resolve_gain_slot(self._config, slot)
+        if arbitrary_feedforward is None:
+            arbitrary_feedforward = velocity_feedforward(gains, vel, accel)
+        self._write(
+            ctre.ControlMode.Velocity, vel * k_rad_per_sec_to_sensor_vel, arbitrary_feedforward / k_nominal_voltage,
+            slot
+        )
+
+    def _transmit(self, mode: ctre.ControlMode, value: float, feedforward: float, slot: int):
+        # Gains are preloaded, so switching slots is a single control frame, and only sent when the slot changes.
+        if slot != self._selected_slot:
+            self._motor.selectProfileSlot(slot, 0)
+            self._selected_slot = slot
+        self._motor.set(mode, value, ctre.DemandType.ArbitraryFeedForward, feedforward)
+
+    def _output_tolerance(self, mode: ctre.ControlMode, epsilon: float) -> tuple[float, ...]:
+        if mode == ctre.ControlMode.MotionMagic:
+            value = epsilon * k_radians_to_sensor_pos
+        elif mode == ctre.ControlMode.Velocity:
+            value = epsilon * k_rad_per_sec_to_sensor_vel
+        else:
+            value = epsilon
+        return value, epsilon / k_nominal_voltage, 0
 
     def follow(self, master: _Talon):
         self._motor.follow(master._motor)
 
+    def read_health(self) -> tuple[float, float, float, int, bool]:
+        """
+        Read the motor's health from the controller
+
+        Returns:
+            (temperature in celsius, supply current in amps, stator current in amps, fault bitfield, brownout fault)
+        """
+        faults = ctre.Faults()
+        self._motor.getFaults(faults)
+        return (
+            self._motor.getTemperature(),
+            self._motor.getSupplyCurrent(),
+            self._motor.getStatorCurrent(),
+            faults.toBitfield(),
+            faults.UnderVoltage
+        )
+
+    def stream_profile(self, positions: Sequence[radians], velocities: Optional[Sequence[radians_per_second]] = None,
+                       dt: seconds = 0.01, min_buffered_points: int = 10, slot: int | str = 0):
+        """
+        Stream a sampled position/velocity profile to the controller, which executes it on its own timebase.
+
+        The points are buffered and pushed to the controller in bulk, so tracking quality no longer depends on the
+        robot loop. Use is_profile_finished and has_profile_underrun to monitor execution.
+
+        Args:
+            positions (Sequence[radians]): Profile positions, one per sample
+            velocities (Sequence[radians_per_second], optional): Profile velocities. Defaults to the finite
+                difference of the positions.
+            dt (seconds, optional): Time between samples, a whole number of milliseconds from 1 to 127 ms.
+                Defaults to 0.01.
+            min_buffered_points (int, optional): Points buffered on the controller before execution starts.
+                Defaults to 10.
+            slot (int | str, optional): Gain slot index or gain profile name the profile is tracked with.
+                Defaults to 0.
+        """
+        slot, _ = resolve_gain_slot(self._config, slot)
+        dt_ms = round(dt * 1000)
+        if not 1 <= dt_ms <= 127 or abs(dt_ms - dt * 1000) > 1e-6:
+            raise ValueError(f"Profile sample period must be a whole number of milliseconds from 1 to 127, got {dt}")
+        if velocities is None:
+            velocities = [0.0] + [(b - a) / dt for a, b in zip(positions, positions[1:])]
+        if len(velocities) != len(positions):
+            raise ValueError("Profile positions and velocities must have the same length")
+
+        stream = ctre.BufferedTrajectoryPointStream()
+        last_idx = len(positions) - 1
+        for idx, (pos, vel) in enumerate(zip(positions, velocities)):
+            point = ctre.TrajectoryPoint()
+            point.position = pos * k_radians_to_sensor_pos
+            point.velocity = vel * k_rad_per_sec_to_sensor_vel
+            point.profileSlotSelect0 = slot
+            point.timeDur = dt_ms
+            point.zeroPos = False
+            point.isLastPoint = idx == last_idx
+            stream.Write(point)
+
+        # The controller leaves the output stage's control mode behind, so its next setpoint must always be sent.
+        if self._output_stage is not None:
+            self._output_stage.forget(self)
+        self._motor.clearMotionProfileHasUnderrun()
+        self._motor.startMotionProfile(stream, min_buffered_points, ctre.ControlMode.MotionProfile)
+        self._profile_stream = stream
+        # The points select the slot on the controller, so later setpoints only switch slots if they differ from it
+        self._selected_slot = slot
+
+    def is_profile_finished(self) -> bool:
+        """
+        Whether the controller has executed the last point of the streamed profile
+        """
+        return self._motor.isMotionProfileFinished()
+
+    def has_profile_underrun(self) -> bool:
+        """
+        Whether the controller ran out of buffered points while executing the streamed profile
+        """
+        return self.get_profile_status().hasUnderrun
+
+    def get_profile_status(self) -> ctre.MotionProfileStatus:
+        """
+        Get the controller's motion profile buffer status (buffer counts, underrun flags, active point)
+        """
+        status = ctre.MotionProfileStatus()
+        self._motor.getMotionProfileStatus(status)
+        return status
+
+    def set_status_frame_periods(self, general_ms: int = k_default_general_status_ms,
+                                 feedback_ms: int = k_default_feedback_status_ms):
+        """
+        Set how often the controller sends its status frames
+
+        Args:
+            general_ms (int, optional): Period of the general status frame (applied output, faults)
+            feedback_ms (int, optional): Period of the feedback status frame (sensor position and velocity)
+        """
+        self._motor.setStatusFramePeriod(ctre.StatusFrame.Status_1_General, general_ms)
+        self._motor.setStatusFramePeriod(ctre.StatusFrame.Status_2_Feedback0, feedback_ms)
+
+    def minimize_status_frames(self):
+        """
+        Slow the status frames down as far as possible, for followers whose status is never read
+        """
+        self.set_status_frame_periods(k_max_status_ms, k_max_status_ms)
+
+    @property
+    def _config_key(self) -> str:
+        return f"{type(self).__name__}:{self._can_id}"
+
+    def _read_config_value(self, name: str):
+        param = _talon_config_params.get(name)
+        if param is None:
+            return None
+        value = self._motor.configGetParameter(param, 0, k_config_read_timeout_ms)
+        if name == "motion_cruise_velocity":
+            return value * k_sensor_vel_to_rad_per_sec
+        if name == "motion_acceleration":
+            return value * k_sensor_accel_to_rad_per_sec_sq
+        if name in ("forward_soft_limit", "reverse_soft_limit"):
+            return value * k_sensor_pos_to_radians
+        return value
+
     def _set_config(self, config: Optional[TalonConfig]):
         if config is None:
             return
-        if config.k_P is not None:
-            self._motor.config_kP(0, config.k_P)
-        if config.k_I is not None:
-            self._motor.config_kI(0, config.k_I)
-        if config.k_D is not None:
-            self._motor.config_kD(0, config.k_D)
-        if config.k_F is not None:
-            self._motor.config_kF(0, config.k_F)
-        if config.closed_loop_peak_output is not None:
-            self._motor.configClosedLoopPeakOutput(0, config.closed_loop_peak_output)
-        if config.motion_cruise_velocity is not None:
-            self._motor.configMotionCruiseVelocity(config.motion_cruise_velocity * k_rad_per_sec_to_sensor_vel)
-        if config.motion_acceleration is not None:
-            self._motor.configMotionAcceleration(config.motion_acceleration * k_rad_per_sec_sq_to_sensor_accel)
-        if config.neutral_brake is not None:
-            self._motor.setNeutralMode(ctre.NeutralMode.Brake if config.neutral_brake else ctre.NeutralMode.Coast)
-        if config.integral_zone is not None:
-            self._motor.config_IntegralZone(0, config.integral_zone)
-        if config.max_integral_accumulator is not None:
-            self._motor.configMaxIntegralAccumulator(0, config.max_integral_accumulator)
+        fields = config_cache.fields_to_apply(
+            self._config_key, config, self._read_config_value, volatile=("neutral_brake",)
+        )
+        target = replace(config, **{
+            name: getattr(k_factory_defaults, name) for name in fields if getattr(config, name) is None
+        })
+        results: dict[str, list[ctre.ErrorCode]] = {}  # Error codes returned while applying each field
+        if "k_P" in fields:
+            results["k_P"] = [self._motor.config_kP(0, target.k_P)]
+        if "k_I" in fields:
+            results["k_I"] = [self._motor.config_kI(0, target.k_I)]
+        if "k_D" in fields:
+            results["k_D"] = [self._motor.config_kD(0, target.k_D)]
+        if "k_F" in fields:
+            results["k_F"] = [self._motor.config_kF(0, target.k_F)]
+        if "closed_loop_peak_output" in fields:
+            results["closed_loop_peak_output"] = [
+                self._motor.configClosedLoopPeakOutput(0, target.closed_loop_peak_output)
+            ]
+        if "motion_cruise_velocity" in fields:
+            results["motion_cruise_velocity"] = [
+                self._motor.configMotionCruiseVelocity(target.motion_cruise_velocity * k_rad_per_sec_to_sensor_vel)
+            ]
+        if "motion_acceleration" in fields:
+            results["motion_acceleration"] = [
+                self._motor.configMotionAcceleration(target.motion_acceleration * k_rad_per_sec_sq_to_sensor_accel)
+            ]
+        if "neutral_brake" in fields:
+            self._motor.setNeutralMode(ctre.NeutralMode.Brake if target.neutral_brake else ctre.NeutralMode.Coast)
+        if "integral_zone" in fields:
+            results["integral_zone"] = [self._motor.config_IntegralZone(0, target.integral_zone)]
+        if "max_integral_accumulator" in fields:
+            results["max_integral_accumulator"] = [
+                self._motor.configMaxIntegralAccumulator(0, target.max_integral_accumulator)
+            ]
+        if "gain_profiles" in fields and target.gain_profiles is None:
+            results["gain_profiles"] = [
+                code for slot in range(1, k_max_gain_profiles + 1)
+                for code in self._set_gain_profile(slot, k_zero_gains)
+            ]
+        elif "gain_profiles" in fields:
+            results["gain_profiles"] = [
+                code for name, slot in gain_profile_slots(target).items()
+                for code in self._set_gain_profile(slot, target.gain_profiles[name])
+            ]
+        if "forward_soft_limit" in fields and target.forward_soft_limit is None:
+            results["forward_soft_limit"] = [self._motor.configForwardSoftLimitEnable(False)]
+        elif "forward_soft_limit" in fields:
+            results["forward_soft_limit"] = [
+                self._motor.configForwardSoftLimitThreshold(target.forward_soft_limit * k_radians_to_sensor_pos),
+                self._motor.configForwardSoftLimitEnable(True)
+            ]
+        if "reverse_soft_limit" in fields and target.reverse_soft_limit is None:
+            results["reverse_soft_limit"] = [self._motor.configReverseSoftLimitEnable(False)]
+        elif "reverse_soft_limit" in fields:
+            results["reverse_soft_limit"] = [
+                self._motor.configReverseSoftLimitThreshold(target.reverse_soft_limit * k_radians_to_sensor_pos),
+                self._motor.configReverseSoftLimitEnable(True)
+            ]
+        limit_switch_fields = fields & {
+            "forward_limit_switch", "reverse_limit_switch", "limit_switches_normally_closed"
+        }
+        if limit_switch_fields:
+            codes = self._set_limit_switches(target)
+            results.update((name, codes) for name in limit_switch_fields)
+        if "zero_on_reverse_limit" in fields:
+            results["zero_on_reverse_limit"] = [self._motor.configClearPositionOnLimitR(target.zero_on_reverse_limit)]
+
+        cache = config_cache.get_config_cache()
+        if cache is not None:
+            failed = {name for name, codes in results.items() if any(code != ctre.ErrorCode.OK for code in codes)}
+            cache.mark_applied(self._config_key, config, failed)
+
+    def _set_limit_switches(self, config: TalonConfig) -> list[ctre.ErrorCode]:
+        normal = ctre.LimitSwitchNormal.NormallyClosed if config.limit_switches_normally_closed \
+            else ctre.LimitSwitchNormal.NormallyOpen
+        codes = []
+        if config.forward_limit_switch is not None:
+            codes.append(self._motor.configForwardLimitSwitchSource(
+                ctre.LimitSwitchSource.FeedbackConnector,
+                normal if config.forward_limit_switch else ctre.LimitSwitchNormal.Disabled
+            ))
+        if config.reverse_limit_switch is not None:
+            codes.append(self._motor.configReverseLimitSwitchSource(
+                ctre.LimitSwitchSource.FeedbackConnector,
+                normal if config.reverse_limit_switch else ctre.LimitSwitchNormal.Disabled
+            ))
+        return codes
+
+    def _set_gain_profile(self, slot: int, profile: GainProfile) -> list[ctre.ErrorCode]:
+        codes = []
+        if profile.k_P is not None:
+            codes.append(self._motor.config_kP(slot, profile.k_P))
+        if profile.k_I is not None:
+            codes.append(self._motor.config_kI(slot, profile.k_I))
+        if profile.k_D is not None:
+            codes.append(self._motor.config_kD(slot, profile.k_D))
+        if profile.k_F is not None:
+            codes.append(self._motor.config_kF(slot, profile.k_F))
+        if profile.integral_zone is not None:
+            codes.append(self._motor.config_IntegralZone(slot, profile.integral_zone))
+        return codes
 
 
 class TalonFX(_Talon):
@@ -144,87 +456,51 @@ class VictorSPX(_Talon):
         self._set_config(self._config)
         self._motor.setInverted(self._inverted)
 
+    def read_health(self) -> tuple[float, float, float, int, bool]:
+        """
+        Read the motor's health from the controller. The VictorSPX does not measure current, so currents are NaN.
+
+        Returns:
+            (temperature in celsius, supply current in amps, stator current in amps, fault bitfield, brownout fault)
+        """
+        faults = ctre.Faults()
+        self._motor.getFaults(faults)
+        return self._motor.getTemperature(), math.nan, math.nan, faults.toBitfield(), faults.UnderVoltage
+
 
-class TalonGroup(PIDMotor):
+class TalonGroup(MotorGroup):
     """
     Group of Talon motor controllers. Used when multiple motors act as a single unit with a leader motor
     """
     motors: list[_Talon]
 
     def __init__(self, *motors: _Talon, config: TalonConfig = None, leader_idx: int = 0):
-        super().__init__()
-        self.motors = list(motors)
+        super().__init__(*motors, leader_idx=leader_idx)
         for m in self.motors:
             m._config = config
-        self._leader_idx = leader_idx
 
-    def init(self):
+    def stream_profile(self, positions: Sequence[radians], velocities: Optional[Sequence[radians_per_second]] = None,
+                       dt: seconds = 0.01, min_buffered_points: int = 10, slot: int | str = 0):
         """
-        Initialize the motor controllers
-        """
-        self.motors[self._leader_idx].init()
-        for idx, motor in enumerate(self.motors):
-            if idx != self._leader_idx:
-                motor.init()
-                motor.follow(self.motors[self._leader_idx])
-
-    def set_leader_idx(self, idx: int):
-        """
-        Set the leader motor index (in the list of motors)
+        Stream a sampled profile to the leader motor. Followers track the leader in hardware.
 
         Args:
-            idx (int): Index of the leader motor
+            positions (Sequence[radians]): Profile positions, one per sample
+            velocities (Sequence[radians_per_second], optional): Profile velocities
+            dt (seconds, optional): Time between samples. Defaults to 0.01.
+            min_buffered_points (int, optional): Points buffered before execution starts. Defaults to 10.
+            slot (int | str, optional): Gain slot index or gain profile name. Defaults to 0.
         """
-        self._leader_idx = idx
-        for idx, motor in enumerate(self.motors):
-            if idx != self._leader_idx:
-                motor.follow(self.motors[self._leader_idx])
+        self.leader.stream_profile(positions, velocities, dt, min_buffered_points, slot)
 
-    def get_sensor_position(self) -> radians:
+    def is_profile_finished(self) -> bool:
         """
-        Get the sensor position of the leader motor
-
-        Returns:
-            position (radians): Sensor position of the leader motor in radians
+        Whether the leader motor has finished its streamed profile
         """
-        return self.motors[self._leader_idx].get_sensor_position()
+        return self.leader.is_profile_finished()
 
-    def set_sensor_position(self, pos: radians):
-        """
-        Set the sensor position of the leader motor
-        Args:
-            pos (radians): Sensor position of the leader motor in radians
+    def has_profile_underrun(self) -> bool:
         """
-        self.motors[self._leader_idx].set_sensor_position(pos)
-
-    def get_sensor_velocity(self) -> radians_per_second:
-        """
-        Get the sensor velocity of the leader motor
-        Returns:
-            velocity (radians_per_second): Sensor velocity of the leader motor in radians per second
-        """
-        return self.motors[self._leader_idx].get_sensor_velocity()
-
-    def set_raw_output(self, x: float):
-        """
-        Set the raw output of the leader motor
-        Args:
-            x (float): Raw output of the leader motor
-        """
-        self.motors[self._leader_idx].set_raw_output(x)
-
-    def set_target_position(self, pos: radians):
-        """
-        Set the target position of the leader motor
-        Args:
-            pos (radians): Target position of the leader motor in radians
-        """
-        self.motors[self._leader_idx].set_target_position(pos)
-
-    def set_target_velocity(self, vel: radians_per_second):
-        """
-        Set the target velocity of the leader motor
-        Args:
-            vel (radians_per_second): Target velocity of the leader motor in radians per second
+        Whether the leader motor ran out of buffered profile points
         """
-        self.motors[self._leader_idx].set_target_velocity(vel)
+        return self.leader.has_profile_underrun()
@@ -0,0 +1,236 @@
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import numpy as np
+from wpilib import SmartDashboard, Timer
+
+from robotpy_toolkit_7407.motor import PIDMotor
+from robotpy_toolkit_7407.utils import logger
+from robotpy_toolkit_7407.utils.units import seconds
+
+# Columns of a health sample
+_time, _temperature, _supply_current, _stator_current, _faults = range(5)
+
+
+@dataclass
+class HealthEvent:
+    """
+    A motor crossing a health threshold
+
+    Args:
+        name: Name the motor was registered with
+        kind: "overheat", "stall" or "brownout"
+        value: Reading that triggered the event (degrees celsius, amps, or fault bitfield)
+        timestamp: FPGA timestamp of the sample in seconds
+    """
+    name: str
+    kind: str
+    value: float
+    timestamp: seconds
+
+
+class _MotorHealth:
+    def __init__(self, name: str, motor: PIDMotor, history: int):
+        self.name = name
+        self.motor = motor
+        self.samples = np.full((history, 5), np.nan)
+        self.count = 0
+        self.high_current_samples = 0
+        self.active: set[str] = set()
+
+    def add(self, sample: tuple):
+        self.samples[self.count % len(self.samples)] = sample
+        self.count += 1
+
+    def latest(self) -> Optional[np.ndarray]:
+        if self.count == 0:
+            return None
+        return self.samples[(self.count - 1) % len(self.samples)]
+
+
+class MotorHealthMonitor:
+    """
+    Samples temperature, supply current, stator current and faults of registered motors on a background thread.
+
+    Motors are sampled round-robin, staggered evenly across the sample period, so the CAN cost is spread out and
+    never lands in the robot loop. Samples are kept in a fixed-size ring buffer per motor. Threshold crossings are
+    queued as HealthEvents that the main thread drains with poll_events() without blocking.
+
+    Example usage:
+        monitor = MotorHealthMonitor(sample_period=0.5)
+        monitor.register("shooter", m_shooter)
+        monitor.on_event(lambda event: logger.warning(f"{event.name}: {event.kind}", "[health]"))
+        monitor.start()
+
+        def robotPeriodic(self):
+            monitor.poll_events()
+    """
+
+    def __init__(self, sample_period: seconds = 0.5, history: int = 120, overheat_temperature: float = 80,
+                 stall_current: float = 60, stall_samples: int = 3, telemetry_prefix: Optional[str] = "motor_health"):
+        """
+        Args:
+            sample_period (seconds, optional): Time between two samples of the same motor. Defaults to 0.5.
+            history (int, optional): Samples kept per motor. Defaults to 120.
+            overheat_temperature (float, optional): Motor temperature in celsius treated as overheating.
+                Defaults to 80.
+            stall_current (float, optional): Stator current in amps treated as a stall when sustained. Defaults to 60.
+            stall_samples (int, optional): Consecutive high-current samples before a stall event. Defaults to 3.
+            telemetry_prefix (str, optional): SmartDashboard prefix for summaries, or None to disable telemetry.
+                Defaults to "motor_health".
+        """
+        self.sample_period = sample_period
+        self.history = history
+        self.overheat_temperature = overheat_temperature
+        self.stall_current = stall_current
+        self.stall_samples = stall_samples
+        self.telemetry_prefix = telemetry_prefix
+
+        self._motors: list[_MotorHealth] = []
+        self._events: queue.SimpleQueue[HealthEvent] = queue.SimpleQueue()
+        self._callbacks: list[Callable[[HealthEvent], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, motor: PIDMotor):
+        """
+        Start monitoring a motor. The motor must implement read_health().
+
+        Args:
+            name (str): Name used in events and telemetry
+            motor (PIDMotor): The motor to monitor
+        """
+        self._motors = self._motors + [_MotorHealth(name, motor, self.history)]
+
+    def on_event(self, callback: Callable[[HealthEvent], None]):
+        """
+        Call a function on the main thread for every event drained by poll_events().
+
+        Args:
+            callback (Callable[[HealthEvent], None]): Function to call
+        """
+        self._callbacks.append(callback)
+
+    def start(self):
+        """
+        Start sampling on a background daemon thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="motor_health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def poll_events(self) -> list[HealthEvent]:
+        """
+        Drain queued events without blocking and pass each to the registered callbacks. Call from the main thread.
+
+        Returns:
+            list[HealthEvent]: The drained events
+        """
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                break
+        for event in events:
+            for callback in self._callbacks:
+                callback(event)
+        return events
+
+    def get_history(self, name: str) -> np.ndarray:
+        """
+        Get the samples of a motor, oldest first, as rows of (timestamp, temperature, supply current, stator
+        current, fault bitfield).
+
+        Args:
+            name (str): Name the motor was registered with
+        """
+        health = self._get(name)
+        size = len(health.samples)
+        if health.count < size:
+            return health.samples[:health.count].copy()
+        return np.roll(health.samples, -(health.count % size), axis=0)
+
+    def get_latest(self, name: str) -> Optional[np.ndarray]:
+        """
+        Get the most recent sample of a motor, or None if it has not been sampled yet.
+
+        Args:
+            name (str): Name the motor was registered with
+        """
+        latest = self._get(name).latest()
+        return None if latest is None else latest.copy()
+
+    def _get(self, name: str) -> _MotorHealth:
+        for health in self._motors:
+            if health.name == name:
+                return health
+        raise KeyError(name)
+
+    def _run(self):
+        idx = 0
+        while not self._stop.is_set():
+            motors = self._motors
+            if not motors:
+                self._stop.wait(self.sample_period)
+                continue
+
+            idx %= len(motors)
+            try:
+                self._sample(motors[idx])
+            except Exception as e:
+                logger.warning(f"could not sample {motors[idx].name}: {e}", "[motor_health]")
+
+            idx += 1
+            if idx == len(motors) and self.telemetry_prefix is not None:
+                self._publish(motors)
+            self._stop.wait(self.sample_period / len(motors))
+
+    def _sample(self, health: _MotorHealth):
+        temperature, supply_current, stator_current, faults, brownout = health.motor.read_health()
+        timestamp = Timer.getFPGATimestamp()
+        health.add((timestamp, temperature, supply_current, stator_current, faults))
+
+        if stator_current >= self.stall_current:
+            health.high_current_samples += 1
+        else:
+            health.high_current_samples = 0
+
+        self._update(health, "overheat", temperature >= self.overheat_temperature, temperature, timestamp)
+        self._update(health, "stall", health.high_current_samples >= self.stall_samples, stator_current, timestamp)
+        self._update(health, "brownout", brownout, faults, timestamp)
+
+    def _update(self, health: _MotorHealth, kind: str, active: bool, value: float, timestamp: seconds):
+        # Events fire once when a condition starts, not on every sample while it lasts.
+        if active and kind not in health.active:
+            health.active.add(kind)
+            self._events.put(HealthEvent(health.name, kind, value, timestamp))
+        elif not active:
+            health.active.discard(kind)
+
+    def _publish(self, motors: list[_MotorHealth]):
+        for health in motors:
+            latest = health.latest()
+            if latest is None:
+                continue
+            prefix = f"{self.telemetry_prefix}/{health.name}"
+            SmartDashboard.putNumber(f"{prefix}/temperature", float(latest[_temperature]))
+            SmartDashboard.putNumber(f"{prefix}/supply_current", float(latest[_supply_current]))
+            SmartDashboard.putNumber(f"{prefix}/stator_current", float(latest[_stator_current]))
+            temperatures = health.samples[:, _temperature]
+            if not np.isnan(temperatures).all():
+                SmartDashboard.putNumber(f"{prefix}/max_temperature", float(np.nanmax(temperatures)))
+            SmartDashboard.putBoolean(f"{prefix}/faulted", bool(latest[_faults]))
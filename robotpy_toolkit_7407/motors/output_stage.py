@@ -0,0 +1,130 @@
+import time
+
+from robotpy_toolkit_7407.utils import cycle
+from robotpy_toolkit_7407.utils.units import seconds
+
+
+class OutputStage:
+    """
+    Buffered output stage for motor control frames.
+
+    Motors attached with Motor.set_output_stage record their setpoints here instead of sending them immediately.
+    Writes to the same motor within a cycle are coalesced to the last value, and on flush a setpoint is only sent
+    if it differs from the last sent one by more than epsilon, or if the keep-alive period has elapsed. Epsilon is in
+    the units each motor's setters take (e.g. radians for Talons, rotations for SparkMaxes, volts of feedforward),
+    and each motor converts it to its controller's native units.
+
+    Example usage:
+        stage = OutputStage(epsilon=1e-3)
+        for motor in (m_left, m_right, m_arm):
+            motor.set_output_stage(stage)
+        # stage flushes whenever cycle.advance_cycle() is called
+    """
+
+    def __init__(self, epsilon: float = 1e-4, keepalive_period: seconds = 0.1, flush_on_cycle: bool = True):
+        """
+        Args:
+            epsilon (float, optional): Largest change in a setpoint value that is suppressed, in the units of the
+                motors' setters. Defaults to 1e-4.
+            keepalive_period (seconds, optional): An unchanged setpoint is re-sent after this long. Defaults to 0.1.
+            flush_on_cycle (bool, optional): Flush automatically when cycle.advance_cycle() is called.
+                Defaults to True.
+        """
+        self.epsilon = epsilon
+        self.keepalive_period = keepalive_period
+        self._pending: dict = {}
+        self._last_sent: dict = {}
+        self._tolerances: dict = {}
+
+        self.frames_requested = 0
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+        self.frames_suppressed = 0
+
+        self._flush_on_cycle = flush_on_cycle
+        if flush_on_cycle:
+            cycle.add_cycle_listener(self.flush)
+
+    @property
+    def frames_saved(self) -> int:
+        """
+        Number of control frames that were not sent because they were coalesced or suppressed.
+        """
+        return self.frames_coalesced + self.frames_suppressed
+
+    def write(self, motor, mode, *args: float):
+        """
+        Record a setpoint for a motor, replacing any setpoint already buffered this cycle.
+
+        Args:
+            motor: The motor being written
+            mode: Controller-specific control mode
+            *args (float): Controller-native setpoint values
+        """
+        self.frames_requested += 1
+        if motor in self._pending:
+            self.frames_coalesced += 1
+        self._pending[motor] = (mode, args)
+
+    def flush(self):
+        """
+        Send every buffered setpoint that changed or is due for a keep-alive, then clear the buffer.
+        """
+        now = time.perf_counter()
+        for motor, (mode, args) in self._pending.items():
+            last = self._last_sent.get(motor)
+            if last is not None and last[0] == mode and now - last[2] < self.keepalive_period and \
+                    self._within_tolerance(self._tolerance(motor, mode), last[1], args):
+                self.frames_suppressed += 1
+                continue
+            motor._transmit(mode, *args)
+            self._last_sent[motor] = (mode, args, now)
+            self.frames_sent += 1
+        self._pending.clear()
+
+    def forget(self, motor):
+        """
+        Drop the buffered and last sent setpoint of a motor, so its next setpoint is always sent. Use this when the
+        motor's control mode was changed outside the output stage.
+
+        Args:
+            motor: The motor to forget
+        """
+        self._pending.pop(motor, None)
+        self._last_sent.pop(motor, None)
+        self._tolerances.pop(motor, None)
+
+    def reset_stats(self):
+        """
+        Reset the frame counters.
+        """
+        self.frames_requested = 0
+        self.frames_sent = 0
+        self.frames_coalesced = 0
+        self.frames_suppressed = 0
+
+    def close(self):
+        """
+        Flush any buffered setpoints and stop flushing on cycle advance.
+        """
+        self.flush()
+        if self._flush_on_cycle:
+            cycle.remove_cycle_listener(self.flush)
+            self._flush_on_cycle = False
+
+    def _tolerance(self, motor, mode) -> tuple[float, ...]:
+        # Native tolerances are converted once per motor and control mode
+        tolerances = self._tolerances.setdefault(motor, {})
+        tolerance = tolerances.get(mode)
+        if tolerance is None:
+            tolerance = tolerances[mode] = motor._output_tolerance(mode, self.epsilon)
+        return tolerance
+
+    @staticmethod
+    def _within_tolerance(tolerance: tuple, last: tuple, current: tuple) -> bool:
+        if len(last) != len(current) or len(tolerance) != len(current):
+            return False
+        for a, b, tol in zip(last, current, tolerance):
+            if abs(a - b) > tol:
+                return False
+        return True
@@ -1,12 +1,16 @@
 from builtins import type
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from typing import Optional
 
-from rev import CANSparkMax, SparkMaxPIDController, SparkMaxRelativeEncoder, SparkMaxAlternateEncoder
+from rev import CANSparkMax, SparkMaxPIDController, SparkMaxRelativeEncoder, SparkMaxAlternateEncoder, \
+    SparkMaxLimitSwitch, REVLibError
 
-from robotpy_toolkit_7407.motor import PIDMotor
+from robotpy_toolkit_7407.motor import PIDMotor, MotorGroup, GainProfile, velocity_feedforward, gain_profile_slots, \
+    resolve_gain_slot, k_max_gain_profiles
+from robotpy_toolkit_7407.motors import config_cache
+from robotpy_toolkit_7407.utils.cycle import cycle_cached
 from robotpy_toolkit_7407.utils.units import rev, minute, radians, radians_per_second, rad, s, rotations_per_second, \
-    rotations
+    rotations, volts
 
 from robotpy_toolkit_7407.unum import Unum
 
@@ -25,6 +29,19 @@ class SparkMaxConfig:
         kF: Feedforward gain
         output_range: The minimum and maximum output of the controller as (min: float, max: float)
         idle_mode: Whether to brake or coast when the motor is not moving
+        k_S: Static feedforward in volts, sent with velocity setpoints as arbitrary feedforward
+        k_V: Velocity feedforward in volts per unit of sensor velocity
+        k_A: Acceleration feedforward in volts per unit of sensor velocity per second
+        gain_profiles: Named gain profiles preloaded into slots 1-3 (in order), selected with the slot argument of
+            the setpoint methods. The top-level gains are slot 0.
+        forward_soft_limit: Position in rotations past which the controller refuses forward output
+        reverse_soft_limit: Position in rotations past which the controller refuses reverse output
+        forward_limit_switch: Whether the controller stops forward output on its forward limit switch input
+        reverse_limit_switch: Whether the controller stops reverse output on its reverse limit switch input
+        limit_switches_normally_closed: Whether the controller's limit switches are normally closed
+        velocity_conversion_factor: Factor the controller applies to the encoder's RPM, which sets the units of
+            sensor velocity, velocity setpoints and velocity gains. Use k_rpm_to_rotations_per_second to work in
+            rotations per second. Velocity is in RPM unless this is set.
     """
 
     k_P: Optional[float] = None
@@ -33,6 +50,16 @@ class SparkMaxConfig:
     k_F: Optional[float] = None
     output_range: Optional[tuple[float, float]] = None
     idle_mode: Optional[CANSparkMax.IdleMode] = None
+    k_S: Optional[volts] = None
+    k_V: Optional[float] = None
+    k_A: Optional[float] = None
+    gain_profiles: Optional[dict[str, GainProfile]] = None
+    forward_soft_limit: Optional[rotations] = None
+    reverse_soft_limit: Optional[rotations] = None
+    forward_limit_switch: Optional[bool] = None
+    reverse_limit_switch: Optional[bool] = None
+    limit_switches_normally_closed: Optional[bool] = None
+    velocity_conversion_factor: Optional[float] = None
 
 
 rev_sensor_unit = Unum.unit("rev_sensor_u", rev / 4096, "rev sensor unit")
@@ -41,8 +68,23 @@ rev_sensor_accel_unit = rev_sensor_vel_unit / s
 
 k_sensor_pos_to_radians = rev.asNumber(rad)
 k_radians_to_sensor_pos = rad.asNumber(rev)
-k_sensor_vel_to_rad_per_sec = (rev / minute).asNumber(rad / s)
-k_rad_per_sec_to_sensor_vel = (rad / s).asNumber(rev / minute)
+k_rpm_to_rotations_per_second = (rev / minute).asNumber(rev / s)
+
+# Config fields only used by the wrapper, never sent to the controller
+_local_config_fields = {"k_S", "k_V", "k_A"}
+
+# Factory defaults of the SparkMax, sent for fields cleared to None since the last apply. Cleared soft limits are
+# disabled and cleared gain profiles are zeroed instead.
+k_factory_defaults = SparkMaxConfig(
+    k_P=0, k_I=0, k_D=0, k_F=0, output_range=(-1, 1), idle_mode=CANSparkMax.IdleMode.kCoast,
+    forward_limit_switch=True, reverse_limit_switch=True, limit_switches_normally_closed=False,
+    velocity_conversion_factor=1
+)
+k_zero_gains = GainProfile(k_P=0, k_I=0, k_D=0, k_F=0, integral_zone=0)
+
+k_default_general_status_ms = 10
+k_default_feedback_status_ms = 20
+k_max_status_ms = 500
 
 
 class SparkMax(PIDMotor):
@@ -52,6 +94,7 @@ class SparkMax(PIDMotor):
     motor: CANSparkMax
     encoder: SparkMaxRelativeEncoder
     pid_controller: SparkMaxPIDController
+    follow_family = "rev"
 
     def __init__(self, can_id: int, inverted: bool = True, brushless: bool = True, config: SparkMaxConfig = None):
         """
@@ -88,26 +131,106 @@ class SparkMax(PIDMotor):
         Args:
             x (float): The output of the motor controller (between -1 and 1)
         """
-        self.motor.set(x)
+        self._write(CANSparkMax.ControlType.kDutyCycle, x, 0.0, 0)
 
-    def set_target_position(self, pos: rotations):
+    def set_target_position(self, pos: rotations, arbitrary_feedforward: volts = 0, slot: int | str = 0):
         """
         Sets the target position of the motor controller in rotations
 
         Args:
             pos (float): The target position of the motor controller in rotations
+            arbitrary_feedforward (volts, optional): Feedforward added by the controller. Defaults to 0.
+            slot (int | str, optional): Gain slot index or gain profile name. Defaults to 0.
+        """
+        slot, _ = resolve_gain_slot(self._config, slot)
+        self._write(CANSparkMax.ControlType.kPosition, pos, arbitrary_feedforward, slot)
+
+    def set_target_velocity(self, vel: float, arbitrary_feedforward: volts | None = None,
+                            accel: float = 0, slot: int | str = 0):
+        """
+        Sets the target velocity of the motor controller in sensor velocity units: RPM, or the units set by the
+        config's velocity_conversion_factor. The feedforward is sent with the setpoint and added by the
+        controller's onboard loop.
+
+        Args:
+            vel (float): The target velocity of the motor controller in sensor velocity units
+            arbitrary_feedforward (volts, optional): Feedforward added by the controller. Defaults to the k_S/k_V/k_A
+                feedforward of the selected gains.
+            accel (float, optional): Target acceleration in sensor velocity units per second, used by the config
+                feedforward. Defaults to 0.
+            slot (int | str, optional): Gain slot index or gain profile name. Defaults to 0.
+        """
+        slot, gains = resolve_gain_slot(self._config, slot)
+        if arbitrary_feedforward is None:
+            arbitrary_feedforward = velocity_feedforward(gains, vel, accel)
+        self._write(CANSparkMax.ControlType.kVelocity, vel, arbitrary_feedforward, slot)
+
+    def _transmit(self, mode: CANSparkMax.ControlType, value: float, feedforward: volts, slot: int):
+        if mode == CANSparkMax.ControlType.kDutyCycle:
+            self.motor.set(value)
+        else:
+            # The slot is part of the setpoint frame, so switching gains costs no extra traffic.
+            self.pid_controller.setReference(value, mode, slot, feedforward)
+
+    def set_position_wrapping(self, min_input: rotations, max_input: rotations):
+        """
+        Treat position setpoints as continuous over a range, so the onboard loop takes the short way around
+
+        Args:
+            min_input (rotations): Start of the range, in rotations
+            max_input (rotations): End of the range, in rotations
+        """
+        self.pid_controller.setPositionPIDWrappingEnabled(True)
+        self.pid_controller.setPositionPIDWrappingMinInput(min_input)
+        self.pid_controller.setPositionPIDWrappingMaxInput(max_input)
+
+    def follow(self, leader: "SparkMax", invert: bool = False):
+        """
+        Follow another SparkMax in hardware
+
+        Args:
+            leader (SparkMax): The motor controller to follow
+            invert (bool, optional): Whether to invert the leader's output. Defaults to False.
         """
-        self.pid_controller.setReference(pos, CANSparkMax.ControlType.kPosition)
+        self.motor.follow(leader.motor, invert)
 
-    def set_target_velocity(self, vel: rotations_per_second):  # Rotations per minute??
+    def set_status_frame_periods(self, general_ms: int = k_default_general_status_ms,
+                                 feedback_ms: int = k_default_feedback_status_ms):
         """
-        Sets the target velocity of the motor controller in rotations per second
+        Set how often the controller sends its periodic status frames
 
         Args:
-            vel (float): The target velocity of the motor controller in rotations per second
+            general_ms (int, optional): Period of status frame 0 (applied output, faults)
+            feedback_ms (int, optional): Period of status frames 1 and 2 (velocity, current, temperature, position)
         """
-        self.pid_controller.setReference(vel, CANSparkMax.ControlType.kVelocity)
+        self.motor.setPeriodicFramePeriod(CANSparkMax.PeriodicFrame.kStatus0, general_ms)
+        self.motor.setPeriodicFramePeriod(CANSparkMax.PeriodicFrame.kStatus1, feedback_ms)
+        self.motor.setPeriodicFramePeriod(CANSparkMax.PeriodicFrame.kStatus2, feedback_ms)
 
+    def minimize_status_frames(self):
+        """
+        Slow the status frames down as far as possible, for followers whose status is never read
+        """
+        self.set_status_frame_periods(k_max_status_ms, k_max_status_ms)
+
+    def read_health(self) -> tuple[float, float, float, int, bool]:
+        """
+        Read the motor's health from the controller. The SparkMax only measures output current, so supply current
+        is estimated from it and the applied output.
+
+        Returns:
+            (temperature in celsius, supply current in amps, stator current in amps, fault bitfield, brownout fault)
+        """
+        stator_current = self.motor.getOutputCurrent()
+        return (
+            self.motor.getMotorTemperature(),
+            stator_current * abs(self.motor.getAppliedOutput()),
+            stator_current,
+            self.motor.getFaults(),
+            self.motor.getFault(CANSparkMax.FaultID.kBrownout)
+        )
+
+    @cycle_cached
     def get_sensor_position(self) -> rotations:
         """
         Gets the sensor position of the motor controller in rotations
@@ -125,28 +248,146 @@ class SparkMax(PIDMotor):
             pos (rotations): The sensor position of the motor controller in rotations
         """
         self.encoder.setPosition(pos)
+        self.invalidate_read_cache()
 
-    def get_sensor_velocity(self) -> rotations_per_second:
+    @cycle_cached
+    def get_sensor_velocity(self) -> float:
         """
-        Gets the sensor velocity of the motor controller in rotations per second
+        Gets the sensor velocity of the motor controller
 
         Returns:
-            (rotations_per_second): The sensor velocity of the motor controller in rotations per second
+            (float): The sensor velocity of the motor controller in RPM, or in the units set by the config's
+                velocity_conversion_factor
         """
         return self.encoder.getVelocity()
 
+    @property
+    def _config_key(self) -> str:
+        return f"SparkMax:{self._can_id}"
+
+    def _read_config_value(self, name: str):
+        if name == "k_P":
+            return self.pid_controller.getP()
+        if name == "k_I":
+            return self.pid_controller.getI()
+        if name == "k_D":
+            return self.pid_controller.getD()
+        if name == "k_F":
+            return self.pid_controller.getFF()
+        if name == "output_range":
+            return self.pid_controller.getOutputMin(), self.pid_controller.getOutputMax()
+        if name == "idle_mode":
+            return self.motor.getIdleMode()
+        if name == "forward_soft_limit":
+            return self.motor.getSoftLimit(CANSparkMax.SoftLimitDirection.kForward)
+        if name == "reverse_soft_limit":
+            return self.motor.getSoftLimit(CANSparkMax.SoftLimitDirection.kReverse)
+        if name == "velocity_conversion_factor":
+            return self.encoder.getVelocityConversionFactor()
+        return None
+
     def _set_config(self, config: SparkMaxConfig):
         if config is None:
             return
-        if config.k_P is not None:
-            self.pid_controller.setP(config.k_P)
-        if config.k_I is not None:
-            self.pid_controller.setI(config.k_I)
-        if config.k_D is not None:
-            self.pid_controller.setD(config.k_D)
-        if config.k_F is not None:
-            self.pid_controller.setFF(config.k_F)
-        if config.output_range is not None:
-            self.pid_controller.setOutputRange(config.output_range[0], config.output_range[1])
-        if config.idle_mode is not None:
-            self.motor.setIdleMode(config.idle_mode)
+        fields = config_cache.fields_to_apply(self._config_key, config, self._read_config_value)
+        target = replace(config, **{
+            name: getattr(k_factory_defaults, name) for name in fields if getattr(config, name) is None
+        })
+        results: dict[str, list[REVLibError]] = {}  # Errors returned while applying each field
+        if "k_P" in fields:
+            results["k_P"] = [self.pid_controller.setP(target.k_P)]
+        if "k_I" in fields:
+            results["k_I"] = [self.pid_controller.setI(target.k_I)]
+        if "k_D" in fields:
+            results["k_D"] = [self.pid_controller.setD(target.k_D)]
+        if "k_F" in fields:
+            results["k_F"] = [self.pid_controller.setFF(target.k_F)]
+        if "output_range" in fields:
+            results["output_range"] = [
+                self.pid_controller.setOutputRange(target.output_range[0], target.output_range[1])
+            ]
+        if "idle_mode" in fields:
+            results["idle_mode"] = [self.motor.setIdleMode(target.idle_mode)]
+        if "velocity_conversion_factor" in fields:
+            results["velocity_conversion_factor"] = [
+                self.encoder.setVelocityConversionFactor(target.velocity_conversion_factor)
+            ]
+        if "gain_profiles" in fields and target.gain_profiles is None:
+            results["gain_profiles"] = [
+                error for slot in range(1, k_max_gain_profiles + 1)
+                for error in self._set_gain_profile(slot, k_zero_gains)
+            ]
+        elif "gain_profiles" in fields:
+            results["gain_profiles"] = [
+                error for name, slot in gain_profile_slots(target).items()
+                for error in self._set_gain_profile(slot, target.gain_profiles[name])
+            ]
+        if "forward_soft_limit" in fields and target.forward_soft_limit is None:
+            results["forward_soft_limit"] = [self.motor.enableSoftLimit(CANSparkMax.SoftLimitDirection.kForward, False)]
+        elif "forward_soft_limit" in fields:
+            results["forward_soft_limit"] = [
+                self.motor.setSoftLimit(CANSparkMax.SoftLimitDirection.kForward, target.forward_soft_limit),
+                self.motor.enableSoftLimit(CANSparkMax.SoftLimitDirection.kForward, True)
+            ]
+        if "reverse_soft_limit" in fields and target.reverse_soft_limit is None:
+            results["reverse_soft_limit"] = [self.motor.enableSoftLimit(CANSparkMax.SoftLimitDirection.kReverse, False)]
+        elif "reverse_soft_limit" in fields:
+            results["reverse_soft_limit"] = [
+                self.motor.setSoftLimit(CANSparkMax.SoftLimitDirection.kReverse, target.reverse_soft_limit),
+                self.motor.enableSoftLimit(CANSparkMax.SoftLimitDirection.kReverse, True)
+            ]
+        limit_switch_fields = fields & {
+            "forward_limit_switch", "reverse_limit_switch", "limit_switches_normally_closed"
+        }
+        if limit_switch_fields:
+            errors = self._set_limit_switches(target)
+            results.update((name, errors) for name in limit_switch_fields)
+
+        cache = config_cache.get_config_cache()
+        if cache is not None:
+            failed = {name for name, errors in results.items() if any(e != REVLibError.kOk for e in errors)}
+            # SparkMax parameters are volatile until burned, so persist them for the cache to stay truthful.
+            # If the burn fails, none of the sent fields survive a power cycle.
+            if fields - _local_config_fields and self.motor.burnFlash() != REVLibError.kOk:
+                failed |= fields - _local_config_fields
+            cache.mark_applied(self._config_key, config, failed)
+
+    def _set_limit_switches(self, config: SparkMaxConfig) -> list[REVLibError]:
+        switch_type = SparkMaxLimitSwitch.Type.kNormallyClosed if config.limit_switches_normally_closed \
+            else SparkMaxLimitSwitch.Type.kNormallyOpen
+        errors = []
+        if config.forward_limit_switch is not None:
+            errors.append(
+                self.motor.getForwardLimitSwitch(switch_type).enableLimitSwitch(config.forward_limit_switch)
+            )
+        if config.reverse_limit_switch is not None:
+            errors.append(
+                self.motor.getReverseLimitSwitch(switch_type).enableLimitSwitch(config.reverse_limit_switch)
+            )
+        return errors
+
+    def _set_gain_profile(self, slot: int, profile: GainProfile) -> list[REVLibError]:
+        errors = []
+        if profile.k_P is not None:
+            errors.append(self.pid_controller.setP(profile.k_P, slot))
+        if profile.k_I is not None:
+            errors.append(self.pid_controller.setI(profile.k_I, slot))
+        if profile.k_D is not None:
+            errors.append(self.pid_controller.setD(profile.k_D, slot))
+        if profile.k_F is not None:
+            errors.append(self.pid_controller.setFF(profile.k_F, slot))
+        if profile.integral_zone is not None:
+            errors.append(self.pid_controller.setIZone(profile.integral_zone, slot))
+        return errors
+
+
+class SparkMaxGroup(MotorGroup):
+    """
+    Group of SparkMax motor controllers. Used when multiple motors act as a single unit with a leader motor
+    """
+    motors: list[SparkMax]
+
+    def __init__(self, *motors: SparkMax, config: SparkMaxConfig = None, leader_idx: int = 0):
+        super().__init__(*motors, leader_idx=leader_idx)
+        for m in self.motors:
+            m._config = config
@@ -0,0 +1,473 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from robotpy_toolkit_7407.motor import PIDMotor, velocity_feedforward, gain_profile_slots, resolve_gain_slot
+from robotpy_toolkit_7407.motors.ctre_motors import TalonConfig, k_radians_to_sensor_pos, k_rad_per_sec_to_sensor_vel
+from robotpy_toolkit_7407.motors.rev_motors import SparkMaxConfig
+from robotpy_toolkit_7407.utils.cycle import cycle_cached
+from robotpy_toolkit_7407.utils.units import radians, radians_per_second, rotations, rotations_per_second, seconds, \
+    volts, radians_per_second_squared
+
+"""
+Simulated motor controllers implementing the full PIDMotor interface.
+
+Every sim motor in a process lives in one SimMotorBank, whose state is a set of NumPy arrays stepped together with
+a DC motor model and an emulation of the controller's onboard PID loop.
+
+Example usage:
+    m_arm = SimTalonFX(3, config=TalonConfig(k_P=0.2))
+    m_arm.init()
+    m_arm.set_target_velocity(10)
+
+    def simulationPeriodic(self):
+        sim_motor_bank.step(0.02)
+"""
+
+_mode_percent = 0
+_mode_position = 1
+_mode_velocity = 2
+
+k_control_period: seconds = 0.001
+
+
+@dataclass
+class DCMotorModel:
+    """
+    Brushed/brushless DC motor characteristics
+
+    Args:
+        stall_torque: Stall torque in newton meters
+        stall_current: Stall current in amps
+        free_speed: Free speed in radians per second
+        free_current: Free current in amps
+        nominal_voltage: Voltage the other characteristics were measured at
+    """
+    stall_torque: float
+    stall_current: float
+    free_speed: radians_per_second
+    free_current: float
+    nominal_voltage: float = 12
+
+    @property
+    def resistance(self) -> float:
+        return self.nominal_voltage / self.stall_current
+
+    @property
+    def k_v(self) -> float:
+        """
+        Speed per volt of back-EMF (radians per second per volt)
+        """
+        return self.free_speed / (self.nominal_voltage - self.resistance * self.free_current)
+
+    @property
+    def k_t(self) -> float:
+        """
+        Torque per amp (newton meters per amp)
+        """
+        return self.stall_torque / self.stall_current
+
+
+falcon_500 = DCMotorModel(4.69, 257, 6380 * 2 * math.pi / 60, 1.5)
+neo = DCMotorModel(2.6, 105, 5676 * 2 * math.pi / 60, 1.8)
+
+
+class SimMotorBank:
+    """
+    State of every simulated motor, stepped together as one set of arrays.
+
+    Positions and velocities are stored in radians at the motor shaft. Setpoints, gains and PID state are stored in
+    each controller's native units so the onboard loop behaves like the real controller's. Outputs, currents and
+    sensor readings are in the controller's direction, which is opposite to the shaft's for inverted motors.
+
+    The onboard loop is a plain PID on the error, like the controllers' Position and Velocity modes. Position
+    setpoints are not profiled, so a Talon that would reach its target with MotionMagic jumps towards it here.
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.size = 0
+        self._capacity = 0
+        self.motors: list = []
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        def grow(name: str, fill: float = 0, dtype=np.float64):
+            new = np.full(capacity, fill, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+        grow("position")
+        grow("velocity")
+        grow("applied_output")
+        grow("current")
+        grow("mode", _mode_percent, np.int8)
+        grow("setpoint")
+        grow("arbitrary_feedforward")
+        grow("k_P")
+        grow("k_I")
+        grow("k_D")
+        grow("k_F")
+        grow("peak_output", 1)
+        grow("integral")
+        grow("last_error")
+        grow("pos_scale", 1)
+        grow("vel_scale", 1)
+        grow("output_scale", 1)
+        grow("leader", -1, np.int64)
+        grow("follow_sign", 1)
+        grow("direction", 1)
+        grow("resistance", 1)
+        grow("k_v", 1)
+        grow("k_t", 1)
+        grow("inertia", 1)
+        grow("damping")
+        grow("wrap_range")
+        self._capacity = capacity
+
+    def add(self, motor, model: DCMotorModel, inertia: float, damping: float, pos_scale: float, vel_scale: float,
+            output_scale: float, inverted: bool = False) -> int:
+        """
+        Register a simulated motor. An inverted motor turns its shaft backwards for positive output, and its
+        sensor reads the shaft negated.
+
+        Returns:
+            int: Index of the motor in the state arrays
+        """
+        if self.size == self._capacity:
+            self._allocate(self._capacity * 2)
+        idx = self.size
+        self.size += 1
+        self.motors.append(motor)
+
+        self.resistance[idx] = model.resistance
+        self.k_v[idx] = model.k_v
+        self.k_t[idx] = model.k_t
+        self.inertia[idx] = inertia
+        self.damping[idx] = damping
+        self.pos_scale[idx] = pos_scale
+        self.vel_scale[idx] = vel_scale
+        self.output_scale[idx] = output_scale
+        self.direction[idx] = -1 if inverted else 1
+        return idx
+
+    def set_control(self, idx: int, mode: int, setpoint: float, arbitrary_feedforward: float = 0):
+        """
+        Set a motor's control mode and setpoint (in native units). Arbitrary feedforward is in percent output.
+        """
+        if self.mode[idx] != mode:
+            self.integral[idx] = 0
+            self.last_error[idx] = 0
+        self.mode[idx] = mode
+        self.setpoint[idx] = setpoint
+        self.arbitrary_feedforward[idx] = arbitrary_feedforward
+
+    def step(self, dt: seconds, substeps: Optional[int] = None, battery_voltage: float = 12):
+        """
+        Advance every simulated motor.
+
+        Args:
+            dt (seconds): Time to advance
+            substeps (int, optional): Number of onboard control loop iterations within dt. Defaults to one per
+                k_control_period, the controllers' 1 ms loop. The I and D terms are scaled to that period, so fewer
+                substeps trade accuracy for speed without changing what the gains mean.
+            battery_voltage (float, optional): Supply voltage. Defaults to 12.
+        """
+        n = self.size
+        if n == 0:
+            return
+
+        if substeps is None:
+            substeps = max(1, round(dt / k_control_period))
+        h = dt / substeps
+        periods = h / k_control_period
+        pos = self.position[:n]
+        vel = self.velocity[:n]
+        mode = self.mode[:n]
+        setpoint = self.setpoint[:n]
+        integral = self.integral[:n]
+        last_error = self.last_error[:n]
+        k_P, k_I, k_D, k_F = self.k_P[:n], self.k_I[:n], self.k_D[:n], self.k_F[:n]
+        peak = self.peak_output[:n]
+        direction = self.direction[:n]
+        leader = self.leader[:n]
+        followers = np.nonzero(leader >= 0)[0]
+        leaders = leader[followers]
+
+        is_position = mode == _mode_position
+        is_closed_loop = mode != _mode_percent
+        wrap = self.wrap_range[:n]
+        is_wrapped = is_position & (wrap > 0)
+        any_wrapped = is_wrapped.any()
+        wrap = np.where(is_wrapped, wrap, 1)
+        feedforward = np.where(mode == _mode_velocity, k_F * setpoint, 0) * self.output_scale[:n]
+
+        # Semi-implicit update: back-EMF and viscous damping are integrated implicitly so the step is stable for
+        # any inertia.
+        drive_gain = h * self.k_t[:n] / (self.resistance[:n] * self.inertia[:n])
+        decay = 1 / (1 + h * (self.k_t[:n] / (self.k_v[:n] * self.resistance[:n]) + self.damping[:n]) /
+                     self.inertia[:n])
+
+        output = self.applied_output[:n]
+        for _ in range(substeps):
+            measured = direction * np.where(is_position, pos * self.pos_scale[:n], vel * self.vel_scale[:n])
+            error = setpoint - measured
+            if any_wrapped:
+                error = np.where(is_wrapped, (error + wrap / 2) % wrap - wrap / 2, error)
+            integral += np.where(is_closed_loop, error * periods, 0)
+            pid = (k_P * error + k_I * integral + k_D * (error - last_error) / periods) * self.output_scale[:n] + \
+                feedforward
+            last_error[:] = np.where(is_closed_loop, error, 0)
+
+            output[:] = np.where(is_closed_loop, np.clip(pid, -peak, peak), np.clip(setpoint, -1, 1))
+            output += self.arbitrary_feedforward[:n]
+            np.clip(output, -1, 1, out=output)
+            if followers.size:
+                output[followers] = output[leaders] * self.follow_sign[:n][followers]
+
+            voltage = direction * output * battery_voltage
+            vel[:] = (vel + drive_gain * voltage) * decay
+            pos += vel * h
+
+        self.current[:n] = (output * battery_voltage - direction * vel / self.k_v[:n]) / self.resistance[:n]
+
+    def reset(self):
+        """
+        Remove every simulated motor.
+        """
+        self.size = 0
+        self.motors = []
+        self._allocate(self._capacity)
+
+
+sim_motor_bank = SimMotorBank()
+
+
+class _SimMotor(PIDMotor):
+    _idx: int = None
+    _selected_slot: int = 0
+    _bank: SimMotorBank
+    _model: DCMotorModel
+    _pos_scale: float
+    _vel_scale: float
+    _output_scale: float
+
+    def __init__(self, can_id: int, inverted: bool, moment_of_inertia: float, damping: float,
+                 bank: Optional[SimMotorBank]):
+        super().__init__()
+        self._can_id = can_id
+        self._inverted = inverted
+        self._inertia = moment_of_inertia
+        self._damping = damping
+        self._bank = sim_motor_bank if bank is None else bank
+        self._slot_gains: dict[int, tuple[float, float, float, float]] = {}
+
+    def init(self):
+        """
+        Register the motor with its sim bank and apply its config
+        """
+        self._idx = self._bank.add(
+            self, self._model, self._inertia, self._damping, self._pos_scale, self._vel_scale, self._output_scale,
+            self._inverted
+        )
+        self._set_config(self._config)
+
+    def _set_config(self, config):
+        if config is None:
+            return
+        bank, idx = self._bank, self._idx
+        if config.k_P is not None:
+            bank.k_P[idx] = config.k_P
+        if config.k_I is not None:
+            bank.k_I[idx] = config.k_I
+        if config.k_D is not None:
+            bank.k_D[idx] = config.k_D
+        if config.k_F is not None:
+            bank.k_F[idx] = config.k_F
+        # Like the controllers' slots, every slot's gains are loaded up front and switched in on selection.
+        self._slot_gains = {0: (bank.k_P[idx], bank.k_I[idx], bank.k_D[idx], bank.k_F[idx])}
+        for name, slot in gain_profile_slots(config).items():
+            profile = config.gain_profiles[name]
+            self._slot_gains[slot] = tuple(
+                0 if gain is None else gain for gain in (profile.k_P, profile.k_I, profile.k_D, profile.k_F)
+            )
+
+    def set_raw_output(self, x: float):
+        self._write(_mode_percent, x, 0.0, self._selected_slot)
+
+    def _transmit(self, mode: int, value: float, feedforward: volts, slot: int):
+        if slot != self._selected_slot:
+            bank, idx = self._bank, self._idx
+            bank.k_P[idx], bank.k_I[idx], bank.k_D[idx], bank.k_F[idx] = self._slot_gains[slot]
+            bank.integral[idx] = 0
+            self._selected_slot = slot
+        self._bank.set_control(self._idx, mode, value, feedforward / self._model.nominal_voltage)
+
+    def _get_position(self) -> radians:
+        return float(self._bank.direction[self._idx] * self._bank.position[self._idx])
+
+    def _get_velocity(self) -> radians_per_second:
+        return float(self._bank.direction[self._idx] * self._bank.velocity[self._idx])
+
+    def _set_position(self, pos: radians):
+        self._bank.position[self._idx] = self._bank.direction[self._idx] * pos
+        self.invalidate_read_cache()
+
+    def get_applied_output(self) -> float:
+        """
+        Get the applied output of the simulated controller (between -1 and 1)
+        """
+        return float(self._bank.applied_output[self._idx])
+
+    def get_stator_current(self) -> float:
+        """
+        Get the simulated motor current in amps
+        """
+        return float(self._bank.current[self._idx])
+
+    def read_health(self) -> tuple[float, float, float, int, bool]:
+        """
+        Read the simulated motor's health. Temperature is not simulated and is NaN.
+        """
+        stator_current = abs(self.get_stator_current())
+        return math.nan, stator_current * abs(self.get_applied_output()), stator_current, 0, False
+
+    def set_status_frame_periods(self, general_ms: int = None, feedback_ms: int = None):
+        pass
+
+    def minimize_status_frames(self):
+        pass
+
+
+class SimTalonFX(_SimMotor):
+    """
+    Simulated TalonFX with the same units as TalonFX: positions in radians and velocities in radians per second.
+    Gains in the TalonConfig are interpreted in Talon native units, like on the real controller.
+    """
+    follow_family = "ctre"
+    _model = falcon_500
+    _pos_scale = k_radians_to_sensor_pos
+    _vel_scale = k_rad_per_sec_to_sensor_vel
+    _output_scale = 1 / 1023
+
+    def __init__(self, can_id: int, inverted: bool = False, config: TalonConfig = None,
+                 moment_of_inertia: float = 1e-3, damping: float = 0, bank: SimMotorBank = None):
+        """
+        Args:
+            can_id (int): CAN ID of the simulated controller
+            inverted (bool, optional): Whether the motor is inverted. Defaults to False.
+            config (TalonConfig, optional): Controller configuration. Defaults to None.
+            moment_of_inertia (float, optional): Load inertia at the motor shaft in kg m^2. Defaults to 1e-3.
+            damping (float, optional): Viscous damping at the motor shaft in N m s / rad. Defaults to 0.
+            bank (SimMotorBank, optional): Bank to simulate in. Defaults to the process-wide sim_motor_bank.
+        """
+        super().__init__(can_id, inverted, moment_of_inertia, damping, bank)
+        self._config = config
+
+    def _set_config(self, config: Optional[TalonConfig]):
+        if config is None:
+            return
+        super()._set_config(config)
+        if config.closed_loop_peak_output is not None:
+            self._bank.peak_output[self._idx] = config.closed_loop_peak_output
+
+    @cycle_cached
+    def get_sensor_position(self) -> radians:
+        return self._get_position()
+
+    def set_sensor_position(self, pos: radians):
+        self._set_position(pos)
+
+    @cycle_cached
+    def get_sensor_velocity(self) -> radians_per_second:
+        return self._get_velocity()
+
+    def set_target_position(self, pos: radians, arbitrary_feedforward: volts = 0, slot: int | str = 0):
+        slot, _ = resolve_gain_slot(self._config, slot)
+        self._write(_mode_position, pos * k_radians_to_sensor_pos, arbitrary_feedforward, slot)
+
+    def set_target_velocity(self, vel: radians_per_second, arbitrary_feedforward: volts | None = None,
+                            accel: radians_per_second_squared = 0, slot: int | str = 0):
+        slot, gains = resolve_gain_slot(self._config, slot)
+        if arbitrary_feedforward is None:
+            arbitrary_feedforward = velocity_feedforward(gains, vel, accel)
+        self._write(_mode_velocity, vel * k_rad_per_sec_to_sensor_vel, arbitrary_feedforward, slot)
+
+    def _output_tolerance(self, mode: int, epsilon: float) -> tuple[float, ...]:
+        if mode == _mode_position:
+            return epsilon * k_radians_to_sensor_pos, epsilon, 0
+        if mode == _mode_velocity:
+            return epsilon * k_rad_per_sec_to_sensor_vel, epsilon, 0
+        return epsilon, epsilon, 0
+
+    def follow(self, master: "SimTalonFX"):
+        self._bank.leader[self._idx] = master._idx
+
+
+class SimSparkMax(_SimMotor):
+    """
+    Simulated SparkMax with the same units as SparkMax: positions in rotations and velocities in RPM, or in the units
+    set by the config's velocity_conversion_factor. Gains in the SparkMaxConfig act on errors in those units.
+    """
+    follow_family = "rev"
+    _model = neo
+    _pos_scale = 1 / (2 * math.pi)
+    _vel_scale = 60 / (2 * math.pi)
+    _output_scale = 1
+
+    def __init__(self, can_id: int, inverted: bool = True, brushless: bool = True, config: SparkMaxConfig = None,
+                 moment_of_inertia: float = 1e-3, damping: float = 0, bank: SimMotorBank = None):
+        """
+        Args:
+            can_id (int): CAN ID of the simulated controller
+            inverted (bool, optional): Whether the motor is inverted. Defaults to True.
+            brushless (bool, optional): Whether the motor is brushless. Defaults to True.
+            config (SparkMaxConfig, optional): Controller configuration. Defaults to None.
+            moment_of_inertia (float, optional): Load inertia at the motor shaft in kg m^2. Defaults to 1e-3.
+            damping (float, optional): Viscous damping at the motor shaft in N m s / rad. Defaults to 0.
+            bank (SimMotorBank, optional): Bank to simulate in. Defaults to the process-wide sim_motor_bank.
+        """
+        super().__init__(can_id, inverted, moment_of_inertia, damping, bank)
+        self._brushless = brushless
+        self._config = config
+
+    def _set_config(self, config: Optional[SparkMaxConfig]):
+        if config is None:
+            return
+        super()._set_config(config)
+        if config.output_range is not None:
+            self._bank.peak_output[self._idx] = max(abs(config.output_range[0]), abs(config.output_range[1]))
+        if config.velocity_conversion_factor is not None:
+            self._bank.vel_scale[self._idx] = self._vel_scale * config.velocity_conversion_factor
+
+    @cycle_cached
+    def get_sensor_position(self) -> rotations:
+        return self._get_position() * self._pos_scale
+
+    def set_sensor_position(self, pos: rotations):
+        self._set_position(pos / self._pos_scale)
+
+    @cycle_cached
+    def get_sensor_velocity(self) -> float:
+        return self._get_velocity() * float(self._bank.vel_scale[self._idx])
+
+    def set_target_position(self, pos: rotations, arbitrary_feedforward: volts = 0, slot: int | str = 0):
+        slot, _ = resolve_gain_slot(self._config, slot)
+        self._write(_mode_position, pos, arbitrary_feedforward, slot)
+
+    def set_target_velocity(self, vel: float, arbitrary_feedforward: volts | None = None,
+                            accel: float = 0, slot: int | str = 0):
+        slot, gains = resolve_gain_slot(self._config, slot)
+        if arbitrary_feedforward is None:
+            arbitrary_feedforward = velocity_feedforward(gains, vel, accel)
+        self._write(_mode_velocity, vel, arbitrary_feedforward, slot)
+
+    def set_position_wrapping(self, min_input: rotations, max_input: rotations):
+        self._bank.wrap_range[self._idx] = max_input - min_input
+
+    def follow(self, leader: "SimSparkMax", invert: bool = False):
+        self._bank.leader[self._idx] = leader._idx
+        self._bank.follow_sign[self._idx] = -1 if invert else 1
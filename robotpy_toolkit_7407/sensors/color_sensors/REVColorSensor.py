@@ -1,5 +1,6 @@
 from rev import ColorSensorV3
 from wpilib import I2C
+from robotpy_toolkit_7407.sensors.color_sensors.color_sensor_multiplexer import ColorSensorMultiplexer
 from robotpy_toolkit_7407.utils.logger import Logger
 
 
@@ -14,7 +15,8 @@ class REVColorSensor:
                  threshold_blue: float = 500,
                  threshold_red: float = 500,
                  threshold_green: float = 400,
-                 debug: bool = False):
+                 debug: bool = False,
+                 multiplexer: ColorSensorMultiplexer = None):
         """
         REVColor Sensor Wrapper for usage with I2C Multiplexer
 
@@ -25,6 +27,8 @@ class REVColorSensor:
             threshold_red (float, optional): Threshold for classification as Red. Defaults to 500.
             threshold_green (float, optional): Used to counteract field lighting issues. Defaults to 400.
             debug (bool, optional): Use to enable debugging flags. Defaults to False.
+            multiplexer (ColorSensorMultiplexer, optional): Shared multiplexer reading the sensor in the background.
+                When given, readings are cached and I2C_address is ignored. Defaults to None.
         """
 
         self.port = sensor_port
@@ -34,8 +38,12 @@ class REVColorSensor:
         self.threshold_green = threshold_green
         self.debug = debug
 
-        self.multiplexer = I2C(I2C.Port.kMXP, self.I2C_address)
-        self.sensor = ColorSensorV3(I2C.Port.kMXP)
+        self.shared_multiplexer = multiplexer
+        if multiplexer is not None:
+            multiplexer.register(sensor_port)
+        else:
+            self.multiplexer = I2C(I2C.Port.kMXP, self.I2C_address)
+            self.sensor = ColorSensorV3(I2C.Port.kMXP)
 
         self.logger = Logger("ColorSensor")
 
@@ -47,6 +55,10 @@ class REVColorSensor:
             tuple[float, float, float, int]: R, G, B, Proximity.
         """
 
+        if self.shared_multiplexer is not None:
+            values = self.shared_multiplexer.get(self.port)
+            return (0, 0, 0, 0) if values is None else values[:4]
+
         self.multiplexer.writeBulk(bytes([self.port]))
         c = self.sensor.getRawColor()
         return c.red, c.green, c.blue, self.sensor.getProximity()
@@ -60,7 +72,7 @@ class REVColorSensor:
 
         vals = self.get_val()
 
-        if vals[0] == 0:
+        if vals[0] == 0 and self.shared_multiplexer is None:
             if self.debug:
                 self.logger.log_warning("Values not found, reinitializing color sensor...")
 
@@ -1 +1,2 @@
-from robotpy_toolkit_7407.sensors.color_sensors.REVColorSensor import REVColorSensor
\ No newline at end of file
+from robotpy_toolkit_7407.sensors.color_sensors.REVColorSensor import REVColorSensor
+from robotpy_toolkit_7407.sensors.color_sensors.color_sensor_multiplexer import ColorSensorMultiplexer
@@ -0,0 +1,147 @@
+import threading
+from typing import Optional
+
+from rev import ColorSensorV3
+from wpilib import I2C, Timer
+
+from robotpy_toolkit_7407.utils import logger
+from robotpy_toolkit_7407.utils.units import seconds
+
+k_color_sensor_address = 0x52
+k_proximity_register = 0x08  # PS_DATA_0, followed by the IR, green, blue and red light sensor data
+k_bulk_read_length = 14
+k_min_backoff = 0.1
+k_max_backoff = 5
+
+
+class _MultiplexedSensor:
+    def __init__(self, port: int):
+        self.port = port
+        self.values: Optional[tuple[int, int, int, int, seconds]] = None
+        self.failures = 0
+        self.retry_time: seconds = 0
+        self.initialized = False
+
+
+class ColorSensorMultiplexer:
+    """
+    Owns an I2C multiplexer and the REV color sensors behind it, and reads them on a background thread.
+
+    Every period, each registered multiplexer port is selected in turn and its sensor's proximity and color
+    registers are read in one 14 byte transaction. The latest values are cached, so REVColorSensor.get_val() and
+    color() return instantly. A sensor that fails to read is re-initialized with an exponential backoff, so an
+    unplugged sensor does not stall the others.
+
+    Example usage:
+        multiplexer = ColorSensorMultiplexer(0x71)
+        left = REVColorSensor(0b0001, multiplexer=multiplexer)
+        right = REVColorSensor(0b0010, multiplexer=multiplexer)
+        multiplexer.start()
+    """
+
+    def __init__(self, I2C_address: int = 0x71, period: seconds = 0.02, i2c_port: I2C.Port = I2C.Port.kMXP):
+        """
+        Args:
+            I2C_address (int, optional): I2C address of the multiplexer. Defaults to 0x71.
+            period (seconds, optional): Time between two reads of the same sensor. Defaults to 0.02.
+            i2c_port (I2C.Port, optional): roboRIO I2C port of the multiplexer. Defaults to the MXP port.
+        """
+        self.I2C_address = I2C_address
+        self.period = period
+        self.i2c_port = i2c_port
+
+        self._multiplexer = I2C(i2c_port, I2C_address)
+        self._sensor_bus = I2C(i2c_port, k_color_sensor_address)
+        self._buffer = bytearray(k_bulk_read_length)
+        self._sensors: dict[int, _MultiplexedSensor] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, port: int):
+        """
+        Start reading the sensor on a multiplexer port.
+
+        Args:
+            port (int): Port bitmask on the multiplexer (0b0001, 0b0010, 0b0100, or 0b1000)
+        """
+        if port not in self._sensors:
+            self._sensors = {**self._sensors, port: _MultiplexedSensor(port)}
+
+    def get(self, port: int) -> Optional[tuple[int, int, int, int, seconds]]:
+        """
+        Get the latest values read from a sensor.
+
+        Args:
+            port (int): Port bitmask on the multiplexer
+
+        Returns:
+            tuple[int, int, int, int, seconds] | None: Red, green, blue, proximity and the FPGA timestamp of the
+                read, or None if the sensor has not been read yet
+        """
+        return self._sensors[port].values
+
+    def start(self):
+        """
+        Start reading on a background daemon thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="color_sensor_multiplexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def poll(self):
+        """
+        Read every registered sensor once. Called by the background thread; call directly when not started.
+        """
+        for sensor in self._sensors.values():
+            now = Timer.getFPGATimestamp()
+            if now < sensor.retry_time:
+                continue
+            try:
+                self._multiplexer.writeBulk(bytes([sensor.port]))
+                if not sensor.initialized:
+                    ColorSensorV3(self.i2c_port)  # Configures the sensor's measurement rates and gain
+                    sensor.initialized = True
+                sensor.values = self._read(now)
+                sensor.failures = 0
+            except (OSError, RuntimeError) as e:
+                self._fail(sensor, now, str(e))
+
+    def _read(self, now: seconds) -> tuple[int, int, int, int, seconds]:
+        buffer = self._buffer
+        if self._sensor_bus.read(k_proximity_register, buffer):
+            raise OSError("read aborted")
+        proximity = buffer[0] | (buffer[1] & 0x07) << 8
+        green = buffer[5] | buffer[6] << 8 | (buffer[7] & 0x0F) << 16
+        blue = buffer[8] | buffer[9] << 8 | (buffer[10] & 0x0F) << 16
+        red = buffer[11] | buffer[12] << 8 | (buffer[13] & 0x0F) << 16
+        if red == green == blue == 0:
+            # A reset sensor reads all zeros until it is configured again
+            raise OSError("sensor returned no data")
+        return red, green, blue, proximity, now
+
+    def _fail(self, sensor: _MultiplexedSensor, now: seconds, reason: str):
+        sensor.failures += 1
+        sensor.initialized = False
+        sensor.values = None  # Stale colors must not outlive a disconnected sensor
+        backoff = min(k_min_backoff * 2 ** (sensor.failures - 1), k_max_backoff)
+        sensor.retry_time = now + backoff
+        if sensor.failures == 1 or backoff == k_max_backoff:
+            logger.warning(f"color sensor on port {sensor.port:#06b} failed ({reason}), retrying in {backoff}s",
+                           "[color_sensor_multiplexer]")
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = Timer.getFPGATimestamp()
+            self.poll()
+            self._stop.wait(max(self.period - (Timer.getFPGATimestamp() - start), 0))
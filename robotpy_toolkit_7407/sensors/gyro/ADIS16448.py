@@ -1,6 +1,7 @@
 import math
 from wpilib import ADIS16448_IMU
 
+from robotpy_toolkit_7407.utils.cycle import cycle_cached
 from robotpy_toolkit_7407.utils.units import radians
 
 from robotpy_toolkit_7407.sensors.gyro.base_gyro import BaseGyro
@@ -11,16 +12,20 @@ class GyroADIS16448(BaseGyro):
     Wrapper class for the ADIS16448 Gyro
     """
     def __init__(self) -> None:
-        self._gyro = ADIS16448_IMU()
+        self._gyro: ADIS16448_IMU | None = None
         self.__offset = 0
 
     def init(self, gyro_start_angle=0):
         """
-        Initialize the gyro
+        Initialize the gyro. The IMU calibrates when it is constructed, so construction is deferred to here where it
+        can run alongside other device bring-up.
         """
+        self._gyro = ADIS16448_IMU()
         self.reset_angle()
         self.__offset = gyro_start_angle
+        self.invalidate_read_cache()
 
+    @cycle_cached
     def get_robot_heading(self) -> radians:
         """
         Returns the angle of the robot's heading in radians (yaw)
@@ -28,6 +33,7 @@ class GyroADIS16448(BaseGyro):
         """
         return math.radians(self._gyro.getGyroAngleZ() + self.__offset)
 
+    @cycle_cached
     def get_robot_pitch(self) -> radians:
         """
         Returns the angle of the robot's pitch in radians
@@ -35,6 +41,7 @@ class GyroADIS16448(BaseGyro):
         """
         return math.radians(self._gyro.getGyroAngleX())
 
+    @cycle_cached
     def get_robot_roll(self) -> radians:
         """
         Returns the angle of the robot's roll in radians
@@ -47,3 +54,4 @@ class GyroADIS16448(BaseGyro):
         Resets the gyro's yaw.
         """
         self.__offset = self.get_robot_heading() - angle
+        self.invalidate_read_cache()
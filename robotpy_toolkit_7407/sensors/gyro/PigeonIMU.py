@@ -1,6 +1,7 @@
 import ctre
 import math
 
+from robotpy_toolkit_7407.utils.cycle import cycle_cached
 from robotpy_toolkit_7407.utils.units import radians
 from robotpy_toolkit_7407.sensors.gyro.base_gyro import BaseGyro
 
@@ -16,14 +17,15 @@ class PigeonIMUGyro_Wrapper(BaseGyro):
             port (int): CAN ID of the Pigeon gyro
         """
         self._gyro = ctre.Pigeon2(port)
-        self._gyro.configMountPose(0, 0, 0)
 
     def init(self, gyro_start_angle=0):
         """
         Initialize gyro
         """
+        self._gyro.configMountPose(0, 0, 0)
         self.reset_angle(gyro_start_angle)
 
+    @cycle_cached
     def get_robot_heading(self) -> radians:
         """
         Returns the angle of the robot's heading in radians (yaw)
@@ -31,6 +33,7 @@ class PigeonIMUGyro_Wrapper(BaseGyro):
         """
         return math.radians(self._gyro.getYaw())
 
+    @cycle_cached
     def get_robot_pitch(self) -> radians:
         """
         Returns the angle of the robot's pitch in radians
@@ -38,6 +41,7 @@ class PigeonIMUGyro_Wrapper(BaseGyro):
         """
         return math.radians(self._gyro.getPitch())
 
+    @cycle_cached
     def get_robot_roll(self) -> radians:
         """
         Returns the angle of the robot's roll in radians
@@ -51,3 +55,4 @@ class PigeonIMUGyro_Wrapper(BaseGyro):
         Resets the gyro's yaw.
         """
         self._gyro.setYaw(math.degrees(angle))
+        self.invalidate_read_cache()
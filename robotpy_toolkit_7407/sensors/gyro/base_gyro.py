@@ -1,7 +1,8 @@
+from robotpy_toolkit_7407.utils.cycle import CycleCache
 from robotpy_toolkit_7407.utils.units import radians
 
 
-class BaseGyro:
+class BaseGyro(CycleCache):
     """
     Extendable class for gyro.
     """
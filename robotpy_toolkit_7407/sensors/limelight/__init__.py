@@ -1 +1,4 @@
-from robotpy_toolkit_7407.sensors.limelight.limelight import Limelight, LimelightController
+from robotpy_toolkit_7407.sensors.limelight.limelight import Limelight, LimelightController, LimelightSnapshot
+from robotpy_toolkit_7407.sensors.limelight.limelight_network import LimelightNetwork, get_limelight_network
+from robotpy_toolkit_7407.sensors.limelight.limelight_results import LimelightResults, FiducialResult, RetroResult, \
+    parse_results
@@ -1,12 +1,64 @@
 import math
-from networktables import NetworkTables
-from wpimath.geometry import Pose3d, Translation3d, Rotation3d
+from dataclasses import dataclass
+from typing import Optional
 
-from robotpy_toolkit_7407.utils.units import m, deg, rad, radians
-from robotpy_toolkit_7407.sensors.odometry import VisionEstimator
+import numpy as np
+from networktables import NetworkTablesInstance
+from wpimath.geometry import Pose3d
+
+from robotpy_toolkit_7407.utils.units import m, deg, rad, radians, seconds
+from robotpy_toolkit_7407.sensors.limelight.limelight_network import get_limelight_network, k_default_server
+from robotpy_toolkit_7407.sensors.limelight.limelight_results import LimelightResults, parse_results
+from robotpy_toolkit_7407.sensors.odometry import VisionEstimator, VisionMeasurement
+from robotpy_toolkit_7407.utils.geometry import array_to_pose3d, se3_from_euler
 
 from wpilib import Timer
 
+k_heartbeat_timeout: seconds = 0.5  # Time without a heartbeat after which frames are polled instead
+# The Limelight flushes NetworkTables right after each frame, so a frame typically reaches the robot's listener a few
+# milliseconds after it is published on the wired robot network. Leaving the delay out dates every capture late.
+k_default_transport_delay: seconds = 0.005
+
+
+@dataclass(frozen=True)
+class LimelightSnapshot:
+    """
+    Values of one Limelight frame, read when the frame's heartbeat arrived, or polled if there is no heartbeat.
+
+    The values are taken from a single NetworkTables value so they belong to the same frame: the JSON dump if it is
+    published, otherwise the botpose_wpiblue (or botpose) array, in which case tx and ty are read from their own
+    entries and can come from an adjacent frame. Only if neither is published is every value read from its own
+    entry, with the same caveat for all of them.
+
+    Args:
+        sequence: Number of frames received before this one
+        timestamp: FPGA timestamp the frame was received at, in seconds
+        capture_timestamp: FPGA timestamp the frame's image was captured at, in seconds
+        tv: Whether the Limelight has a valid target
+        tx: Horizontal offset from the crosshair to the target, in degrees
+        ty: Vertical offset from the crosshair to the target, in degrees
+        tl: Pipeline latency in milliseconds. For frames taken from a botpose array, the total latency.
+        cl: Capture latency in milliseconds. 0 for frames taken from a botpose array.
+        botpose: Robot pose in field space (x, y, z, roll, pitch, yaw, ...) with the origin at the field's center,
+            or None if not published
+        botpose_wpiblue: botpose with the origin at the blue alliance corner of the field, as WPILib odometry
+            expects, or None if not published
+        json: JSON dump of the targeting results, or None if not published
+        results: The JSON dump decoded, or None if it is not published or malformed
+    """
+    sequence: int
+    timestamp: seconds
+    capture_timestamp: seconds
+    tv: bool
+    tx: float
+    ty: float
+    tl: float
+    cl: float
+    botpose: Optional[tuple[float, ...]]
+    botpose_wpiblue: Optional[tuple[float, ...]]
+    json: Optional[str]
+    results: Optional[LimelightResults]
+
 
 class Limelight:
     """
@@ -14,19 +66,47 @@ class Limelight:
     Connect, get, and modify limelight values and settings through the NetworkTables interface.
     """
 
-    def __init__(self, cam_height: float, cam_angle: float, target_height: float = None, robot_ip: str = "10.74.07.2"):
+    def __init__(self, cam_height: float, cam_angle: float, target_height: float = None,
+                 robot_ip: str = k_default_server, name: str = "limelight",
+                 transport_delay: seconds = k_default_transport_delay):
         """
         Args:
             cam_height (float): Height of the limelight camera from the ground in meters.
             cam_angle (float): Camera angle from the horizontal in degrees.
             target_height (float, optional): Height of the target from the ground in meters. Defaults to camera height.
+            robot_ip (str, optional): Address of the NetworkTables server. The connection is shared by every
+                Limelight, so only the first Limelight's address is used.
+            name (str, optional): Name of the Limelight's NetworkTable, e.g. "limelight-front".
+                Defaults to "limelight".
+            transport_delay (seconds, optional): Time from the Limelight publishing a frame to the robot receiving
+                it, subtracted from capture timestamps. Tune it on the robot if pose fusion lags. Frames polled
+                because the firmware publishes no heartbeat are received up to a robot loop later still.
+                Defaults to k_default_transport_delay (5 ms).
         """
 
-        NetworkTables.initialize(server=robot_ip)
-        self.table = NetworkTables.getTable("limelight")
+        self.name = name
+        self.network = get_limelight_network(robot_ip)
+        self.table = self.network.get_table(name)
         self.tx = 0
         self.ty = 0
         self.refs = 0
+        self.transport_delay = transport_delay
+
+        # Entry handles are looked up once; every frame is then read through them from the NT listener thread.
+        self._entries = {
+            key: self.table.getEntry(key)
+            for key in ("tv", "tx", "ty", "tl", "cl", "botpose", "botpose_wpiblue", "json", "hb")
+        }
+        self._snapshot: Optional[LimelightSnapshot] = None
+        self._heartbeat_time: Optional[seconds] = None
+        self._last_frame: Optional[tuple] = None
+        self._frames_received = 0
+        self._last_sequence = -1
+        self._parsed_json: Optional[str] = None
+        self._parsed_results: Optional[LimelightResults] = None
+        self._entries["hb"].addListener(
+            self._on_frame, NetworkTablesInstance.NotifyFlags.NEW | NetworkTablesInstance.NotifyFlags.UPDATE
+        )
         self.k_cam_height = (cam_height * m).asNumber(m)  # Height from ground
         self.k_cam_angle: radians = (cam_angle * deg).asNumber(rad)  # Angle from horizontal
         if target_height is not None:
@@ -60,15 +140,127 @@ class Limelight:
         if self.refs == 0:
             self.led_off()
 
+    def _on_frame(self, entry, key, value, param):
+        # The Limelight bumps its heartbeat once per processed frame, so the frame is read right after it here and
+        # published as one immutable snapshot. Replacing the reference is atomic, so readers never see a half-built
+        # snapshot and never take a lock.
+        timestamp = Timer.getFPGATimestamp()
+        self._heartbeat_time = timestamp
+        self._publish_frame(self._read_frame(), timestamp)
+
+    def _poll(self):
+        # Fallback for firmware that does not publish the heartbeat: read the frame when the snapshot is requested
+        # and publish it only if any value changed since the last frame.
+        frame = self._read_frame()
+        if frame != self._last_frame:
+            self._publish_frame(frame, Timer.getFPGATimestamp())
+
+    def _read_frame(self) -> tuple:
+        # NetworkTables 3 sends every entry separately, so separate entries can belong to different frames. A frame
+        # is therefore built from one value where possible: the JSON dump, else the botpose array.
+        entries = self._entries
+        json = entries["json"].getString(None)
+        results = self._parse(json)
+        if results is not None:
+            targets = results.fiducials or results.retro
+            tx, ty = (targets[0].tx, targets[0].ty) if targets else (0.0, 0.0)
+            return (
+                results.valid, tx, ty, results.latency, results.capture_latency,
+                results.latency + results.capture_latency, results.botpose, results.botpose_wpiblue, json, results
+            )
+
+        botpose = entries["botpose"].getDoubleArray(None)
+        botpose = tuple(botpose) if botpose else None
+        botpose_wpiblue = entries["botpose_wpiblue"].getDoubleArray(None)
+        botpose_wpiblue = tuple(botpose_wpiblue) if botpose_wpiblue else None
+        pose = botpose_wpiblue or botpose
+        if pose is not None and len(pose) > 7:
+            # (x, y, z, roll, pitch, yaw, total latency, tag count, ...); tx and ty are not part of it
+            return (
+                pose[7] > 0, entries["tx"].getDouble(0), entries["ty"].getDouble(0), pose[6], 0.0, pose[6],
+                botpose, botpose_wpiblue, json, None
+            )
+
+        tl = entries["tl"].getDouble(0)
+        cl = entries["cl"].getDouble(0)
+        return (
+            entries["tv"].getDouble(0) == 1, entries["tx"].getDouble(0), entries["ty"].getDouble(0), tl, cl, tl + cl,
+            botpose, botpose_wpiblue, json, None
+        )
+
+    def _parse(self, json: Optional[str]) -> Optional[LimelightResults]:
+        # Identical dumps reuse the last decoded results, so polled frames compare equal and are not parsed again
+        if json != self._parsed_json:
+            self._parsed_json = json
+            self._parsed_results = parse_results(json) if json else None
+        return self._parsed_results
+
+    def _publish_frame(self, frame: tuple, timestamp: seconds):
+        self._last_frame = frame
+        tv, tx, ty, tl, cl, latency_ms, botpose, botpose_wpiblue, json, results = frame
+        self._snapshot = LimelightSnapshot(
+            sequence=self._frames_received,
+            timestamp=timestamp,
+            capture_timestamp=timestamp - latency_ms / 1000 - self.transport_delay,
+            tv=tv,
+            tx=tx,
+            ty=ty,
+            tl=tl,
+            cl=cl,
+            botpose=botpose,
+            botpose_wpiblue=botpose_wpiblue,
+            json=json,
+            results=results
+        )
+        self._frames_received += 1
+        self.network.record_frame(self.name, timestamp)
+
+    def is_connected(self) -> bool:
+        """
+        Whether the Limelight published a frame recently over a connected NetworkTables client.
+        """
+        return self.network.is_camera_connected(self.name)
+
+    def get_update_rate(self) -> float:
+        """
+        Get the rate the Limelight publishes frames at, in frames per second.
+        """
+        return self.network.get_update_rate(self.name)
+
+    def get_snapshot(self) -> Optional[LimelightSnapshot]:
+        """
+        Get the latest frame received from the Limelight, or None if no frame has arrived yet.
+
+        Frames are normally taken from the Limelight's heartbeat. If no heartbeat arrived for
+        k_heartbeat_timeout seconds (e.g. on firmware without "hb"), the entries are polled here instead.
+        """
+        heartbeat_time = self._heartbeat_time
+        if heartbeat_time is None or Timer.getFPGATimestamp() - heartbeat_time > k_heartbeat_timeout:
+            self._poll()
+        return self._snapshot
+
+    def results(self) -> Optional[LimelightResults]:
+        """
+        Get the targeting results of the latest frame, decoded from the Limelight's JSON dump. The JSON is decoded
+        once when the frame arrives, and not at all if its payload is identical to the last decoded one.
+
+        Returns:
+            LimelightResults | None: The results, or None if no frame with valid JSON has arrived
+        """
+        snapshot = self.get_snapshot()
+        return None if snapshot is None else snapshot.results
+
     def update(self):
-        """Update Limelight Values to NetworkTables. Run this every loop to ensure fresh values.
+        """Update Limelight values from the latest frame. Does nothing if no new frame arrived since the last call.
         """
-        c_tx = self.table.getNumber('tx', None)
-        c_ty = self.table.getNumber('ty', None)
-        if c_tx is None or c_ty is None:
+        snapshot = self.get_snapshot()
+        if snapshot is None:
             return "No target found."
-        self.tx = c_tx
-        self.ty = c_ty
+        if snapshot.sequence == self._last_sequence:
+            return
+        self._last_sequence = snapshot.sequence
+        self.tx = snapshot.tx
+        self.ty = snapshot.ty
 
     def calculate_distance(self) -> float:
         """
@@ -94,7 +286,8 @@ class Limelight:
         """
         Get the robot's pose from the limelight's perspective.
         """
-        bot_pose = self.table.getValue("botpose", None)
+        snapshot = self.get_snapshot()
+        bot_pose = None if snapshot is None or snapshot.botpose is None else list(snapshot.botpose)
         if round_to is not None and bot_pose is not None:
             bot_pose = [round(i, round_to) for i in bot_pose]
         return bot_pose
@@ -104,26 +297,62 @@ class LimelightController(VisionEstimator):
     def __init__(self, limelight_list: list[Limelight]):
         super().__init__()
         self.limelights = limelight_list
+        self._last_sequences = [-1] * len(limelight_list)
 
     def get_estimated_robot_pose(self) -> list[Pose3d, float] | None:
         """
-        Returns the robot's pose relative to the field, estimated by the limelight.
+        Returns the robot's pose relative to the field with the blue alliance origin, estimated by the limelight,
+        stamped with the time the frame was captured. Each frame is only returned once; limelights without a new
+        frame with targets give (None, None).
         :return: Limelight estimate of robot pose.
         :rtype: Pose3d | None
         """
         pose_list = []
 
-        for limelight in self.limelights:
-            est_pose = limelight.get_bot_pose()
-
+        for snapshot in self._new_snapshots():
             pose_list.append(
-                (
-                    Pose3d(
-                        Translation3d(est_pose[0], est_pose[1], est_pose[2]),
-                        Rotation3d(est_pose[3], est_pose[4], est_pose[5])
-                    ),
-                    Timer.getFPGATimestamp()
-                ) if est_pose else (None, None)
+                (self._bot_pose(snapshot.botpose_wpiblue), snapshot.capture_timestamp) if snapshot else (None, None)
             )
 
         return pose_list if pose_list else None
+
+    def get_vision_measurements(self) -> list[VisionMeasurement]:
+        """
+        Returns the new robot pose measurements of the limelights with the blue alliance origin, with the tag count
+        and average tag distance the limelights publish in botpose_wpiblue.
+        :return: Vision measurements
+        :rtype: list[VisionMeasurement]
+        """
+        measurements = []
+        for snapshot in self._new_snapshots():
+            if snapshot is None:
+                continue
+            botpose = snapshot.botpose_wpiblue
+            measurements.append(VisionMeasurement(
+                self._bot_pose(botpose),
+                snapshot.capture_timestamp,
+                tag_count=int(botpose[7]) if len(botpose) > 7 else 1,
+                tag_distance=botpose[9] if len(botpose) > 9 else 0
+            ))
+        return measurements
+
+    def _new_snapshots(self) -> list[Optional[LimelightSnapshot]]:
+        # The latest snapshot of each limelight, or None if it has no target or was already returned. Poses are read
+        # from botpose_wpiblue, since botpose is centered on the field and VisionFusion expects the blue origin.
+        snapshots = []
+        for idx, limelight in enumerate(self.limelights):
+            snapshot = limelight.get_snapshot()
+            if snapshot is None or snapshot.sequence == self._last_sequences[idx] or not snapshot.tv or \
+                    not snapshot.botpose_wpiblue:
+                snapshots.append(None)
+                continue
+            self._last_sequences[idx] = snapshot.sequence
+            snapshots.append(snapshot)
+        return snapshots
+
+    @staticmethod
+    def _bot_pose(botpose: tuple[float, ...]) -> Pose3d:
+        # botpose is (x, y, z, roll, pitch, yaw) in meters and degrees
+        pose = np.array(botpose[:6], dtype=float)
+        pose[3:] = np.radians(pose[3:])
+        return array_to_pose3d(se3_from_euler(pose))
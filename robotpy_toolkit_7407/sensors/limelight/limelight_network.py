@@ -0,0 +1,139 @@
+import collections
+import threading
+from typing import Optional
+
+from networktables import NetworkTables
+from wpilib import Timer
+
+from robotpy_toolkit_7407.utils import logger
+from robotpy_toolkit_7407.utils.units import seconds
+
+"""
+Process-wide NetworkTables connection shared by every Limelight.
+
+The NT client is initialized once, the first time a Limelight asks for it. Each camera gets its table by name
+(e.g. "limelight-front"), and the frames it receives are recorded here so connection state and update rate can be
+reported per camera.
+
+Example usage:
+    network = get_limelight_network()
+    network.is_camera_connected("limelight-front")
+    network.get_update_rate("limelight-front")
+"""
+
+k_default_server = "10.74.07.2"
+
+
+class LimelightNetwork:
+    """
+    Shared NetworkTables client and per-camera frame statistics.
+    """
+
+    def __init__(self, server: str = k_default_server, frame_timeout: seconds = 0.5, rate_window: int = 20):
+        """
+        Args:
+            server (str, optional): Address of the NetworkTables server. Defaults to the robot's address.
+            frame_timeout (seconds, optional): A camera with no frame for this long is reported as disconnected.
+                Defaults to 0.5.
+            rate_window (int, optional): Number of recent frames the update rate is measured over. Defaults to 20.
+        """
+        self.server = server
+        self.frame_timeout = frame_timeout
+        self.rate_window = rate_window
+        self._tables = {}
+        self._frame_times: dict[str, collections.deque] = {}
+        self._lock = threading.Lock()
+
+        NetworkTables.initialize(server=server)
+        NetworkTables.addConnectionListener(self._on_connection, immediateNotify=True)
+
+    def _on_connection(self, connected: bool, info):
+        if connected:
+            logger.info(f"connected to {self.server}", "[limelight_network]")
+        else:
+            logger.warning(f"disconnected from {self.server}", "[limelight_network]")
+
+    def get_table(self, name: str):
+        """
+        Get the NetworkTable of a camera. Repeated calls return the same table.
+
+        Args:
+            name (str): Camera name, e.g. "limelight" or "limelight-front"
+        """
+        with self._lock:
+            table = self._tables.get(name)
+            if table is None:
+                table = self._tables[name] = NetworkTables.getTable(name)
+                self._frame_times[name] = collections.deque(maxlen=self.rate_window)
+            return table
+
+    def record_frame(self, name: str, timestamp: seconds):
+        """
+        Record that a camera published a frame. Called by Limelight for every frame received.
+
+        Args:
+            name (str): Camera name
+            timestamp (seconds): FPGA timestamp the frame was received at
+        """
+        self._frame_times[name].append(timestamp)
+
+    def is_connected(self) -> bool:
+        """
+        Whether the NetworkTables client is connected to the server.
+        """
+        return NetworkTables.isConnected()
+
+    def is_camera_connected(self, name: str) -> bool:
+        """
+        Whether the NetworkTables client is connected and a camera published a frame within the frame timeout.
+
+        Args:
+            name (str): Camera name
+        """
+        times = self._frame_times.get(name)
+        if not times or not self.is_connected():
+            return False
+        return Timer.getFPGATimestamp() - times[-1] < self.frame_timeout
+
+    def get_update_rate(self, name: str) -> float:
+        """
+        Get the rate a camera published frames at over the last frames, in frames per second. 0 if the camera is
+        not connected.
+
+        Args:
+            name (str): Camera name
+        """
+        times = tuple(self._frame_times.get(name, ()))
+        if len(times) < 2 or not self.is_camera_connected(name):
+            return 0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def get_status(self) -> dict[str, tuple[bool, float]]:
+        """
+        Get the connection state and update rate of every camera.
+
+        Returns:
+            dict[str, tuple[bool, float]]: (connected, frames per second) keyed by camera name
+        """
+        return {name: (self.is_camera_connected(name), self.get_update_rate(name)) for name in list(self._tables)}
+
+
+_network: Optional[LimelightNetwork] = None
+_network_lock = threading.Lock()
+
+
+def get_limelight_network(server: str = k_default_server) -> LimelightNetwork:
+    """
+    Get the process-wide Limelight network, initializing the NetworkTables client on first use.
+
+    Args:
+        server (str, optional): Address of the NetworkTables server. Only used on first use. Defaults to the
+            robot's address.
+    """
+    global _network
+    with _network_lock:
+        if _network is None:
+            _network = LimelightNetwork(server)
+        elif _network.server != server:
+            logger.warning(f"already connected to {_network.server}, ignoring {server}", "[limelight_network]")
+        return _network
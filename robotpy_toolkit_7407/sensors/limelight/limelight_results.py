@@ -0,0 +1,236 @@
+import json
+from typing import Optional
+
+import numpy as np
+
+"""
+Decoding of the Limelight's JSON results dump into compact slotted records.
+
+Only the standard library and NumPy are used, so results can be parsed and benchmarked off the robot.
+
+Example usage:
+    results = limelight.results()
+    if results is not None and results.valid:
+        for fiducial in results.fiducials:
+            print(fiducial.id, fiducial.robot_to_tag)
+"""
+
+_k_no_pose = (float("nan"),) * 6  # Row of the pose arrays for a fiducial without that pose
+
+
+def _pose(values) -> Optional[tuple[float, ...]]:
+    # Limelight 6-DOF poses are (x, y, z, roll, pitch, yaw) in meters and degrees; missing or short poses are None
+    return tuple(values) if values and len(values) >= 6 else None
+
+
+class FiducialResult:
+    """
+    An AprilTag seen in one Limelight frame. Poses are (x, y, z, roll, pitch, yaw) in meters and degrees, or None if
+    the pipeline did not publish them.
+
+    Args:
+        id: Tag ID
+        family: Tag family, e.g. "16H5C"
+        tx: Horizontal offset from the crosshair to the tag, in degrees
+        ty: Vertical offset from the crosshair to the tag, in degrees
+        ta: Tag area, in percent of the image
+        camera_to_tag: Tag pose in camera space (t6t_cs)
+        robot_to_tag: Tag pose in robot space (t6t_rs)
+        field_to_robot: Robot pose in field space solved from this tag alone (t6r_fs)
+    """
+    __slots__ = ("id", "family", "tx", "ty", "ta", "camera_to_tag", "robot_to_tag", "field_to_robot")
+
+    def __init__(self, id: int, family: str, tx: float, ty: float, ta: float,
+                 camera_to_tag: Optional[tuple[float, ...]], robot_to_tag: Optional[tuple[float, ...]],
+                 field_to_robot: Optional[tuple[float, ...]]):
+        self.id = id
+        self.family = family
+        self.tx = tx
+        self.ty = ty
+        self.ta = ta
+        self.camera_to_tag = camera_to_tag
+        self.robot_to_tag = robot_to_tag
+        self.field_to_robot = field_to_robot
+
+    def __repr__(self):
+        return f"FiducialResult(id={self.id}, tx={self.tx}, ty={self.ty}, ta={self.ta})"
+
+
+class RetroResult:
+    """
+    A retroreflective target seen in one Limelight frame. Poses are (x, y, z, roll, pitch, yaw) in meters and
+    degrees, and are None unless the pipeline solves 3D poses.
+
+    Args:
+        tx: Horizontal offset from the crosshair to the target, in degrees
+        ty: Vertical offset from the crosshair to the target, in degrees
+        ta: Target area, in percent of the image
+        camera_to_target: Target pose in camera space (t6t_cs)
+        robot_to_target: Target pose in robot space (t6t_rs)
+    """
+    __slots__ = ("tx", "ty", "ta", "camera_to_target", "robot_to_target")
+
+    def __init__(self, tx: float, ty: float, ta: float, camera_to_target: Optional[tuple[float, ...]],
+                 robot_to_target: Optional[tuple[float, ...]]):
+        self.tx = tx
+        self.ty = ty
+        self.ta = ta
+        self.camera_to_target = camera_to_target
+        self.robot_to_target = robot_to_target
+
+    def __repr__(self):
+        return f"RetroResult(tx={self.tx}, ty={self.ty}, ta={self.ta})"
+
+
+class LimelightResults:
+    """
+    The targeting results of one Limelight frame, decoded from its JSON dump.
+
+    The per-tag arrays (fiducial_ids, robot_to_tags, camera_to_tags) are built on first use and cached, so frames
+    that are only checked for a target never pay for them.
+
+    Args:
+        timestamp: Limelight's own timestamp of the frame, in milliseconds
+        latency: Pipeline latency in milliseconds
+        capture_latency: Capture latency in milliseconds, or 0 if the firmware does not publish it
+        pipeline: Index of the pipeline that produced the frame
+        valid: Whether the frame has a valid target
+        botpose: Robot pose in field space solved from all tags, or None if the pipeline does not publish it
+        botpose_wpiblue: botpose with the blue alliance driver station at the origin, or None
+        botpose_wpired: botpose with the red alliance driver station at the origin, or None
+        fiducials: AprilTags seen in the frame
+        retro: Retroreflective targets seen in the frame
+    """
+    __slots__ = ("timestamp", "latency", "capture_latency", "pipeline", "valid", "botpose", "botpose_wpiblue",
+                 "botpose_wpired", "fiducials", "retro", "_fiducial_ids", "_robot_to_tags", "_camera_to_tags")
+
+    def __init__(self, timestamp: float, latency: float, capture_latency: float, pipeline: int, valid: bool,
+                 botpose: Optional[tuple[float, ...]], botpose_wpiblue: Optional[tuple[float, ...]],
+                 botpose_wpired: Optional[tuple[float, ...]], fiducials: tuple[FiducialResult, ...],
+                 retro: tuple[RetroResult, ...]):
+        self.timestamp = timestamp
+        self.latency = latency
+        self.capture_latency = capture_latency
+        self.pipeline = pipeline
+        self.valid = valid
+        self.botpose = botpose
+        self.botpose_wpiblue = botpose_wpiblue
+        self.botpose_wpired = botpose_wpired
+        self.fiducials = fiducials
+        self.retro = retro
+        self._fiducial_ids: Optional[np.ndarray] = None
+        self._robot_to_tags: Optional[np.ndarray] = None
+        self._camera_to_tags: Optional[np.ndarray] = None
+
+    def __repr__(self):
+        return f"LimelightResults(timestamp={self.timestamp}, valid={self.valid}, " \
+               f"fiducials={len(self.fiducials)}, retro={len(self.retro)})"
+
+    @property
+    def fiducial_ids(self) -> np.ndarray:
+        """
+        Tag IDs of the fiducials, with shape (N,)
+        """
+        if self._fiducial_ids is None:
+            self._fiducial_ids = np.fromiter((fiducial.id for fiducial in self.fiducials), dtype=np.int64,
+                                             count=len(self.fiducials))
+        return self._fiducial_ids
+
+    @property
+    def robot_to_tags(self) -> np.ndarray:
+        """
+        Tag poses in robot space (x, y, z, roll, pitch, yaw) of the fiducials, with shape (N, 6). Rows of fiducials
+        without the pose are NaN.
+        """
+        if self._robot_to_tags is None:
+            self._robot_to_tags = np.array([fiducial.robot_to_tag or _k_no_pose for fiducial in self.fiducials],
+                                           dtype=float).reshape(-1, 6)
+        return self._robot_to_tags
+
+    @property
+    def camera_to_tags(self) -> np.ndarray:
+        """
+        Tag poses in camera space (x, y, z, roll, pitch, yaw) of the fiducials, with shape (N, 6). Rows of fiducials
+        without the pose are NaN.
+        """
+        if self._camera_to_tags is None:
+            self._camera_to_tags = np.array([fiducial.camera_to_tag or _k_no_pose for fiducial in self.fiducials],
+                                            dtype=float).reshape(-1, 6)
+        return self._camera_to_tags
+
+    def get_fiducial(self, tag_id: int) -> Optional[FiducialResult]:
+        """
+        Get a tag seen in the frame.
+
+        Args:
+            tag_id (int): Tag ID
+
+        Returns:
+            FiducialResult | None: The tag, or None if it was not seen
+        """
+        for fiducial in self.fiducials:
+            if fiducial.id == tag_id:
+                return fiducial
+        return None
+
+
+def parse_results(text: str) -> Optional[LimelightResults]:
+    """
+    Decode the JSON dump of a Limelight frame.
+
+    Args:
+        text (str): The "json" entry of the Limelight's NetworkTable
+
+    Returns:
+        LimelightResults | None: The results, or None if the JSON is malformed
+    """
+    try:
+        results = json.loads(text)["Results"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(results, dict):
+        return None
+
+    try:
+        fiducials = tuple(
+            FiducialResult(
+                int(fiducial["fID"]),
+                fiducial.get("fam", ""),
+                fiducial.get("tx", 0.0),
+                fiducial.get("ty", 0.0),
+                fiducial.get("ta", 0.0),
+                _pose(fiducial.get("t6t_cs")),
+                _pose(fiducial.get("t6t_rs")),
+                _pose(fiducial.get("t6r_fs"))
+            )
+            for fiducial in results.get("Fiducial", ())
+        )
+        retro = tuple(
+            RetroResult(
+                target.get("tx", 0.0),
+                target.get("ty", 0.0),
+                target.get("ta", 0.0),
+                _pose(target.get("t6t_cs")),
+                _pose(target.get("t6t_rs"))
+            )
+            for target in results.get("Retro", ())
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    botpose = results.get("botpose")
+    botpose_wpiblue = results.get("botpose_wpiblue")
+    botpose_wpired = results.get("botpose_wpired")
+    return LimelightResults(
+        timestamp=results.get("ts", 0.0),
+        latency=results.get("tl", 0.0),
+        capture_latency=results.get("cl", 0.0),
+        pipeline=int(results.get("pID", 0)),
+        valid=results.get("v", 0) == 1,
+        botpose=tuple(botpose) if botpose else None,
+        botpose_wpiblue=tuple(botpose_wpiblue) if botpose_wpiblue else None,
+        botpose_wpired=tuple(botpose_wpired) if botpose_wpired else None,
+        fiducials=fiducials,
+        retro=retro
+    )
+
@@ -1,5 +1,12 @@
+import collections
+import threading
+from typing import Callable, Optional
+
 import wpilib
 
+from robotpy_toolkit_7407.motor import EncoderMotor
+from robotpy_toolkit_7407.utils.units import seconds
+
 
 class LimitSwitch:
     """
@@ -15,6 +22,19 @@ class LimitSwitch:
         self.limit_switch = wpilib.DigitalInput(port)
         self.reverse = inverted
 
+        self.debounce: seconds = 0
+        self._interrupt: Optional[wpilib.AsynchronousInterrupt] = None
+        self._glitch_filter: Optional[wpilib.DigitalGlitchFilter] = None
+        self._edges: collections.deque[tuple[seconds, bool]] = collections.deque(maxlen=16)
+        self._callbacks: list[Callable[[bool, seconds], None]] = []
+        self._pressed: Optional[bool] = None
+        self._last_edge_time: seconds = float("-inf")
+        self._raw_pressed: Optional[bool] = None
+        self._raw_edge_time: seconds = float("-inf")
+        self._settle_notifier: Optional[wpilib.Notifier] = None
+        self._lock = threading.Lock()
+        self.last_press_time: Optional[seconds] = None
+
     def get_value(self):
         """Return if the limit switch is pressed or if object is detected (in the case of non-tactile sensors).
 
@@ -25,6 +45,143 @@ class LimitSwitch:
             return not self.limit_switch.get()
         return self.limit_switch.get()
 
+    def enable_interrupts(self, buffer_size: int = 16, debounce: seconds = 0,
+                          glitch_filter_period: Optional[seconds] = None):
+        """Record every edge of the switch from a roboRIO interrupt instead of polling it, so presses shorter than
+        a robot loop (e.g. a game piece passing a photoelectric switch) are not missed.
+
+        Edges are timestamped by the FPGA and kept in a ring buffer of the last buffer_size edges. Edges within
+        debounce seconds of the previous accepted edge are held back; once the debounce window ends, the switch
+        settles to its current level, recording an edge if it differs from the last accepted state.
+
+        Args:
+            buffer_size (int, optional): Number of edges kept. Defaults to 16.
+            debounce (seconds, optional): Software debounce time. Defaults to 0.
+            glitch_filter_period (seconds, optional): Pulses shorter than this are filtered out in hardware by a
+                DigitalGlitchFilter. The roboRIO only has 3 glitch filters. Defaults to None (no hardware filter).
+        """
+        self.debounce = debounce
+        self._edges = collections.deque(self._edges, maxlen=buffer_size)
+
+        if glitch_filter_period is not None and self._glitch_filter is None:
+            self._glitch_filter = wpilib.DigitalGlitchFilter()
+            self._glitch_filter.add(self.limit_switch)
+        if glitch_filter_period is not None:
+            self._glitch_filter.setPeriodNanoSeconds(int(glitch_filter_period * 1e9))
+
+        if self._interrupt is None:
+            self._pressed = self._raw_pressed = self.get_value()
+            self._interrupt = wpilib.AsynchronousInterrupt(self.limit_switch, self._on_edge)
+            self._interrupt.setInterruptEdges(True, True)
+            self._interrupt.enable()
+
+    def disable_interrupts(self):
+        """Stop recording edges. Recorded edges and callbacks are kept.
+        """
+        if self._interrupt is not None:
+            self._interrupt.disable()
+            self._interrupt = None
+        if self._settle_notifier is not None:
+            self._settle_notifier.stop()
+
+    def add_callback(self, callback: Callable[[bool, seconds], None]):
+        """Call a function on every debounced press and release. Enables interrupts if they are not enabled.
+        The function runs on the interrupt thread, so it must be short and thread safe.
+
+        Args:
+            callback (Callable[[bool, seconds], None]): Called with True on press or False on release, and the
+                FPGA timestamp of the edge
+        """
+        self._callbacks.append(callback)
+        if self._interrupt is None:
+            self.enable_interrupts()
+
+    def was_triggered_since(self, timestamp: seconds) -> bool:
+        """Return if the switch was pressed after a time, even if it has since been released. Requires interrupts.
+
+        Args:
+            timestamp (seconds): FPGA timestamp, e.g. the start of the last robot loop
+
+        Returns:
+            bool: True if there was a press edge after the timestamp
+        """
+        last_press_time = self.last_press_time
+        return last_press_time is not None and last_press_time > timestamp
+
+    def get_edges(self, since: seconds = float("-inf")) -> list[tuple[seconds, bool]]:
+        """Get the recorded edges. Requires interrupts.
+
+        Args:
+            since (seconds, optional): Only return edges after this FPGA timestamp. Defaults to all edges.
+
+        Returns:
+            list[tuple[seconds, bool]]: FPGA timestamp and whether the switch was pressed of each edge, oldest first
+        """
+        return [edge for edge in list(self._edges) if edge[0] > since]
+
+    def zero_on_press(self, motor: EncoderMotor, position: float = 0):
+        """Set a motor's sensor position whenever the switch is pressed. Runs from a roboRIO interrupt, so nothing
+        has to poll the switch in the robot loop.
+
+        Args:
+            motor (EncoderMotor): Motor whose sensor position is set
+            position (float, optional): Sensor position at the switch, in the motor's units. Defaults to 0.
+        """
+        def on_press(pressed: bool, timestamp: seconds):
+            if pressed:
+                motor.set_sensor_position(position)
+
+        self.add_callback(on_press)
+
+    def _on_edge(self, rising: bool, falling: bool):
+        interrupt = self._interrupt
+        if interrupt is None:
+            return
+        edges = []
+        if rising:
+            edges.append((interrupt.getRisingTimestamp(), not self.reverse))
+        if falling:
+            edges.append((interrupt.getFallingTimestamp(), self.reverse))
+        for timestamp, pressed in sorted(edges):
+            self._record_edge(timestamp, pressed)
+
+    def _record_edge(self, timestamp: seconds, pressed: bool):
+        with self._lock:
+            self._raw_pressed = pressed
+            self._raw_edge_time = timestamp
+            settle_time = self._last_edge_time + self.debounce
+            if timestamp < settle_time:
+                # Bouncing: settle to the raw level once the debounce window ends, so the last edge is never lost
+                self._schedule_settle(settle_time)
+                return
+        self._accept_edge(timestamp, pressed)
+
+    def _schedule_settle(self, settle_time: seconds):
+        if self._settle_notifier is None:
+            self._settle_notifier = wpilib.Notifier(self._settle)
+        self._settle_notifier.startSingle(max(settle_time - wpilib.Timer.getFPGATimestamp(), 0))
+
+    def _settle(self):
+        # Runs on the notifier thread when a debounce window ends. The hardware level wins over the recorded raw
+        # edges, in case an edge was missed.
+        pressed = self.get_value()
+        with self._lock:
+            timestamp = self._raw_edge_time if pressed == self._raw_pressed else wpilib.Timer.getFPGATimestamp()
+            self._raw_pressed = pressed
+        self._accept_edge(timestamp, pressed)
+
+    def _accept_edge(self, timestamp: seconds, pressed: bool):
+        with self._lock:
+            if pressed == self._pressed:
+                return
+            self._pressed = pressed
+            self._last_edge_time = timestamp
+            self._edges.append((timestamp, pressed))
+            if pressed:
+                self.last_press_time = timestamp
+        for callback in self._callbacks:
+            callback(pressed, timestamp)
+
 
 class MagneticLimitSwitch(LimitSwitch):
     """
@@ -1 +1,4 @@
-from robotpy_toolkit_7407.sensors.odometry.vision_estimator import VisionEstimator
+from robotpy_toolkit_7407.sensors.odometry.vision_estimator import VisionEstimator, VisionMeasurement
+from robotpy_toolkit_7407.sensors.odometry.vision_fusion import VisionFusion
+from robotpy_toolkit_7407.sensors.odometry.multi_tag_solver import MultiTagSolver, MultiTagSolution, MultiTagEstimator
+from robotpy_toolkit_7407.sensors.odometry.vision_worker import VisionWorker
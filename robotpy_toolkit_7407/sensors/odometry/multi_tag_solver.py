@@ -0,0 +1,351 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from wpimath.geometry import Pose2d, Pose3d
+
+from robotpy_toolkit_7407.sensors.odometry.vision_estimator import VisionEstimator, VisionMeasurement
+from robotpy_toolkit_7407.utils.geometry import array_to_pose2d, array_to_pose3d, pose3d_to_array, se2_from_se3, \
+    se3_compose, se3_from_euler, se3_from_matrix, se3_to_matrix
+from robotpy_toolkit_7407.utils.units import meters
+
+"""
+Robust least-squares robot pose from every tag seen by every camera in a cycle.
+
+Each tag observation (the tag's pose in the robot frame) is expanded into the tag's four corners, and all corners
+of all tags are stacked into arrays. The robot pose is the weighted rigid alignment of the robot-frame corners
+onto the field-frame corners, solved in closed form (2D Procrustes for SE(2), Kabsch for SE(3)). Tags are then
+re-weighted by their residuals (Huber) and the alignment is repeated for a few iterations, so a misdetected tag
+barely moves the result.
+
+Example usage:
+    solver = MultiTagSolver.from_field_layout(field_layout)
+    tag_ids, robot_to_tags = photon_observations([camera_front, camera_back])
+    solution = solver.solve(tag_ids, robot_to_tags)
+"""
+
+k_default_tag_size = 0.1524  # 6 in tags
+
+# Axis change from Limelight target space (x right and y down as seen facing the tag, z into the tag) to the WPILib
+# tag frame (x out of the face, y right as seen facing the tag, z up), applied on the right of robot-to-tag transforms
+_k_limelight_target_to_tag = np.array([
+    [0, 1, 0, 0],
+    [0, 0, -1, 0],
+    [-1, 0, 0, 0],
+    [0, 0, 0, 1],
+], dtype=np.float64)
+
+
+@dataclass
+class MultiTagSolution:
+    """
+    Result of a multi-tag pose solve
+
+    Args:
+        pose: Robot field pose, (x, y, theta) for SE(2) or a 4x4 homogeneous transform for SE(3)
+        covariance: Pose covariance, 3x3 over (x, y, theta) or 6x6 over (x, y, z, rx, ry, rz)
+        tag_ids: IDs of the tags used, one per observation
+        residuals: RMS corner residual of each observation in meters
+        weights: Final robust weight of each observation, from 0 to 1
+        iterations: Number of re-weighting iterations run
+    """
+    pose: np.ndarray
+    covariance: np.ndarray
+    tag_ids: np.ndarray
+    residuals: np.ndarray
+    weights: np.ndarray
+    iterations: int
+
+    def to_pose2d(self) -> Pose2d:
+        """
+        Get the solved pose as a Pose2d
+        """
+        if self.pose.shape == (3,):
+            return array_to_pose2d(self.pose)
+        return array_to_pose2d(se2_from_se3(se3_from_matrix(self.pose)))
+
+    def to_pose3d(self) -> Pose3d:
+        """
+        Get the solved pose as a Pose3d. SE(2) poses are placed on the floor.
+        """
+        if self.pose.shape == (3,):
+            return Pose3d(self.to_pose2d())
+        return array_to_pose3d(se3_from_matrix(self.pose))
+
+
+def transform_matrix(pose) -> np.ndarray:
+    """
+    Convert a Pose3d or Transform3d, or a list of them, to 4x4 homogeneous transforms.
+
+    Args:
+        pose (Pose3d | Transform3d | list): The pose or transform, or a list of them
+
+    Returns:
+        np.ndarray: Transform with shape (4, 4), or (N, 4, 4) for a list
+    """
+    return se3_to_matrix(pose3d_to_array(pose))
+
+
+class MultiTagSolver:
+    """
+    Weighted, robust multi-tag robot pose solver.
+    """
+
+    def __init__(self, field_to_tags: dict[int, np.ndarray], tag_size: meters = k_default_tag_size,
+                 mode: str = "se2", huber_delta: meters = 0.05, max_iterations: int = 5, tolerance: float = 1e-6):
+        """
+        Args:
+            field_to_tags (dict[int, np.ndarray]): 4x4 field-to-tag transform of each tag, keyed by tag ID
+            tag_size (meters, optional): Side length of the tags' black square. Defaults to 6 in.
+            mode (str, optional): "se2" to solve (x, y, theta) or "se3" to solve a full 3D pose. Defaults to "se2".
+            huber_delta (meters, optional): Corner residual beyond which tags are down-weighted. Defaults to 0.05.
+            max_iterations (int, optional): Most re-weighting iterations. Defaults to 5.
+            tolerance (float, optional): Pose change below which iteration stops. Defaults to 1e-6.
+        """
+        if mode not in ("se2", "se3"):
+            raise ValueError(f"Unknown solver mode {mode}, expected 'se2' or 'se3'")
+        self.mode = mode
+        self.huber_delta = huber_delta
+        self.max_iterations = max_iterations
+        self.tolerance = tolerance
+
+        # Tag corners in the tag frame (x out of the face), and in the field frame per tag ID (NaN if unknown)
+        half = tag_size / 2
+        self._tag_corners = np.array([
+            [0, -half, -half, 1], [0, half, -half, 1], [0, half, half, 1], [0, -half, half, 1]
+        ])
+        size = max(field_to_tags, default=-1) + 1
+        self._field_corners = np.full((size, 4, 3), np.nan)
+        for tag_id, field_to_tag in field_to_tags.items():
+            self._field_corners[tag_id] = (field_to_tag @ self._tag_corners.T).T[:, :3]
+
+    @classmethod
+    def from_field_layout(cls, field_layout, **kwargs) -> "MultiTagSolver":
+        """
+        Create a solver from an AprilTagFieldLayout.
+
+        Args:
+            field_layout (AprilTagFieldLayout): Field layout
+            **kwargs: Other MultiTagSolver arguments
+        """
+        tags = field_layout.getTags()
+        field_to_tags = transform_matrix([tag.pose for tag in tags])
+        return cls({tag.ID: field_to_tag for tag, field_to_tag in zip(tags, field_to_tags)}, **kwargs)
+
+    def solve(self, tag_ids, robot_to_tags: np.ndarray, weights=None) -> Optional[MultiTagSolution]:
+        """
+        Solve the robot pose from tag observations.
+
+        Args:
+            tag_ids (array-like): Tag ID of each observation, shape (N,)
+            robot_to_tags (np.ndarray): Observed robot-to-tag transforms, shape (N, 4, 4)
+            weights (array-like, optional): Prior weight of each observation, e.g. from tag distance or camera
+                quality. Defaults to 1.
+
+        Returns:
+            MultiTagSolution | None: The solution, or None if no observed tag is in the field layout
+        """
+        tag_ids = np.asarray(tag_ids, dtype=np.int64)
+        robot_to_tags = np.asarray(robot_to_tags, dtype=np.float64).reshape(-1, 4, 4)
+        prior = np.ones(len(tag_ids)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+        known = (tag_ids >= 0) & (tag_ids < len(self._field_corners))
+        known[known] = ~np.isnan(self._field_corners[tag_ids[known], 0, 0])
+        if not known.any():
+            return None
+        tag_ids, robot_to_tags, prior = tag_ids[known], robot_to_tags[known], prior[known]
+
+        dims = 2 if self.mode == "se2" else 3
+        robot_points = (robot_to_tags @ self._tag_corners.T).transpose(0, 2, 1)[:, :, :dims]  # (N, 4, dims)
+        field_points = self._field_corners[tag_ids][:, :, :dims]
+
+        weights = prior.copy()
+        rotation, translation = np.eye(dims), np.zeros(dims)
+        iterations = 0
+        for iterations in range(1, self.max_iterations + 1):
+            new_rotation, new_translation = self._align(robot_points, field_points, weights)
+            change = np.abs(new_rotation - rotation).max() + np.abs(new_translation - translation).max()
+            rotation, translation = new_rotation, new_translation
+
+            errors = robot_points @ rotation.T + translation - field_points
+            residuals = np.sqrt((errors ** 2).sum(axis=2).mean(axis=1))
+            robust = np.minimum(1, self.huber_delta / np.maximum(residuals, 1e-12))
+            weights = prior * robust
+            if change < self.tolerance:
+                break
+
+        covariance = self._covariance(robot_points, errors, weights, rotation)
+        if dims == 2:
+            pose = np.array([translation[0], translation[1], math.atan2(rotation[1, 0], rotation[0, 0])])
+        else:
+            pose = np.eye(4)
+            pose[:3, :3] = rotation
+            pose[:3, 3] = translation
+        return MultiTagSolution(pose, covariance, tag_ids, residuals, robust, iterations)
+
+    @staticmethod
+    def _align(robot_points: np.ndarray, field_points: np.ndarray, weights: np.ndarray):
+        # Weighted rigid alignment of robot-frame points onto field-frame points
+        dims = robot_points.shape[2]
+        p = robot_points.reshape(-1, dims)
+        q = field_points.reshape(-1, dims)
+        w = np.repeat(weights, robot_points.shape[1])
+        w = w / w.sum()
+        p_mean, q_mean = w @ p, w @ q
+        p_centered, q_centered = p - p_mean, q - q_mean
+
+        if dims == 2:
+            dot = w @ (p_centered * q_centered).sum(axis=1)
+            cross = w @ (p_centered[:, 0] * q_centered[:, 1] - p_centered[:, 1] * q_centered[:, 0])
+            theta = math.atan2(cross, dot)
+            rotation = np.array([[math.cos(theta), -math.sin(theta)], [math.sin(theta), math.cos(theta)]])
+        else:
+            h = (p_centered * w[:, None]).T @ q_centered
+            u, _, vt = np.linalg.svd(h)
+            d = np.sign(np.linalg.det(vt.T @ u.T))
+            rotation = vt.T @ np.diag([1, 1, d]) @ u.T
+        return rotation, q_mean - rotation @ p_mean
+
+    def _covariance(self, robot_points: np.ndarray, errors: np.ndarray, weights: np.ndarray,
+                    rotation: np.ndarray) -> np.ndarray:
+        # Gauss-Newton covariance sigma^2 (J^T W J)^-1 around the solution, sigma^2 from the weighted residuals
+        dims = robot_points.shape[2]
+        rotated = (robot_points @ rotation.T).reshape(-1, dims)
+        w = np.repeat(weights, robot_points.shape[1])
+        m = len(rotated)
+        if dims == 2:
+            jacobian = np.zeros((m, 2, 3))
+            jacobian[:, 0, 0] = jacobian[:, 1, 1] = 1
+            jacobian[:, 0, 2] = -rotated[:, 1]
+            jacobian[:, 1, 2] = rotated[:, 0]
+        else:
+            jacobian = np.zeros((m, 3, 6))
+            jacobian[:, :, :3] = np.eye(3)
+            x, y, z = rotated[:, 0], rotated[:, 1], rotated[:, 2]
+            # d(R p)/d(omega) = -[R p]x
+            jacobian[:, 0, 4], jacobian[:, 0, 5] = z, -y
+            jacobian[:, 1, 3], jacobian[:, 1, 5] = -z, x
+            jacobian[:, 2, 3], jacobian[:, 2, 4] = y, -x
+        information = np.einsum("m,mij,mik->jk", w, jacobian, jacobian)
+        params = jacobian.shape[2]
+        sigma_sq = (w * (errors.reshape(-1, dims) ** 2).sum(axis=1)).sum() / max(m * dims - params, 1)
+        return sigma_sq * np.linalg.pinv(information)
+
+
+def photon_observations(cameras: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Collect the robot-to-tag transforms of every target of the latest frame of PhotonCameras.
+
+    Args:
+        cameras (list[PhotonCamera]): Refreshed cameras
+
+    Returns:
+        (tag IDs with shape (N,), robot-to-tag transforms with shape (N, 4, 4))
+    """
+    tag_ids, robot_to_tags = [], []
+    for camera in cameras:
+        if not camera.latest_targets_all:
+            continue
+        robot_to_camera = pose3d_to_array(camera.camera_to_robot_pose)
+        camera_to_targets = pose3d_to_array([target.relative_pose for target in camera.latest_targets_all])
+        tag_ids.extend(target.ID for target in camera.latest_targets_all)
+        robot_to_tags.append(se3_compose(robot_to_camera, camera_to_targets))
+    if not tag_ids:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 4, 4))
+    return np.array(tag_ids, dtype=np.int64), se3_to_matrix(np.concatenate(robot_to_tags))
+
+
+def limelight_observations(results: list) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Collect the robot-to-tag transforms of every fiducial in Limelight JSON results. The robot space pose (t6t_rs,
+    meters and degrees) gives the tag's position in WPILib robot axes (x forward, y left, z up), and its orientation
+    as Limelight target space axes, which are rotated into the WPILib tag frame the solver uses. Fiducials without a
+    robot space pose are skipped.
+
+    Args:
+        results (list[LimelightResults]): Decoded results of one frame per Limelight, e.g. snapshot.results
+
+    Returns:
+        (tag IDs with shape (N,), robot-to-tag transforms with shape (N, 4, 4))
+    """
+    tag_ids, robot_to_tags = [], []
+    for frame in results:
+        if frame is None or not frame.fiducials:
+            continue
+        tag_ids.append(frame.fiducial_ids)
+        robot_to_tags.append(frame.robot_to_tags)
+    if not tag_ids:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 4, 4))
+    poses = np.concatenate(robot_to_tags)
+    solved = ~np.isnan(poses).any(axis=1)
+    poses = poses[solved]
+    poses[:, 3:6] = np.radians(poses[:, 3:6])
+    return np.concatenate(tag_ids)[solved], se3_to_matrix(se3_from_euler(poses)) @ _k_limelight_target_to_tag
+
+
+class MultiTagEstimator(VisionEstimator):
+    """
+    VisionEstimator solving one robot pose per cycle from the tags of every PhotonCamera and Limelight.
+    """
+
+    def __init__(self, solver: MultiTagSolver, cameras: list = (), limelights: list = ()):
+        """
+        Args:
+            solver (MultiTagSolver): The solver
+            cameras (list[PhotonCamera], optional): PhotonCameras, refreshed by their owner
+            limelights (list[Limelight], optional): Limelights publishing JSON results
+        """
+        super().__init__()
+        self.solver = solver
+        self.cameras = list(cameras)
+        self.limelights = list(limelights)
+        self.latest_solution: Optional[MultiTagSolution] = None
+        self._last_frames: dict[int, object] = {}
+
+    def get_estimated_robot_pose(self) -> list[Pose3d, float] | None:
+        measurements = self.get_vision_measurements()
+        return [(measurement.pose, measurement.timestamp) for measurement in measurements] or None
+
+    def get_vision_measurements(self) -> list[VisionMeasurement]:
+        """
+        Solve one pose from the new frames of every camera. The measurement is stamped with the latest capture
+        time of the frames used: frames captured earlier in the cycle are treated as if taken then, which biases the
+        pose by the robot's motion between captures (a few centimeters at full speed) instead of placing every
+        camera's view at an averaged time none of them was captured at.
+        """
+        cameras = [camera for camera in self.cameras if self._is_new(camera, camera.latest_timestamp)]
+        snapshots = [limelight.get_snapshot() for limelight in self.limelights]
+        snapshots = [
+            snapshot for limelight, snapshot in zip(self.limelights, snapshots)
+            if snapshot is not None and self._is_new(limelight, snapshot.sequence)
+        ]
+        timestamps = [camera.latest_timestamp for camera in cameras] + \
+                     [snapshot.capture_timestamp for snapshot in snapshots]
+        if not timestamps:
+            return []
+
+        photon_ids, photon_tags = photon_observations(cameras)
+        limelight_ids, limelight_tags = limelight_observations([snapshot.results for snapshot in snapshots])
+        tag_ids = np.concatenate((photon_ids, limelight_ids))
+        robot_to_tags = np.concatenate((photon_tags, limelight_tags))
+        if len(tag_ids) == 0:
+            return []
+
+        solution = self.solver.solve(tag_ids, robot_to_tags)
+        if solution is None:
+            return []
+        self.latest_solution = solution
+        distances = np.linalg.norm(robot_to_tags[:, :3, 3], axis=1)
+        return [VisionMeasurement(
+            solution.to_pose3d(),
+            max(timestamps),
+            tag_count=int((solution.weights > 0.5).sum()),
+            tag_distance=float(distances.mean())
+        )]
+
+    def _is_new(self, source, frame) -> bool:
+        if frame is None or self._last_frames.get(id(source)) == frame:
+            return False
+        self._last_frames[id(source)] = frame
+        return True
@@ -1,6 +1,29 @@
+from dataclasses import dataclass
+
 from wpimath.geometry import Pose3d
 from wpilib import Timer
 
+from robotpy_toolkit_7407.utils.units import meters, seconds
+
+
+@dataclass
+class VisionMeasurement:
+    """
+    A robot pose measured by a vision system
+
+    Args:
+        pose: Robot pose relative to the field
+        timestamp: FPGA timestamp the measurement was captured at, in seconds
+        ambiguity: Pose ambiguity reported by the vision system, from 0 (unambiguous) to 1. Defaults to 0.
+        tag_count: Number of tags the pose was solved from. Defaults to 1.
+        tag_distance: Average distance from the camera to those tags in meters, or 0 if unknown. Defaults to 0.
+    """
+    pose: Pose3d
+    timestamp: seconds
+    ambiguity: float = 0
+    tag_count: int = 1
+    tag_distance: meters = 0
+
 
 class VisionEstimator:
     """
@@ -17,3 +40,15 @@ class VisionEstimator:
         :rtype: list[Pose3d, seconds: float] | None
         """
         raise NotImplementedError
+
+    def get_vision_measurements(self) -> list[VisionMeasurement]:
+        """
+        Returns the new vision measurements of the robot's pose. Override this method to report ambiguity and tag
+        information; by default the poses of get_estimated_robot_pose are wrapped.
+        :return: Vision measurements
+        :rtype: list[VisionMeasurement]
+        """
+        poses = self.get_estimated_robot_pose()
+        if not poses:
+            return []
+        return [VisionMeasurement(pose, timestamp) for pose, timestamp in poses if pose is not None]
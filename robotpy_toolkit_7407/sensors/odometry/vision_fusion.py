@@ -0,0 +1,145 @@
+import math
+from typing import Optional
+
+from wpilib import Timer
+
+from robotpy_toolkit_7407.sensors.odometry.vision_estimator import VisionEstimator, VisionMeasurement
+from robotpy_toolkit_7407.utils import logger
+from robotpy_toolkit_7407.utils.units import meters, radians, seconds
+
+
+class VisionFusion:
+    """
+    Feeds vision measurements from several VisionEstimators into a drivetrain's pose estimator.
+
+    Every update pulls the new measurements of each estimator, rejects outliers, scales the measurement standard
+    deviations by tag distance and tag count, and adds at most max_measurements_per_cycle of the newest remaining
+    measurements to the pose estimator, oldest first.
+
+    Example usage:
+        fusion = VisionFusion(drivetrain, [limelights, photon_odometry], field_length=16.54, field_width=8.02)
+
+        def robotPeriodic(self):
+            fusion.update()
+    """
+
+    def __init__(self, drivetrain, estimators: list[VisionEstimator], field_length: meters, field_width: meters,
+                 field_margin: meters = 0.5, max_height: meters = 0.5, max_tilt: radians = math.radians(10),
+                 max_pose_jump: Optional[meters] = 1, max_ambiguity: float = 0.2, max_age: seconds = 1,
+                 base_std_devs: tuple[float, float, float] = (0.05, 0.05, 0.1), distance_scale: float = 0.25,
+                 max_measurements_per_cycle: int = 4):
+        """
+        Args:
+            drivetrain (SwerveDrivetrain): Drivetrain whose odometry_estimator measurements are added to
+            estimators (list[VisionEstimator]): Vision estimators to pull measurements from
+            field_length (meters): Field length in meters
+            field_width (meters): Field width in meters. Measurements must use WPILib's blue alliance origin, so
+                poses on the field lie between (0, 0) and (field_length, field_width).
+            field_margin (meters, optional): Distance outside the field a pose may lie. Defaults to 0.5.
+            max_height (meters, optional): Largest absolute robot height accepted. Defaults to 0.5.
+            max_tilt (radians, optional): Largest absolute robot roll or pitch accepted. Defaults to 10 degrees.
+            max_pose_jump (meters, optional): Farthest a pose may be from the current estimate, or None to accept
+                any distance (e.g. before the robot's starting pose is known). Defaults to 1.
+            max_ambiguity (float, optional): Largest ambiguity accepted. Defaults to 0.2.
+            max_age (seconds, optional): Oldest measurement accepted. Defaults to 1.
+            base_std_devs (tuple[float, float, float], optional): Standard deviations (x meters, y meters,
+                theta radians) of a single-tag measurement at zero distance. Defaults to (0.05, 0.05, 0.1).
+            distance_scale (float, optional): Growth of the standard deviations per squared meter of tag
+                distance. Defaults to 0.25.
+            max_measurements_per_cycle (int, optional): Most measurements added per update. Defaults to 4.
+        """
+        self.drivetrain = drivetrain
+        self.estimators = estimators
+        self.field_length = field_length
+        self.field_width = field_width
+        self.field_margin = field_margin
+        self.max_height = max_height
+        self.max_tilt = max_tilt
+        self.max_pose_jump = max_pose_jump
+        self.max_ambiguity = max_ambiguity
+        self.max_age = max_age
+        self.base_std_devs = base_std_devs
+        self.distance_scale = distance_scale
+        self.max_measurements_per_cycle = max_measurements_per_cycle
+
+        self.accepted = 0
+        self.rejected: dict[str, int] = {}
+
+    def update(self) -> int:
+        """
+        Pull, filter and add the new vision measurements. Call once per cycle after the odometry update.
+
+        Returns:
+            int: Number of measurements added to the pose estimator
+        """
+        measurements = []
+        for estimator in self.estimators:
+            try:
+                measurements.extend(estimator.get_vision_measurements())
+            except Exception as e:
+                logger.warning(f"could not read {type(estimator).__name__}: {e}", "[vision_fusion]")
+
+        pose_estimator = self.drivetrain.odometry_estimator
+        current_pose = pose_estimator.getEstimatedPosition()
+        now = Timer.getFPGATimestamp()
+
+        accepted = []
+        for measurement in measurements:
+            reason = self._reject_reason(measurement, current_pose, now)
+            if reason is None:
+                accepted.append(measurement)
+            else:
+                self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+        accepted.sort(key=lambda measurement: measurement.timestamp)
+        if len(accepted) > self.max_measurements_per_cycle:
+            self.rejected["over_cycle_limit"] = self.rejected.get("over_cycle_limit", 0) + \
+                len(accepted) - self.max_measurements_per_cycle
+            accepted = accepted[-self.max_measurements_per_cycle:]
+
+        for measurement in accepted:
+            pose_estimator.addVisionMeasurement(
+                measurement.pose.toPose2d(), measurement.timestamp, self.get_std_devs(measurement)
+            )
+        self.accepted += len(accepted)
+        return len(accepted)
+
+    def get_std_devs(self, measurement: VisionMeasurement) -> tuple[float, float, float]:
+        """
+        Get the standard deviations of a measurement, growing with the square of the tag distance and shrinking
+        with the number of tags.
+
+        Args:
+            measurement (VisionMeasurement): The measurement
+
+        Returns:
+            tuple[float, float, float]: Standard deviations of x (meters), y (meters) and theta (radians)
+        """
+        scale = (1 + self.distance_scale * measurement.tag_distance ** 2) / max(measurement.tag_count, 1)
+        return tuple(std_dev * scale for std_dev in self.base_std_devs)
+
+    def reset_stats(self):
+        """
+        Reset the accepted and rejected measurement counters.
+        """
+        self.accepted = 0
+        self.rejected = {}
+
+    def _reject_reason(self, measurement: VisionMeasurement, current_pose, now: seconds) -> Optional[str]:
+        pose = measurement.pose
+        if now - measurement.timestamp > self.max_age:
+            return "stale"
+        if measurement.ambiguity > self.max_ambiguity:
+            return "ambiguous"
+        if not (-self.field_margin <= pose.X() <= self.field_length + self.field_margin and
+                -self.field_margin <= pose.Y() <= self.field_width + self.field_margin):
+            return "out_of_field"
+        if abs(pose.Z()) > self.max_height:
+            return "height"
+        rotation = pose.rotation()
+        if abs(rotation.X()) > self.max_tilt or abs(rotation.Y()) > self.max_tilt:
+            return "tilt"
+        if self.max_pose_jump is not None and \
+                math.hypot(pose.X() - current_pose.X(), pose.Y() - current_pose.Y()) > self.max_pose_jump:
+            return "pose_jump"
+        return None
@@ -0,0 +1,143 @@
+import collections
+import threading
+from typing import Callable, Optional
+
+from wpimath.geometry import Pose3d
+from wpilib import Timer
+
+from robotpy_toolkit_7407.sensors.odometry.vision_estimator import VisionEstimator, VisionMeasurement
+from robotpy_toolkit_7407.utils import logger
+from robotpy_toolkit_7407.utils.units import seconds
+
+
+class VisionWorker(VisionEstimator):
+    """
+    Runs camera refreshes and pose solving on a background thread and queues the measurements for the main loop.
+
+    The worker polls its sources every poll period and appends their measurements to a bounded queue. When the
+    queue is full the worker waits up to one poll period for the main loop to drain it, then drops the oldest
+    measurements. The main loop drains the queue with get_vision_measurements(), which drops measurements older
+    than max_age. The worker is itself a VisionEstimator, so it can be passed to VisionFusion.
+
+    Example usage:
+        worker = VisionWorker([photon_odometry, limelights], refresh=[camera.refresh])
+        worker.start()
+        fusion = VisionFusion(drivetrain, [worker], field_length=16.54, field_width=8.02)
+    """
+
+    def __init__(self, sources: list[VisionEstimator], refresh: list[Callable[[], None]] = (),
+                 poll_period: seconds = 0.01, max_queue: int = 16, max_age: seconds = 0.5):
+        """
+        Args:
+            sources (list[VisionEstimator]): Estimators polled for measurements on the worker thread
+            refresh (list[Callable[[], None]], optional): Functions called before polling, e.g. PhotonCamera.refresh
+            poll_period (seconds, optional): Time between polls. Defaults to 0.01.
+            max_queue (int, optional): Most measurements queued. Defaults to 16.
+            max_age (seconds, optional): Queued measurements older than this are dropped. Defaults to 0.5.
+        """
+        super().__init__()
+        self.sources = list(sources)
+        self.refresh = list(refresh)
+        self.poll_period = poll_period
+        self.max_queue = max_queue
+        self.max_age = max_age
+
+        self._queue: collections.deque[VisionMeasurement] = collections.deque(maxlen=max_queue)
+        self._drained = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.measurements_queued = 0
+        self.dropped_overflow = 0
+        self.dropped_stale = 0
+
+    def start(self):
+        """
+        Start polling on a background daemon thread.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="vision_worker", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the background thread.
+        """
+        self._stop.set()
+        self._drained.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_vision_measurements(self) -> list[VisionMeasurement]:
+        """
+        Drain the queued measurements without blocking, dropping stale ones. Call from the main thread.
+        :return: Vision measurements, oldest first
+        :rtype: list[VisionMeasurement]
+        """
+        now = Timer.getFPGATimestamp()
+        measurements = []
+        while self._queue:
+            try:
+                measurement = self._queue.popleft()
+            except IndexError:
+                break
+            if now - measurement.timestamp > self.max_age:
+                self.dropped_stale += 1
+            else:
+                measurements.append(measurement)
+        self._drained.set()
+        return measurements
+
+    def get_estimated_robot_pose(self) -> list[Pose3d, float] | None:
+        """
+        Drain the queued measurements as (pose, timestamp) pairs.
+        :return: Vision system estimates of robot pose along with their timestamps.
+        :rtype: list[Pose3d, seconds: float] | None
+        """
+        measurements = self.get_vision_measurements()
+        return [(measurement.pose, measurement.timestamp) for measurement in measurements] or None
+
+    def reset_stats(self):
+        """
+        Reset the queued and dropped measurement counters.
+        """
+        self.measurements_queued = 0
+        self.dropped_overflow = 0
+        self.dropped_stale = 0
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = Timer.getFPGATimestamp()
+            for refresh in self.refresh:
+                try:
+                    refresh()
+                except Exception as e:
+                    logger.warning(f"vision refresh failed: {e}", "[vision_worker]")
+
+            measurements = []
+            for source in self.sources:
+                try:
+                    measurements.extend(source.get_vision_measurements())
+                except Exception as e:
+                    logger.warning(f"could not read {type(source).__name__}: {e}", "[vision_worker]")
+
+            if measurements:
+                self._push(measurements)
+
+            elapsed = Timer.getFPGATimestamp() - start
+            self._stop.wait(max(self.poll_period - elapsed, 0))
+
+    def _push(self, measurements: list[VisionMeasurement]):
+        # Backpressure: give the main loop one poll period to drain a full queue before dropping the oldest.
+        if len(self._queue) + len(measurements) > self.max_queue:
+            self._drained.clear()
+            self._drained.wait(self.poll_period)
+        overflow = len(self._queue) + len(measurements) - self.max_queue
+        if overflow > 0:
+            self.dropped_overflow += overflow
+        for measurement in sorted(measurements, key=lambda measurement: measurement.timestamp):
+            self._queue.append(measurement)
+        self.measurements_queued += len(measurements)
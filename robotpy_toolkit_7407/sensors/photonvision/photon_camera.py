@@ -12,6 +12,7 @@ class PhotonCamera:
         self.height = height
         self.pitch = pitch
         self.scale_constant = scale_constant
+        self.latest_timestamp: float = None
 
     def hasTargets(self):
         return self.camera.hasTargets()
@@ -20,8 +21,25 @@ class PhotonCamera:
         if self.latest_best_target is not None:
             return self.latest_best_target.relative_pose.translation().toTranslation2d() * self.scale_constant
 
-    def refresh(self):  # Call at the beginning of every loop. Saves target for the loop to optimize lookup times.
-        self.latest_targets_all = [PhotonTarget(target) for target in
-                                   self.camera.getLatestResult().getTargets()] if self.hasTargets() else None
-        self.latest_best_target = PhotonTarget(
-            self.camera.getLatestResult().getBestTarget()) if self.hasTargets() else None
+    def refresh(self) -> list[PhotonTarget] | None:
+        """
+        Fetch the latest result once and rebuild the targets only if it is a new frame. Call at the beginning of
+        every loop.
+
+        Returns:
+            list[PhotonTarget] | None: Targets of the latest frame, or None if it has none
+        """
+        result = self.camera.getLatestResult()
+        timestamp = result.getTimestamp()
+        if timestamp == self.latest_timestamp:
+            return self.latest_targets_all
+        self.latest_timestamp = timestamp
+
+        if result.hasTargets():
+            # The best target is the first target of the result, so it is not built twice.
+            self.latest_targets_all = [PhotonTarget(target) for target in result.getTargets()]
+            self.latest_best_target = self.latest_targets_all[0]
+        else:
+            self.latest_targets_all = None
+            self.latest_best_target = None
+        return self.latest_targets_all
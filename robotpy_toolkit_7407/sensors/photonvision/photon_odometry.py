@@ -1,6 +1,5 @@
 """
 IMPORTANT:
- - THIS DOES NOT WORK YET
  - From the perspective of the driver:
    - Positive X is forward
    - Positive Y is left
@@ -9,99 +8,149 @@ IMPORTANT:
 
 import math
 
-from photonvision import PhotonUtils
-from photonvision._photonvision import RobotPoseEstimator, PoseStrategy
+import numpy as np
 
+from robotpy_toolkit_7407.sensors.odometry import VisionEstimator, VisionMeasurement
 from robotpy_toolkit_7407.sensors.photonvision.photon_target import PhotonTarget, AprilTag
 from robotpy_toolkit_7407.sensors.photonvision.photon_camera import PhotonCamera
-from robotpy_apriltag import AprilTagFieldLayout
 from robotpy_toolkit_7407.sensors.gyro import BaseGyro
-from wpimath.geometry import Pose3d, Translation3d, Rotation3d, Transform2d, Translation2d, Rotation2d, Transform3d
+from robotpy_toolkit_7407.utils import logger
+from robotpy_apriltag import AprilTagFieldLayout
+from robotpy_toolkit_7407.utils.geometry import array_to_pose2d, array_to_pose3d, pose2d_to_array, pose3d_to_array, \
+    se2_compose, se2_from_se3, se2_inverse, se3_compose, se3_inverse
+from wpimath.geometry import Pose2d, Pose3d, Translation3d, Rotation3d
 
 
 def LoadFieldLayout(json_path: str):
     return AprilTagFieldLayout(json_path)
 
 
-class PhotonOdometry:
-    def __init__(self, camera: PhotonCamera, field_layout: dict, gyro: BaseGyro,
+class PhotonOdometry(VisionEstimator):
+    def __init__(self, camera: PhotonCamera, field_layout: dict | AprilTagFieldLayout, gyro: BaseGyro = None,
                  start_pose=Pose3d(Translation3d(0, 0, 0), Rotation3d(roll=0, pitch=0, yaw=0))):
+        """
+        Args:
+            camera (PhotonCamera): Camera, with its pose relative to the robot
+            field_layout (dict | AprilTagFieldLayout): Field layout, or a dict of tag poses and field size
+            gyro (BaseGyro, optional): Deprecated and ignored; poses are solved from the tags alone. Kept so
+                existing positional calls still pass start_pose in the right place.
+            start_pose (Pose3d, optional): Pose estimate before the first tag is seen
+        """
+        super().__init__()
+        if gyro is not None:
+            logger.warning("PhotonOdometry ignores its gyro argument, which is deprecated", "[photon_odometry]")
         self.camera = camera
-        self.field_layout = self.parse_field_layout(field_layout)
-        self.gyro = gyro
+        if isinstance(field_layout, dict):
+            field_layout = self.parse_field_layout(field_layout)
+        self.field_layout = field_layout
         self.pose_estimate = start_pose
+        self._last_timestamp = None
+
+        # Camera-to-robot transform, the inverse of the camera's pose on the robot
+        self._camera_to_robot = se3_inverse(pose3d_to_array(self.camera.camera_to_robot_pose))
+
+        self.tag_poses_3d, self.tag_poses, self.tag_pose_inverses = self._index_tags(self.field_layout)
+
+    @staticmethod
+    def _index_tags(field_layout: AprilTagFieldLayout) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # Dense arrays indexed by tag ID of the field-to-tag poses as (x, y, z, qw, qx, qy, qz), and of their
+        # projections to 2D and inverses as (x, y, theta). Rows of IDs without a tag are NaN.
+        tags = field_layout.getTags()
+        size = max((tag.ID for tag in tags), default=-1) + 1
+        ids = [tag.ID for tag in tags]
+        poses_3d = np.full((size, 7), np.nan)
+        poses_3d[ids] = pose3d_to_array([tag.pose for tag in tags])
+        poses = np.full((size, 3), np.nan)
+        poses[ids] = se2_from_se3(poses_3d[ids])
+        inverses = np.full((size, 3), np.nan)
+        inverses[ids] = se2_inverse(poses[ids])
+        return poses_3d, poses, inverses
 
     def refresh(self):
         self.camera.refresh()
         self.pose_estimate = self.getRobotPose()
 
-    def getRobotPose(self, target: PhotonTarget = None):
+    def getRobotPose(self, target: PhotonTarget = None) -> Pose2d | None:
+        """
+        Solve the robot's field pose from a single tag: field-to-tag, then tag-to-camera, then camera-to-robot.
+
+        Args:
+            target (PhotonTarget, optional): Target to solve from. Defaults to the camera's best target.
 
+        Returns:
+            Pose2d | None: Robot pose, or None if there is no target or its tag is not in the field layout
+        """
         if target is None:
             target = self.camera.latest_best_target
+        pose = self._solve_pose(target)
+        return None if pose is None else array_to_pose2d(se2_from_se3(pose))
 
-        if target is None:
+    def _solve_pose(self, target: PhotonTarget | None) -> np.ndarray | None:
+        # field_to_robot = field_to_tag * tag_to_camera * camera_to_robot, composed in 3D so a pitched or rolled
+        # camera mount is accounted for before the pose is projected to the floor.
+        if target is None or not 0 <= target.ID < len(self.tag_poses_3d):
             return None
 
-        try:
-            field_to_target = self.field_layout.getTagPose(target.ID)
-        except:
+        field_to_tag = self.tag_poses_3d[target.ID]
+        if math.isnan(field_to_tag[0]):
             return None
 
-        camera_to_target = target.relative_pose
-        camera_to_target_TRANSFORM = Transform2d(
-            camera_to_target.translation().toTranslation2d(),
-            camera_to_target.rotation().toRotation2d()
-        )
-
-        camera_to_robot = self.camera.camera_to_robot_pose
-        camera_to_robot_TRANSFORM = Transform2d(
-            camera_to_robot.translation().toTranslation2d(),
-            camera_to_target.rotation().toRotation2d()
-        )
-
-        field_to_target = self.field_layout.getTagPose(target.ID).toPose2d()
-
-        estimated_field_to_robot_pose = PhotonUtils.estimateFieldToRobot(
-            cameraToTarget=camera_to_target_TRANSFORM,
-            cameraToRobot=camera_to_robot_TRANSFORM,
-            fieldToTarget=field_to_target,
-        )
-
-        estimated_field_to_robot_pose = RobotPoseEstimator(
-            self.field_layout,
-            PoseStrategy.CLOSEST_TO_REFERENCE_POSE,
-            [
-                (
-                    self.camera,
-                    Transform3d(
-                        self.camera.camera_to_robot_pose.translation(),
-                        self.camera.camera_to_robot_pose.rotation()
-                    )
-                )
-            ]
-        )
-
-        print("ESTIMATED FIELD TO ROBOT POSE: ", estimated_field_to_robot_pose)
-
-        gyro_angle = self.gyro.get_robot_heading()
-        camera_to_target = target.relative_pose
-        robot_to_camera = self.camera.camera_to_robot_pose
+        tag_to_camera = se3_inverse(pose3d_to_array(target.relative_pose))
+        return se3_compose(se3_compose(field_to_tag, tag_to_camera), self._camera_to_robot)
 
-        theta = math.atan2(robot_to_camera.x, robot_to_camera.y) - gyro_angle
-        h = (robot_to_camera.x ** 2 + robot_to_camera.y ** 2) ** .5
+    def get_pose_relative_to_tag(self, tag_id: int, robot_pose: Pose2d = None) -> Pose2d | None:
+        """
+        Get the robot's pose in a tag's frame (x out of the tag's face), e.g. to align to it.
 
-        field_to_camera = (
-            field_to_target.x - camera_to_target.x,
-            field_to_target.y - camera_to_target.y
-        )
-
-        field_to_robot = (
-            field_to_camera[0] - h * math.sin(theta),
-            field_to_camera[1] - h * math.cos(theta)  # Testing positive did not work
-        )
+        Args:
+            tag_id (int): Tag ID
+            robot_pose (Pose2d, optional): Robot field pose. Defaults to the latest pose estimate.
 
-        return field_to_robot
+        Returns:
+            Pose2d | None: Robot pose relative to the tag, or None if the tag or robot pose is unknown
+        """
+        if robot_pose is None:
+            robot_pose = self.pose_estimate
+        if robot_pose is None or not 0 <= tag_id < len(self.tag_pose_inverses):
+            return None
+        if isinstance(robot_pose, Pose3d):
+            robot_pose = robot_pose.toPose2d()
+        tag_inverse = self.tag_pose_inverses[tag_id]
+        if math.isnan(tag_inverse[0]):
+            return None
+        return array_to_pose2d(se2_compose(tag_inverse, pose2d_to_array(robot_pose)))
+
+    def get_estimated_robot_pose(self) -> list[Pose3d, float] | None:
+        """
+        Returns the robot's pose solved from the camera's latest frame, if it is a new frame with a known tag.
+        :return: Robot pose along with the frame's timestamp.
+        :rtype: list[Pose3d, seconds: float] | None
+        """
+        measurements = self.get_vision_measurements()
+        return [(measurement.pose, measurement.timestamp) for measurement in measurements] or None
+
+    def get_vision_measurements(self) -> list[VisionMeasurement]:
+        """
+        Returns the measurement solved from the camera's best target of its latest frame, with the target's pose
+        ambiguity and distance. Each frame is only returned once.
+        :return: Vision measurements
+        :rtype: list[VisionMeasurement]
+        """
+        timestamp = self.camera.latest_timestamp
+        target = self.camera.latest_best_target
+        if target is None or timestamp is None or timestamp == self._last_timestamp:
+            return []
+        pose = self._solve_pose(target)
+        if pose is None:
+            return []
+        self._last_timestamp = timestamp
+        camera_to_tag = target.relative_pose
+        return [VisionMeasurement(
+            array_to_pose3d(pose),
+            timestamp,
+            ambiguity=target.raw_target.getPoseAmbiguity(),
+            tag_distance=math.hypot(camera_to_tag.X(), camera_to_tag.Y(), camera_to_tag.Z())
+        )]
 
     def parse_field_layout(self, field_layout: dict):
         new_layout: AprilTagFieldLayout = None
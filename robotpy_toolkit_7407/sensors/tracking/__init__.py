@@ -0,0 +1,2 @@
+from robotpy_toolkit_7407.sensors.tracking.target_tracker import TargetTracker, Track, photon_detections, \
+    limelight_detections
@@ -0,0 +1,315 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from robotpy_toolkit_7407.utils.units import meters, meters_per_second, radians, seconds
+
+"""
+Multi-target tracking of vision detections across frames.
+
+Every track is a constant-velocity Kalman filter on the target's position (x forward, y left, meters) in the
+camera or robot frame. All tracks live in fixed-capacity arrays and are predicted and updated together, and each
+frame's detections are assigned to tracks by gated greedy nearest-neighbour on the Mahalanobis distance, so the
+cost per frame is bounded by capacity x max_detections.
+
+Example usage:
+    tracker = TargetTracker(capacity=8)
+
+    def robotPeriodic(self):
+        camera.refresh()
+        # A frame that is not newer than the last update is skipped, so the tracker can be updated every loop
+        tracks = tracker.update(*photon_detections(camera), timestamp=camera.latest_timestamp)
+        if tracks:
+            turret.aim(tracks[0].bearing)
+"""
+
+# Columns of the state array
+_x, _y, _vx, _vy = range(4)
+
+# 99% quantile of the chi-squared distribution with 2 degrees of freedom
+k_default_gate = 9.21
+
+
+def _inverse_2x2(matrices: np.ndarray) -> np.ndarray:
+    # Closed-form inverse of a stack of 2x2 matrices, much cheaper than np.linalg for tiny matrices
+    a, b, c, d = matrices[..., 0, 0], matrices[..., 0, 1], matrices[..., 1, 0], matrices[..., 1, 1]
+    determinant = a * d - b * c
+    inverse = np.empty_like(matrices)
+    inverse[..., 0, 0] = d / determinant
+    inverse[..., 0, 1] = -b / determinant
+    inverse[..., 1, 0] = -c / determinant
+    inverse[..., 1, 1] = a / determinant
+    return inverse
+
+
+@dataclass(frozen=True)
+class Track:
+    """
+    A filtered target
+
+    Args:
+        id: Track ID, unique for the lifetime of the tracker
+        label: Label of the detections the track follows (e.g. AprilTag ID), or -1 if unlabeled
+        x: Distance forward, in meters
+        y: Distance left, in meters
+        vx: Forward velocity, in meters per second
+        vy: Leftward velocity, in meters per second
+        bearing: Counterclockwise angle to the target, in radians
+        range: Distance to the target, in meters
+        hits: Number of detections assigned to the track
+        last_seen: Timestamp of the last detection assigned to the track, in seconds
+    """
+    id: int
+    label: int
+    x: meters
+    y: meters
+    vx: meters_per_second
+    vy: meters_per_second
+    bearing: radians
+    range: meters
+    hits: int
+    last_seen: seconds
+
+
+class TargetTracker:
+    """
+    Gives detections stable track IDs and filters their position and velocity across frames.
+    """
+
+    def __init__(self, capacity: int = 16, max_detections: int = 16, range_std_dev: float = 0.05,
+                 bearing_std_dev: radians = math.radians(1), acceleration_std_dev: float = 2,
+                 gate: float = k_default_gate, min_hits: int = 2, max_coast_time: seconds = 0.5):
+        """
+        Args:
+            capacity (int, optional): Most tracks kept. Defaults to 16.
+            max_detections (int, optional): Most detections used per frame; the rest are ignored. Defaults to 16.
+            range_std_dev (float, optional): Standard deviation of a detection's range, as a fraction of the
+                range. Defaults to 0.05.
+            bearing_std_dev (radians, optional): Standard deviation of a detection's bearing. Defaults to 1 degree.
+            acceleration_std_dev (float, optional): Standard deviation of the targets' acceleration, in meters per
+                second squared. Defaults to 2.
+            gate (float, optional): Largest squared Mahalanobis distance between a track and an assigned
+                detection. Defaults to the 99% gate.
+            min_hits (int, optional): Detections needed before a track is reported. Defaults to 2.
+            max_coast_time (seconds, optional): A track without detections for this long is deleted.
+                Defaults to 0.5.
+        """
+        self.capacity = capacity
+        self.max_detections = max_detections
+        self.range_std_dev = range_std_dev
+        self.bearing_std_dev = bearing_std_dev
+        self.acceleration_std_dev = acceleration_std_dev
+        self.gate = gate
+        self.min_hits = min_hits
+        self.max_coast_time = max_coast_time
+
+        self._state = np.zeros((capacity, 4))
+        self._covariance = np.zeros((capacity, 4, 4))
+        self._active = np.zeros(capacity, dtype=bool)
+        self._ids = np.full(capacity, -1, dtype=np.int64)
+        self._labels = np.full(capacity, -1, dtype=np.int64)
+        self._hits = np.zeros(capacity, dtype=np.int64)
+        self._last_seen = np.zeros(capacity)
+        self._next_id = 0
+        self._timestamp: Optional[seconds] = None
+        self._tracks: list[Track] = []
+
+    def reset(self):
+        """
+        Delete every track.
+        """
+        self._active[:] = False
+        self._timestamp = None
+        self._tracks = []
+
+    def get_tracks(self) -> list[Track]:
+        """
+        Get the confirmed tracks of the last update, most detected first.
+        """
+        return self._tracks
+
+    def update(self, bearings: np.ndarray, ranges: np.ndarray, labels: np.ndarray = None,
+               timestamp: seconds = None) -> list[Track]:
+        """
+        Predict every track to the frame's timestamp, assign the frame's detections to tracks, and start tracks
+        for the unassigned detections. Call once per frame, with empty arrays if the frame has no detections. A frame
+        whose timestamp is not newer than the last one's is ignored and the current tracks are returned, so the
+        same frame is never applied twice.
+
+        Args:
+            bearings (np.ndarray): Counterclockwise angles to the detections in radians, with shape (M,)
+            ranges (np.ndarray): Distances to the detections in meters, with shape (M,)
+            labels (np.ndarray, optional): Labels of the detections (e.g. AprilTag IDs) with shape (M,), or -1 for
+                unlabeled detections. A labeled detection is only assigned to a track with the same label.
+            timestamp (seconds, optional): Capture time of the frame. Defaults to one 20 ms cycle after the last.
+
+        Returns:
+            list[Track]: The confirmed tracks, most detected first
+        """
+        bearings = np.asarray(bearings, dtype=float)[:self.max_detections]
+        ranges = np.asarray(ranges, dtype=float)[:self.max_detections]
+        labels = np.full(len(bearings), -1, dtype=np.int64) if labels is None else \
+            np.asarray(labels, dtype=np.int64)[:self.max_detections]
+
+        if timestamp is None:
+            timestamp = 0 if self._timestamp is None else self._timestamp + 0.02
+        if self._timestamp is not None:
+            if timestamp <= self._timestamp:
+                return self._tracks
+            self._predict(timestamp - self._timestamp)
+        self._timestamp = timestamp
+
+        positions = np.stack((ranges * np.cos(bearings), ranges * np.sin(bearings)), axis=1)
+        noise = self._measurement_noise(bearings, ranges)
+
+        tracks, detections = self._associate(positions, noise, labels)
+        if len(tracks):
+            self._correct(tracks, positions[detections], noise[detections])
+            self._hits[tracks] += 1
+            self._last_seen[tracks] = timestamp
+
+        unassigned = np.ones(len(positions), dtype=bool)
+        unassigned[detections] = False
+        for detection in np.flatnonzero(unassigned):
+            self._start_track(positions[detection], noise[detection], labels[detection], timestamp)
+
+        self._active &= timestamp - self._last_seen <= self.max_coast_time
+        self._tracks = self._confirmed_tracks()
+        return self._tracks
+
+    def _predict(self, dt: seconds):
+        active = self._active
+        if not active.any():
+            return
+        transition = np.eye(4)
+        transition[_x, _vx] = transition[_y, _vy] = dt
+        # Piecewise white noise acceleration
+        q = self.acceleration_std_dev ** 2
+        process_noise = np.zeros((4, 4))
+        process_noise[[_x, _y], [_x, _y]] = q * dt ** 4 / 4
+        process_noise[[_x, _y, _vx, _vy], [_vx, _vy, _x, _y]] = q * dt ** 3 / 2
+        process_noise[[_vx, _vy], [_vx, _vy]] = q * dt ** 2
+
+        self._state[active] = self._state[active] @ transition.T
+        self._covariance[active] = transition @ self._covariance[active] @ transition.T + process_noise
+
+    def _measurement_noise(self, bearings: np.ndarray, ranges: np.ndarray) -> np.ndarray:
+        # (M, 2, 2) Cartesian covariances of polar detections: radial error grows with range, tangential error
+        # with range times bearing error
+        cos, sin = np.cos(bearings), np.sin(bearings)
+        radial = (self.range_std_dev * ranges) ** 2
+        tangential = (self.bearing_std_dev * ranges) ** 2 + 1e-6
+        noise = np.empty((len(bearings), 2, 2))
+        noise[:, 0, 0] = radial * cos ** 2 + tangential * sin ** 2
+        noise[:, 1, 1] = radial * sin ** 2 + tangential * cos ** 2
+        noise[:, 0, 1] = noise[:, 1, 0] = (radial - tangential) * cos * sin
+        return noise
+
+    def _associate(self, positions: np.ndarray, noise: np.ndarray,
+                   labels: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Gated greedy nearest-neighbour: the closest (track, detection) pairs by Mahalanobis distance are assigned
+        # first, and each track and detection is assigned at most once.
+        tracks = np.flatnonzero(self._active)
+        if len(tracks) == 0 or len(positions) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        innovation = positions[None, :, :] - self._state[tracks, None, :2]
+        inverse = _inverse_2x2(self._covariance[tracks, None, :2, :2] + noise[None, :, :, :])
+        distances = np.einsum("tdi,tdij,tdj->td", innovation, inverse, innovation)
+
+        track_labels = self._labels[tracks]
+        mismatched = (labels[None, :] >= 0) & (track_labels[:, None] != labels[None, :])
+        distances[mismatched | (distances > self.gate)] = np.inf
+
+        candidates = int(np.isfinite(distances).sum())
+        rows, columns = np.unravel_index(np.argsort(distances, axis=None)[:candidates], distances.shape)
+        assigned_tracks, assigned_detections = [], []
+        used_rows, used_detections = set(), set()
+        for row, detection in zip(rows.tolist(), columns.tolist()):
+            if row in used_rows or detection in used_detections:
+                continue
+            used_rows.add(row)
+            used_detections.add(detection)
+            assigned_tracks.append(tracks[row])
+            assigned_detections.append(detection)
+        return np.array(assigned_tracks, dtype=np.int64), np.array(assigned_detections, dtype=np.int64)
+
+    def _correct(self, tracks: np.ndarray, positions: np.ndarray, noise: np.ndarray):
+        state, covariance = self._state[tracks], self._covariance[tracks]
+        gain = covariance[:, :, :2] @ _inverse_2x2(covariance[:, :2, :2] + noise)
+        self._state[tracks] = state + (gain @ (positions - state[:, :2])[..., None])[..., 0]
+        self._covariance[tracks] = covariance - gain @ covariance[:, :2, :]
+
+    def _start_track(self, position: np.ndarray, noise: np.ndarray, label: int, timestamp: seconds):
+        free = np.flatnonzero(~self._active)
+        if len(free) == 0:
+            return
+        track = free[0]
+        self._active[track] = True
+        self._state[track] = (position[0], position[1], 0, 0)
+        self._covariance[track] = 0
+        self._covariance[track, :2, :2] = noise
+        self._covariance[track, [_vx, _vy], [_vx, _vy]] = 4 * self.acceleration_std_dev ** 2
+        self._ids[track] = self._next_id
+        self._labels[track] = label
+        self._hits[track] = 1
+        self._last_seen[track] = timestamp
+        self._next_id += 1
+
+    def _confirmed_tracks(self) -> list[Track]:
+        confirmed = np.flatnonzero(self._active & (self._hits >= self.min_hits))
+        confirmed = confirmed[np.argsort(-self._hits[confirmed], kind="stable")]
+        # Converted to Python lists once, rather than indexing NumPy scalars per field
+        return [
+            Track(id, label, x, y, vx, vy, math.atan2(y, x), math.hypot(x, y), hits, last_seen)
+            for id, label, (x, y, vx, vy), hits, last_seen in zip(
+                self._ids[confirmed].tolist(), self._labels[confirmed].tolist(), self._state[confirmed].tolist(),
+                self._hits[confirmed].tolist(), self._last_seen[confirmed].tolist()
+            )
+        ]
+
+
+def photon_detections(camera) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the detections of the latest frame of a PhotonCamera, in the camera's frame. Targets without a solved 3D
+    pose are skipped.
+
+    Args:
+        camera (PhotonCamera): Refreshed camera
+
+    Returns:
+        (bearings, ranges, labels), each with shape (M,). Labels are AprilTag IDs, or -1 for other targets.
+    """
+    bearings, ranges, labels = [], [], []
+    for target in camera.latest_targets_all or ():
+        x, y = target.relative_pose.X(), target.relative_pose.Y()
+        if x == 0 and y == 0:
+            continue
+        bearings.append(math.atan2(y, x))
+        ranges.append(math.hypot(x, y))
+        labels.append(target.ID)
+    return np.array(bearings), np.array(ranges), np.array(labels, dtype=np.int64)
+
+
+def limelight_detections(limelight) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the AprilTag detections of the latest frame of a Limelight, in the camera's frame. Tags without a camera
+    space pose are skipped, since their range is unknown.
+
+    Args:
+        limelight (Limelight): Limelight publishing JSON results
+
+    Returns:
+        (bearings, ranges, labels), each with shape (M,). Labels are AprilTag IDs.
+    """
+    results = limelight.results()
+    if results is None or not results.fiducials:
+        return np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int64)
+    # Limelight camera space is x right, y down, z forward; tx is positive to the right
+    camera_to_tags = results.camera_to_tags
+    bearings = -np.radians([fiducial.tx for fiducial in results.fiducials])
+    ranges = np.hypot(camera_to_tags[:, 0], camera_to_tags[:, 2])
+    solved = ~np.isnan(ranges)
+    return bearings[solved], ranges[solved], results.fiducial_ids[solved]
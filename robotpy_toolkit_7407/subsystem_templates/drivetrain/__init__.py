@@ -2,3 +2,4 @@ from robotpy_toolkit_7407.subsystem_templates.drivetrain.differential_drivetrain
 from robotpy_toolkit_7407.subsystem_templates.drivetrain.differential_drivetrain_commands import DriveArcade
 from robotpy_toolkit_7407.subsystem_templates.drivetrain.swerve_drivetrain import SwerveDrivetrain, SwerveNode, SwerveGyro
 from robotpy_toolkit_7407.subsystem_templates.drivetrain.swerve_drivetrain_commands import DriveSwerve
+from robotpy_toolkit_7407.subsystem_templates.drivetrain.swerve_nodes import TalonFXSwerveNode, SparkMaxSwerveNode
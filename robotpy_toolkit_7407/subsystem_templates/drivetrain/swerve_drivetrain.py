@@ -9,6 +9,7 @@ from robotpy_toolkit_7407.oi.joysticks import JoystickAxis
 from robotpy_toolkit_7407.sensors.gyro import BaseGyro
 from robotpy_toolkit_7407.subsystem import Subsystem
 from robotpy_toolkit_7407.utils import logger
+from robotpy_toolkit_7407.utils.init_orchestrator import InitOrchestrator
 from robotpy_toolkit_7407.utils.math import rotate_vector, bounded_angle_diff
 from robotpy_toolkit_7407.utils.units import s, m, deg, rad, hour, mile, rev, meters, meters_per_second, \
     radians_per_second, radians
@@ -158,6 +159,7 @@ class SwerveDrivetrain(Subsystem):
     start_pose: Pose2d = Pose2d(0, 0, 0)  # Starting pose of the robot from wpilib Pose (x, y, rotation)
     gyro_start_angle: radians = 0
     gyro_offset: deg = 0
+    parallel_init: bool = False  # Bring up the nodes and gyro concurrently with an InitOrchestrator
 
     def __init__(self):
         super().__init__()
@@ -174,11 +176,20 @@ class SwerveDrivetrain(Subsystem):
         Initialize the swerve drivetrain, kinematics, odometry, and gyro.
         """
         logger.info("initializing swerve drivetrain", "[swerve_drivetrain]")
-        self.n_front_left.init()
-        self.n_front_right.init()
-        self.n_back_left.init()
-        self.n_back_right.init()
-        self.gyro.init(self.gyro_start_angle)
+        if self.parallel_init:
+            orchestrator = InitOrchestrator(max_workers=5)
+            orchestrator.add_device("front_left", self.n_front_left)
+            orchestrator.add_device("front_right", self.n_front_right)
+            orchestrator.add_device("back_left", self.n_back_left)
+            orchestrator.add_device("back_right", self.n_back_right)
+            orchestrator.add_device("gyro", self.gyro, self.gyro_start_angle)
+            orchestrator.run()
+        else:
+            self.n_front_left.init()
+            self.n_front_right.init()
+            self.n_back_left.init()
+            self.n_back_right.init()
+            self.gyro.init(self.gyro_start_angle)
 
         logger.info("initializing odometry", "[swerve_drivetrain]")
 
@@ -0,0 +1,119 @@
+import math
+
+from robotpy_toolkit_7407.motor import PIDMotor
+from robotpy_toolkit_7407.subsystem_templates.drivetrain.swerve_drivetrain import SwerveNode
+from robotpy_toolkit_7407.utils.units import meters, meters_per_second, radians
+
+"""
+Ready-made swerve nodes for TalonFX and SparkMax modules.
+
+Gear ratios and the wheel size are folded into one scale factor per motor at construction, so every read and
+write is a single multiplication. Drive velocity and steering position run on the motor controllers' onboard
+loops. With read_cache=True, reads are cycle cached so odometry, kinematics and logging share one CAN read per
+cycle; that requires cycle.advance_cycle() to be called every robot loop.
+
+Example usage:
+    n_front_left = TalonFXSwerveNode(TalonFX(1, config=drive_config), TalonFX(2, config=turn_config),
+                                     drive_gear_ratio=6.75, turn_gear_ratio=150 / 7, wheel_diameter=0.1016)
+"""
+
+k_swerve_general_status_ms = 20
+k_swerve_drive_feedback_status_ms = 10  # Odometry integrates drive position, so it is read every cycle
+k_swerve_turn_feedback_status_ms = 20
+
+
+class _MotorSwerveNode(SwerveNode):
+    _motor_units_per_radian: float
+
+    def __init__(self, m_move: PIDMotor, m_turn: PIDMotor, drive_gear_ratio: float, turn_gear_ratio: float,
+                 wheel_diameter: meters, read_cache: bool = False):
+        """
+        Args:
+            m_move (PIDMotor): Drive motor
+            m_turn (PIDMotor): Steering motor, zeroed with the node facing forward
+            drive_gear_ratio (float): Drive motor rotations per wheel rotation
+            turn_gear_ratio (float): Steering motor rotations per node rotation
+            wheel_diameter (meters): Wheel diameter in meters
+            read_cache (bool, optional): Cache motor reads per cycle. Only enable if cycle.advance_cycle() is called
+                every robot loop, otherwise reads never update. Defaults to False.
+        """
+        self.m_move = m_move
+        self.m_turn = m_turn
+        self.drive_gear_ratio = drive_gear_ratio
+        self.turn_gear_ratio = turn_gear_ratio
+        self.wheel_diameter = wheel_diameter
+        self.read_cache = read_cache
+
+        # Motor units per node radian, and per meter of wheel travel
+        self._turn_scale = turn_gear_ratio * self._motor_units_per_radian
+        self._inv_turn_scale = 1 / self._turn_scale
+        self._drive_scale = drive_gear_ratio * self._motor_units_per_radian / (wheel_diameter / 2)
+        self._inv_drive_scale = 1 / self._drive_scale
+        # Motor velocity units per meter per second of wheel speed
+        self._drive_velocity_scale = \
+            drive_gear_ratio * self._drive_velocity_units_per_radian_per_second(m_move) / (wheel_diameter / 2)
+        self._inv_drive_velocity_scale = 1 / self._drive_velocity_scale
+
+    def _drive_velocity_units_per_radian_per_second(self, m_move: PIDMotor) -> float:
+        return self._motor_units_per_radian
+
+    def init(self):
+        """
+        Initialize both motors, tune their status frames for swerve and, if requested, enable their read caches.
+        """
+        self.m_move.init()
+        self.m_turn.init()
+        self.m_move.set_status_frame_periods(k_swerve_general_status_ms, k_swerve_drive_feedback_status_ms)
+        self.m_turn.set_status_frame_periods(k_swerve_general_status_ms, k_swerve_turn_feedback_status_ms)
+        if self.read_cache:
+            self.m_move.enable_read_cache()
+            self.m_turn.enable_read_cache()
+
+    def set_motor_angle(self, pos: radians):
+        self.m_turn.set_target_position(pos * self._turn_scale)
+
+    def get_turn_motor_angle(self) -> radians:
+        return self.m_turn.get_sensor_position() * self._inv_turn_scale
+
+    def set_motor_velocity(self, vel: meters_per_second):
+        self.m_move.set_target_velocity(vel * self._drive_velocity_scale)
+
+    def get_motor_velocity(self) -> meters_per_second:
+        return self.m_move.get_sensor_velocity() * self._inv_drive_velocity_scale
+
+    def get_drive_motor_traveled_distance(self) -> meters:
+        return self.m_move.get_sensor_position() * self._inv_drive_scale
+
+
+class TalonFXSwerveNode(_MotorSwerveNode):
+    """
+    Swerve node driven and steered by TalonFX (or SimTalonFX) motors.
+
+    Steering uses MotionMagic on the turn motor. SwerveNode already resolves every target to the equivalent angle
+    closest to the current one, which keeps steering continuous without onboard wrapping.
+    """
+    _motor_units_per_radian = 1
+
+
+class SparkMaxSwerveNode(_MotorSwerveNode):
+    """
+    Swerve node driven and steered by SparkMax (or SimSparkMax) motors.
+
+    Steering uses the turn motor's onboard position loop with PID wrapping over one node rotation, so the controller
+    always takes the short way around. Drive velocity follows the drive motor's units: RPM, or the units set by its
+    config's velocity_conversion_factor.
+    """
+    _motor_units_per_radian = 1 / (2 * math.pi)
+
+    def _drive_velocity_units_per_radian_per_second(self, m_move: PIDMotor) -> float:
+        config = getattr(m_move, "_config", None)
+        factor = 1 if config is None or config.velocity_conversion_factor is None else config.velocity_conversion_factor
+        return 60 * factor / (2 * math.pi)
+
+    def init(self):
+        """
+        Initialize both motors, tune their status frames for swerve, enable their read caches if requested and wrap
+        steering.
+        """
+        super().init()
+        self.m_turn.set_position_wrapping(0, self.turn_gear_ratio)
@@ -1,31 +1,25 @@
 import math
-from wpimath.geometry import Pose3d, Rotation3d, Translation3d
 
-dist_scalar = 1
+from wpimath.geometry import Pose3d, Rotation3d, Transform3d, Translation3d
+
+from robotpy_toolkit_7407.utils.geometry import array_to_pose2d, pose3d_to_array, se2_from_se3, se3_compose, \
+    se3_inverse
 
 field_to_target = Pose3d(Translation3d(2, -2, 1), Rotation3d(0, 0, 0))
 camera_to_target = Pose3d(Translation3d(1, -1, 0), Rotation3d(0, 0, math.radians(45)))
 roc = (.5, -.5)
 robot_to_camera = Pose3d(Translation3d(roc[0], roc[1], 1), Rotation3d(0, 0, math.atan2(roc[0], roc[1])))
 
-gyro_angle = math.radians(45)
-
-field_to_camera = (
-    field_to_target.x - camera_to_target.x,
-    field_to_target.y - camera_to_target.y
-)
-
-print("FIELD TO CAMERA: ", field_to_camera)
+# field_to_robot = field_to_target * target_to_camera * camera_to_robot
+field_to_camera = se3_compose(pose3d_to_array(field_to_target), se3_inverse(pose3d_to_array(camera_to_target)))
 
-theta = robot_to_camera.rotation().angle - gyro_angle
+print("FIELD TO CAMERA: ", array_to_pose2d(se2_from_se3(field_to_camera)))
 
-print("THETA: ", math.degrees(theta))
+field_to_robot = se3_compose(field_to_camera, se3_inverse(pose3d_to_array(robot_to_camera)))
 
-h = (robot_to_camera.x ** 2 + robot_to_camera.y ** 2) ** .5
+print("FIELD TO ROBOT: ", array_to_pose2d(se2_from_se3(field_to_robot)))
 
-field_to_robot = (
-    field_to_camera[0] - h * math.sin(theta),
-    field_to_camera[1] - h * math.cos(theta)
-)
+expected = field_to_target.transformBy(Transform3d(camera_to_target, Pose3d())) \
+    .transformBy(Transform3d(robot_to_camera, Pose3d()))
 
-print("FIELD TO ROBOT: ", field_to_robot)
+print("FIELD TO ROBOT (wpimath): ", expected.toPose2d())
@@ -0,0 +1,74 @@
+import math
+import random
+import time
+
+import numpy as np
+from wpimath.geometry import Pose2d, Pose3d, Rotation2d, Rotation3d, Transform2d, Transform3d, Translation3d, \
+    Twist2d, Twist3d
+
+from robotpy_toolkit_7407.utils.geometry import array_to_pose2d, array_to_pose3d, pose2d_to_array, \
+    pose3d_to_array, se2_compose, se2_exp, se2_interpolate, se2_inverse, se2_log, se3_compose, se3_exp, \
+    se3_interpolate, se3_inverse, se3_log
+
+random.seed(7407)
+
+
+def random_pose2d() -> Pose2d:
+    return Pose2d(random.uniform(-8, 8), random.uniform(-4, 4), Rotation2d(random.uniform(-math.pi, math.pi)))
+
+
+def random_pose3d() -> Pose3d:
+    return Pose3d(
+        Translation3d(random.uniform(-8, 8), random.uniform(-4, 4), random.uniform(0, 2)),
+        Rotation3d(random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5), random.uniform(-math.pi, math.pi))
+    )
+
+
+def error2d(array: np.ndarray, poses: list[Pose2d]) -> float:
+    return float(np.abs(np.array([[math.cos(a[2]) - p.rotation().cos(), math.sin(a[2]) - p.rotation().sin(),
+                                   a[0] - p.X(), a[1] - p.Y()] for a, p in zip(array, poses)])).max())
+
+
+def error3d(array: np.ndarray, poses: list[Pose3d]) -> float:
+    # Compare translations and rotations, with q and -q the same rotation
+    expected = pose3d_to_array(poses)
+    rotation_error = np.minimum(np.abs(array[:, 3:] - expected[:, 3:]), np.abs(array[:, 3:] + expected[:, 3:]))
+    return float(max(np.abs(array[:, :3] - expected[:, :3]).max(), rotation_error.max()))
+
+
+a2, b2 = [random_pose2d() for _ in range(100)], [random_pose2d() for _ in range(100)]
+A2, B2 = pose2d_to_array(a2), pose2d_to_array(b2)
+print("SE2 COMPOSE ERROR: ", error2d(se2_compose(A2, B2), [a.transformBy(Transform2d(b.translation(), b.rotation()))
+                                                          for a, b in zip(a2, b2)]))
+print("SE2 INVERSE ERROR: ", error2d(se2_inverse(A2), [Pose2d().relativeTo(a) for a in a2]))
+twists = [Pose2d().log(a) for a in a2]
+print("SE2 LOG ERROR: ", float(np.abs(se2_log(A2) - [(t.dx, t.dy, t.dtheta) for t in twists]).max()))
+print("SE2 EXP/LOG ERROR: ", error2d(se2_exp(se2_log(A2)), a2))
+expected = []
+for a, b in zip(a2, b2):
+    t = a.log(b)
+    expected.append(a.exp(Twist2d(0.3 * t.dx, 0.3 * t.dy, 0.3 * t.dtheta)))
+print("SE2 INTERPOLATE ERROR: ", error2d(se2_interpolate(A2, B2, 0.3), expected))
+
+a3, b3 = [random_pose3d() for _ in range(100)], [random_pose3d() for _ in range(100)]
+A3, B3 = pose3d_to_array(a3), pose3d_to_array(b3)
+print("SE3 COMPOSE ERROR: ", error3d(se3_compose(A3, B3), [a.transformBy(Transform3d(b.translation(), b.rotation()))
+                                                          for a, b in zip(a3, b3)]))
+print("SE3 INVERSE ERROR: ", error3d(se3_inverse(A3), [Pose3d().relativeTo(a) for a in a3]))
+print("SE3 EXP/LOG ERROR: ", error3d(se3_exp(se3_log(A3)), a3))
+expected = []
+for a, b in zip(a3, b3):
+    t = a.log(b)
+    expected.append(a.exp(Twist3d(0.3 * t.dx, 0.3 * t.dy, 0.3 * t.dz, 0.3 * t.rx, 0.3 * t.ry, 0.3 * t.rz)))
+print("SE3 INTERPOLATE ERROR: ", error3d(se3_interpolate(A3, B3, 0.3), expected))
+print("ROUND TRIP: ", array_to_pose2d(A2[0]), a2[0], array_to_pose3d(A3[0]), a3[0])
+
+start = time.perf_counter()
+for _ in range(100):
+    [a.transformBy(Transform3d(b.translation(), b.rotation())) for a, b in zip(a3, b3)]
+wpimath_time = (time.perf_counter() - start) * 10
+start = time.perf_counter()
+for _ in range(100):
+    se3_compose(A3, B3)
+kernel_time = (time.perf_counter() - start) * 10
+print(f"COMPOSE 100 POSES: wpimath {wpimath_time:.3f} ms, kernel {kernel_time:.3f} ms")
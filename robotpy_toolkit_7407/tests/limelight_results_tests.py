@@ -0,0 +1,41 @@
+import json
+import random
+import time
+
+from robotpy_toolkit_7407.sensors.limelight import parse_results
+
+
+def fiducial(tag_id: int) -> dict:
+    pose = [random.uniform(-3, 3) for _ in range(6)]
+    return {
+        "fID": tag_id, "fam": "16H5C", "pts": [], "skew": [],
+        "t6c_ts": pose, "t6r_fs": pose, "t6r_ts": pose, "t6t_cs": pose, "t6t_rs": pose,
+        "ta": 0.5, "tx": random.uniform(-27, 27), "txp": 320, "ty": random.uniform(-20, 20), "typ": 240
+    }
+
+
+def frame(tag_count: int, ts: float) -> str:
+    return json.dumps({"Results": {
+        "Classifier": [], "Detector": [], "Retro": [],
+        "Fiducial": [fiducial(tag_id) for tag_id in range(1, tag_count + 1)],
+        "botpose": [1, 2, 0, 0, 0, 30], "botpose_wpiblue": [9, 6, 0, 0, 0, 30], "botpose_wpired": [7, 2, 0, 0, 0, 210],
+        "pID": 0, "tl": 12.5, "ts": ts, "v": 1
+    }})
+
+
+results = parse_results(frame(3, 1000))
+print(results, results.fiducials)
+print("IDS: ", results.fiducial_ids, "ROBOT TO TAGS: ", results.robot_to_tags.shape)
+print("MALFORMED: ", parse_results("{"), parse_results('{"Results": []}'))
+
+for tag_count in (0, 1, 4, 8):
+    frames = [frame(tag_count, ts) for ts in range(1000)]
+    start = time.perf_counter()
+    for text in frames:
+        parse_results(text)
+    parse_time = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for text in frames:
+        parse_results(text).robot_to_tags
+    array_time = (time.perf_counter() - start) * 1000
+    print(f"PARSE TIME ({tag_count} tags): {parse_time:.1f} us, WITH ARRAYS: {array_time:.1f} us")
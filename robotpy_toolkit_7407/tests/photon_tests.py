@@ -2,11 +2,8 @@ from photonvision import PhotonTrackedTarget
 from robotpy_apriltag import AprilTagFieldLayout
 from wpimath.geometry import Pose3d, Translation3d, Rotation3d, Transform3d
 
-from robotpy_toolkit_7407.sensors.gyro import PigeonIMUGyro_Wrapper
 from robotpy_toolkit_7407.sensors.photonvision import PhotonCamera, PhotonTarget, PhotonOdometry, AprilTag
 
-gyro = PigeonIMUGyro_Wrapper(13)
-
 camera = PhotonCamera("globalshuttercamera",
                       Pose3d(Translation3d(x=1, y=1, z=.65),
                              Rotation3d(roll=0, pitch=0, yaw=0)),
@@ -37,8 +34,7 @@ field_layout = {
 
 odometry = PhotonOdometry(
     camera,
-    field_layout,
-    gyro
+    field_layout
 )
 
 odometry.refresh()
@@ -0,0 +1,31 @@
+import time
+
+from robotpy_toolkit_7407.motor import MotorGroup
+from robotpy_toolkit_7407.motors import TalonConfig, SparkMaxConfig
+from robotpy_toolkit_7407.motors.sim_motors import SimTalonFX, SimSparkMax, sim_motor_bank
+
+drive = SimTalonFX(1, config=TalonConfig(k_P=0.1, k_F=0.047))
+arm = SimSparkMax(2, config=SparkMaxConfig(k_P=0.5, k_D=2))
+shooter = MotorGroup(SimTalonFX(3), SimTalonFX(4))
+extras = [SimTalonFX(10 + i) for i in range(16)]
+
+for motor in (drive, arm, shooter, *extras):
+    motor.init()
+
+drive.set_target_velocity(300)  # radians per second
+arm.set_target_position(3)  # rotations
+shooter.set_raw_output(.5)
+for motor in extras:
+    motor.set_raw_output(.2)
+
+for _ in range(100):
+    sim_motor_bank.step(0.02)
+
+print("DRIVE VELOCITY (rad/s): ", drive.get_sensor_velocity())
+print("ARM POSITION (rot): ", arm.get_sensor_position())
+print("SHOOTER VELOCITY (rad/s): ", shooter.get_sensor_velocity(), shooter.motors[1].get_sensor_velocity())
+
+start = time.perf_counter()
+for _ in range(1000):
+    sim_motor_bank.step(0.02)
+print(f"STEP TIME ({sim_motor_bank.size} motors): ", (time.perf_counter() - start) * 1000, "us")
@@ -0,0 +1,41 @@
+import math
+import time
+
+from robotpy_toolkit_7407.motors import TalonConfig, SparkMaxConfig
+from robotpy_toolkit_7407.motors.sim_motors import SimTalonFX, SimSparkMax, sim_motor_bank
+from robotpy_toolkit_7407.subsystem_templates.drivetrain import TalonFXSwerveNode, SparkMaxSwerveNode
+from robotpy_toolkit_7407.utils import cycle
+
+talon_node = TalonFXSwerveNode(
+    SimTalonFX(1, config=TalonConfig(k_P=0.05, k_V=12 / 594)),
+    SimTalonFX(2, config=TalonConfig(k_P=0.1, k_D=1)),
+    drive_gear_ratio=6.75, turn_gear_ratio=150 / 7, wheel_diameter=0.1016, read_cache=True
+)
+spark_node = SparkMaxSwerveNode(
+    SimSparkMax(3, config=SparkMaxConfig(k_P=0.0005, k_V=12 / 94.6, velocity_conversion_factor=1 / 60)),
+    SimSparkMax(4, config=SparkMaxConfig(k_P=2, k_D=5)),
+    drive_gear_ratio=6.75, turn_gear_ratio=150 / 7, wheel_diameter=0.1016, read_cache=True
+)
+nodes = (talon_node, spark_node)
+for node in nodes:
+    node.init()
+
+for target in (1.0, -2.5, 3.0):
+    for _ in range(100):
+        for node in nodes:
+            node.set(2, target)
+        sim_motor_bank.step(0.02)
+        cycle.advance_cycle()
+    for node in nodes:
+        angle = math.remainder(node.get_turn_motor_angle() + node.motor_sensor_offset, 2 * math.pi)
+        velocity = -node.get_motor_velocity() if node.motor_reversed else node.get_motor_velocity()
+        print(f"{type(node).__name__} TARGET {target}: ANGLE {angle:.3f} VELOCITY (m/s) {velocity:.3f}")
+
+start = time.perf_counter()
+for _ in range(1000):
+    for node in nodes:
+        node.set(2, 1)
+        node.get_node_position()
+        node.get_node_state()
+    cycle.advance_cycle()
+print("NODE UPDATE TIME (2 nodes): ", (time.perf_counter() - start) * 1000, "us")
@@ -0,0 +1,113 @@
+import functools
+from typing import Callable
+
+"""
+Robot loop cycle counter and cycle-scoped memoization for sensor getters.
+
+Call advance_cycle() once per robot periodic (after the command scheduler runs). Getters decorated with
+cycle_cached then hit the CAN/SPI bus at most once per cycle on devices that enabled their read cache.
+
+Example usage:
+    def robotPeriodic(self):
+        commands2.CommandScheduler.getInstance().run()
+        cycle.advance_cycle()
+"""
+
+_cycle = 0
+_listeners: list[Callable[[], None]] = []
+
+
+def current_cycle() -> int:
+    """
+    Get the current robot loop cycle number.
+    """
+    return _cycle
+
+
+def advance_cycle():
+    """
+    Start a new robot loop cycle. Cycle listeners (e.g. output stage flushes) run first, then every cycle-cached
+    reading is invalidated.
+    """
+    global _cycle
+    for listener in _listeners:
+        listener()
+    _cycle += 1
+
+
+def add_cycle_listener(listener: Callable[[], None]):
+    """
+    Run a callback at the end of every cycle, when advance_cycle() is called.
+
+    Args:
+        listener (Callable[[], None]): Callback to run
+    """
+    _listeners.append(listener)
+
+
+def remove_cycle_listener(listener: Callable[[], None]):
+    """
+    Stop running a callback registered with add_cycle_listener.
+
+    Args:
+        listener (Callable[[], None]): Callback to remove
+    """
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def cycle_cached(getter):
+    """
+    Decorator memoizing a no-argument getter for the current cycle on objects extending CycleCache.
+    """
+    name = getter.__name__
+
+    @functools.wraps(getter)
+    def wrapper(self):
+        if not self._read_cache_enabled:
+            return getter(self)
+        entry = self._read_cache.get(name)
+        if entry is not None and entry[0] == _cycle:
+            self.read_cache_hits += 1
+            return entry[1]
+        self.read_cache_misses += 1
+        value = getter(self)
+        self._read_cache[name] = (_cycle, value)
+        return value
+
+    return wrapper
+
+
+class CycleCache:
+    """
+    Opt-in cycle-scoped read cache for devices. Getters decorated with cycle_cached are memoized per cycle once
+    enable_read_cache() is called.
+    """
+    _read_cache_enabled: bool = False
+    _read_cache: dict = None
+    read_cache_hits: int = 0
+    read_cache_misses: int = 0
+
+    def enable_read_cache(self, enabled: bool = True):
+        """
+        Enable or disable the cycle-scoped read cache.
+
+        Args:
+            enabled (bool, optional): Whether getters are memoized per cycle. Defaults to True.
+        """
+        self._read_cache_enabled = enabled
+        self._read_cache = {}
+
+    def invalidate_read_cache(self):
+        """
+        Drop every cached reading, forcing the next getter calls to read the device.
+        """
+        if self._read_cache_enabled:
+            self._read_cache.clear()
+
+    def reset_read_cache_stats(self):
+        """
+        Reset the read cache hit and miss counters.
+        """
+        self.read_cache_hits = 0
+        self.read_cache_misses = 0
@@ -0,0 +1,533 @@
+import numpy as np
+from wpimath.geometry import Pose2d, Pose3d, Quaternion, Rotation2d, Rotation3d, Translation3d
+
+"""
+Batched SE(2) and SE(3) geometry on NumPy arrays.
+
+SE(2) poses are arrays of shape (..., 3) holding (x, y, theta). SE(3) poses are arrays of shape (..., 7) holding
+(x, y, z, qw, qx, qy, qz), a translation and a unit quaternion. Every function broadcasts over the leading
+dimensions, so a whole field layout or every target of a frame is transformed in one call. wpimath objects are
+only created at the boundary, with the pose2d/pose3d converters.
+
+Conventions match wpimath: poses compose left to right (a ∘ b is b expressed in a's frame), rotations are
+counterclockwise, Euler angles are extrinsic roll-pitch-yaw, and log/exp are the twists of Pose2d.log/exp and
+Pose3d.log/exp.
+
+Example usage:
+    field_to_tags = pose3d_to_array([tag.pose for tag in field_layout.getTags()])  # (N, 7)
+    field_to_cameras = se3_compose(field_to_tags, se3_inverse(camera_to_tags))
+    robot_poses = array_to_pose3d(se3_compose(field_to_cameras, camera_to_robot))
+"""
+
+_k_small_angle = 1e-9
+
+
+def _wrap(theta: np.ndarray) -> np.ndarray:
+    # Wrap angles to [-pi, pi)
+    return np.remainder(theta + np.pi, 2 * np.pi) - np.pi
+
+
+# --- SE(2) ---
+
+def se2_compose(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Compose SE(2) poses, a ∘ b.
+
+    Args:
+        a (np.ndarray): Poses with shape (..., 3)
+        b (np.ndarray): Poses relative to a, with shape (..., 3)
+
+    Returns:
+        np.ndarray: Poses with shape (..., 3)
+    """
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    cos, sin = np.cos(a[..., 2]), np.sin(a[..., 2])
+    return np.stack((
+        a[..., 0] + cos * b[..., 0] - sin * b[..., 1],
+        a[..., 1] + sin * b[..., 0] + cos * b[..., 1],
+        _wrap(a[..., 2] + b[..., 2])
+    ), axis=-1)
+
+
+def se2_inverse(a: np.ndarray) -> np.ndarray:
+    """
+    Invert SE(2) poses.
+
+    Args:
+        a (np.ndarray): Poses with shape (..., 3)
+
+    Returns:
+        np.ndarray: Inverse poses with shape (..., 3)
+    """
+    a = np.asarray(a, dtype=float)
+    cos, sin = np.cos(a[..., 2]), np.sin(a[..., 2])
+    return np.stack((
+        -cos * a[..., 0] - sin * a[..., 1],
+        sin * a[..., 0] - cos * a[..., 1],
+        _wrap(-a[..., 2])
+    ), axis=-1)
+
+
+def se2_transform_points(poses: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Transform 2D points from the poses' frames to the parent frame.
+
+    Args:
+        poses (np.ndarray): Poses with shape (..., 3)
+        points (np.ndarray): Points with shape (..., 2), broadcast against the poses
+
+    Returns:
+        np.ndarray: Points with shape (..., 2)
+    """
+    poses, points = np.asarray(poses, dtype=float), np.asarray(points, dtype=float)
+    cos, sin = np.cos(poses[..., 2]), np.sin(poses[..., 2])
+    return np.stack((
+        poses[..., 0] + cos * points[..., 0] - sin * points[..., 1],
+        poses[..., 1] + sin * points[..., 0] + cos * points[..., 1]
+    ), axis=-1)
+
+
+def se2_log(a: np.ndarray) -> np.ndarray:
+    """
+    Get the twists (dx, dy, dtheta) that move from the origin to SE(2) poses along a constant curvature arc.
+
+    Args:
+        a (np.ndarray): Poses with shape (..., 3)
+
+    Returns:
+        np.ndarray: Twists with shape (..., 3)
+    """
+    a = np.asarray(a, dtype=float)
+    theta = a[..., 2]
+    half_theta = theta / 2
+    small = np.abs(theta) < _k_small_angle
+    cos_minus_one = np.cos(theta) - 1
+    half_theta_by_tan = np.where(
+        small, 1 - theta ** 2 / 12, -half_theta * np.sin(theta) / np.where(small, 1, cos_minus_one)
+    )
+    return np.stack((
+        half_theta_by_tan * a[..., 0] + half_theta * a[..., 1],
+        -half_theta * a[..., 0] + half_theta_by_tan * a[..., 1],
+        theta
+    ), axis=-1)
+
+
+def se2_exp(twist: np.ndarray) -> np.ndarray:
+    """
+    Get the SE(2) poses reached from the origin by twists (dx, dy, dtheta).
+
+    Args:
+        twist (np.ndarray): Twists with shape (..., 3)
+
+    Returns:
+        np.ndarray: Poses with shape (..., 3)
+    """
+    twist = np.asarray(twist, dtype=float)
+    theta = twist[..., 2]
+    small = np.abs(theta) < _k_small_angle
+    safe_theta = np.where(small, 1, theta)
+    s = np.where(small, 1 - theta ** 2 / 6, np.sin(theta) / safe_theta)
+    c = np.where(small, theta / 2, (1 - np.cos(theta)) / safe_theta)
+    return np.stack((
+        twist[..., 0] * s - twist[..., 1] * c,
+        twist[..., 0] * c + twist[..., 1] * s,
+        _wrap(theta)
+    ), axis=-1)
+
+
+def se2_interpolate(a: np.ndarray, b: np.ndarray, t) -> np.ndarray:
+    """
+    Interpolate between SE(2) poses along the constant curvature arc joining them, as Pose2d.interpolate.
+
+    Args:
+        a (np.ndarray): Start poses with shape (..., 3)
+        b (np.ndarray): End poses with shape (..., 3)
+        t (float | np.ndarray): Fraction of the way from a to b, from 0 to 1, broadcast against the poses
+
+    Returns:
+        np.ndarray: Poses with shape (..., 3)
+    """
+    t = np.clip(np.asarray(t, dtype=float), 0, 1)[..., None]
+    return se2_compose(a, se2_exp(se2_log(se2_compose(se2_inverse(a), b)) * t))
+
+
+def se2_from_se3(poses: np.ndarray) -> np.ndarray:
+    """
+    Project SE(3) poses onto the floor, keeping x, y and yaw.
+
+    Args:
+        poses (np.ndarray): Poses with shape (..., 7)
+
+    Returns:
+        np.ndarray: Poses with shape (..., 3)
+    """
+    poses = np.asarray(poses, dtype=float)
+    w, x, y, z = poses[..., 3], poses[..., 4], poses[..., 5], poses[..., 6]
+    yaw = np.arctan2(2 * (w * z + x * y), 1 - 2 * (y * y + z * z))
+    return np.stack((poses[..., 0], poses[..., 1], yaw), axis=-1)
+
+
+# --- Quaternions (w, x, y, z) ---
+
+def quaternion_multiply(q1: np.ndarray, q2: np.ndarray) -> np.ndarray:
+    """
+    Hamilton product of quaternions, the rotation q2 followed by q1.
+
+    Args:
+        q1 (np.ndarray): Quaternions with shape (..., 4)
+        q2 (np.ndarray): Quaternions with shape (..., 4)
+
+    Returns:
+        np.ndarray: Quaternions with shape (..., 4)
+    """
+    w1, x1, y1, z1 = np.moveaxis(np.asarray(q1, dtype=float), -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(np.asarray(q2, dtype=float), -1, 0)
+    return np.stack((
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+    ), axis=-1)
+
+
+def quaternion_conjugate(q: np.ndarray) -> np.ndarray:
+    """
+    Conjugate quaternions, the inverse of unit quaternions.
+
+    Args:
+        q (np.ndarray): Quaternions with shape (..., 4)
+
+    Returns:
+        np.ndarray: Quaternions with shape (..., 4)
+    """
+    q = np.asarray(q, dtype=float)
+    return q * np.array([1, -1, -1, -1])
+
+
+def quaternion_rotate(q: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    Rotate vectors by unit quaternions.
+
+    Args:
+        q (np.ndarray): Quaternions with shape (..., 4)
+        v (np.ndarray): Vectors with shape (..., 3), broadcast against the quaternions
+
+    Returns:
+        np.ndarray: Vectors with shape (..., 3)
+    """
+    q, v = np.asarray(q, dtype=float), np.asarray(v, dtype=float)
+    w, u = q[..., :1], q[..., 1:]
+    # v + 2w (u x v) + 2 u x (u x v)
+    uv = 2 * np.cross(u, v)
+    return v + w * uv + np.cross(u, uv)
+
+
+def quaternion_to_matrix(q: np.ndarray) -> np.ndarray:
+    """
+    Convert unit quaternions to rotation matrices.
+
+    Args:
+        q (np.ndarray): Quaternions with shape (..., 4)
+
+    Returns:
+        np.ndarray: Rotation matrices with shape (..., 3, 3)
+    """
+    w, x, y, z = np.moveaxis(np.asarray(q, dtype=float), -1, 0)
+    return np.stack((
+        np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)), axis=-1),
+        np.stack((2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)), axis=-1),
+        np.stack((2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)), axis=-1)
+    ), axis=-2)
+
+
+def matrix_to_quaternion(r: np.ndarray) -> np.ndarray:
+    """
+    Convert rotation matrices to unit quaternions with w >= 0.
+
+    Args:
+        r (np.ndarray): Rotation matrices with shape (..., 3, 3)
+
+    Returns:
+        np.ndarray: Quaternions with shape (..., 4)
+    """
+    r = np.asarray(r, dtype=float)
+    r00, r11, r22 = r[..., 0, 0], r[..., 1, 1], r[..., 2, 2]
+    q = np.stack((
+        np.sqrt(np.maximum(0, 1 + r00 + r11 + r22)) / 2,
+        np.copysign(np.sqrt(np.maximum(0, 1 + r00 - r11 - r22)) / 2, r[..., 2, 1] - r[..., 1, 2]),
+        np.copysign(np.sqrt(np.maximum(0, 1 - r00 + r11 - r22)) / 2, r[..., 0, 2] - r[..., 2, 0]),
+        np.copysign(np.sqrt(np.maximum(0, 1 - r00 - r11 + r22)) / 2, r[..., 1, 0] - r[..., 0, 1])
+    ), axis=-1)
+    return q / np.linalg.norm(q, axis=-1, keepdims=True)
+
+
+def quaternion_from_euler(roll, pitch, yaw) -> np.ndarray:
+    """
+    Convert extrinsic roll-pitch-yaw angles to unit quaternions, as Rotation3d(roll, pitch, yaw).
+
+    Args:
+        roll (float | np.ndarray): Rotations about x in radians
+        pitch (float | np.ndarray): Rotations about y in radians
+        yaw (float | np.ndarray): Rotations about z in radians
+
+    Returns:
+        np.ndarray: Quaternions with shape (..., 4)
+    """
+    cr, sr = np.cos(np.asarray(roll) / 2), np.sin(np.asarray(roll) / 2)
+    cp, sp = np.cos(np.asarray(pitch) / 2), np.sin(np.asarray(pitch) / 2)
+    cy, sy = np.cos(np.asarray(yaw) / 2), np.sin(np.asarray(yaw) / 2)
+    return np.stack(np.broadcast_arrays(
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy
+    ), axis=-1)
+
+
+# --- SE(3) ---
+
+def se3_compose(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Compose SE(3) poses, a ∘ b.
+
+    Args:
+        a (np.ndarray): Poses with shape (..., 7)
+        b (np.ndarray): Poses relative to a, with shape (..., 7)
+
+    Returns:
+        np.ndarray: Poses with shape (..., 7)
+    """
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    translation = a[..., :3] + quaternion_rotate(a[..., 3:], b[..., :3])
+    rotation = quaternion_multiply(a[..., 3:], b[..., 3:])
+    shape = np.broadcast_shapes(translation.shape[:-1], rotation.shape[:-1])
+    return np.concatenate(
+        (np.broadcast_to(translation, shape + (3,)), np.broadcast_to(rotation, shape + (4,))), axis=-1
+    )
+
+
+def se3_inverse(a: np.ndarray) -> np.ndarray:
+    """
+    Invert SE(3) poses.
+
+    Args:
+        a (np.ndarray): Poses with shape (..., 7)
+
+    Returns:
+        np.ndarray: Inverse poses with shape (..., 7)
+    """
+    a = np.asarray(a, dtype=float)
+    rotation = quaternion_conjugate(a[..., 3:])
+    return np.concatenate((-quaternion_rotate(rotation, a[..., :3]), rotation), axis=-1)
+
+
+def se3_transform_points(poses: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """
+    Transform 3D points from the poses' frames to the parent frame.
+
+    Args:
+        poses (np.ndarray): Poses with shape (..., 7)
+        points (np.ndarray): Points with shape (..., 3), broadcast against the poses
+
+    Returns:
+        np.ndarray: Points with shape (..., 3)
+    """
+    poses = np.asarray(poses, dtype=float)
+    return poses[..., :3] + quaternion_rotate(poses[..., 3:], points)
+
+
+def _v_coefficients(theta: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Coefficients of [w]x and [w]x^2 in V = I + b [w]x + c [w]x^2, the left Jacobian of SO(3)
+    small = theta < 1e-4
+    safe_theta = np.where(small, 1, theta)
+    b = np.where(small, 0.5 - theta ** 2 / 24, (1 - np.cos(theta)) / safe_theta ** 2)
+    c = np.where(small, 1 / 6 - theta ** 2 / 120, (theta - np.sin(theta)) / safe_theta ** 3)
+    return b, c
+
+
+def se3_log(a: np.ndarray) -> np.ndarray:
+    """
+    Get the twists (dx, dy, dz, rx, ry, rz) that move from the origin to SE(3) poses, as Pose3d.log.
+
+    Args:
+        a (np.ndarray): Poses with shape (..., 7)
+
+    Returns:
+        np.ndarray: Twists with shape (..., 6)
+    """
+    a = np.asarray(a, dtype=float)
+    q = np.where(a[..., 3:4] < 0, -a[..., 3:], a[..., 3:])  # The shorter way round
+    sin_half = np.linalg.norm(q[..., 1:], axis=-1)
+    theta = 2 * np.arctan2(sin_half, q[..., 0])
+    scale = np.where(sin_half < _k_small_angle, 2 / np.maximum(q[..., 0], _k_small_angle),
+                     theta / np.where(sin_half < _k_small_angle, 1, sin_half))
+    omega = q[..., 1:] * scale[..., None]
+
+    # V^-1 = I - [w]x / 2 + d [w]x^2
+    small = theta < 1e-4
+    safe_theta = np.where(small, 1, theta)
+    d = np.where(small, 1 / 12 + theta ** 2 / 720,
+                 (1 - safe_theta * np.sin(safe_theta) / (2 * (1 - np.cos(safe_theta)))) / safe_theta ** 2)
+    t = a[..., :3]
+    wt = np.cross(omega, t)
+    u = t - wt / 2 + d[..., None] * np.cross(omega, wt)
+    return np.concatenate((u, omega), axis=-1)
+
+
+def se3_exp(twist: np.ndarray) -> np.ndarray:
+    """
+    Get the SE(3) poses reached from the origin by twists (dx, dy, dz, rx, ry, rz), as Pose3d.exp.
+
+    Args:
+        twist (np.ndarray): Twists with shape (..., 6)
+
+    Returns:
+        np.ndarray: Poses with shape (..., 7)
+    """
+    twist = np.asarray(twist, dtype=float)
+    u, omega = twist[..., :3], twist[..., 3:]
+    theta = np.linalg.norm(omega, axis=-1)
+    small = theta < _k_small_angle
+    half_sinc = np.where(small, 0.5 - theta ** 2 / 48, np.sin(theta / 2) / np.where(small, 1, theta))
+    q = np.concatenate((np.cos(theta / 2)[..., None], omega * half_sinc[..., None]), axis=-1)
+
+    b, c = _v_coefficients(theta)
+    wu = np.cross(omega, u)
+    t = u + b[..., None] * wu + c[..., None] * np.cross(omega, wu)
+    return np.concatenate((t, q), axis=-1)
+
+
+def se3_interpolate(a: np.ndarray, b: np.ndarray, t) -> np.ndarray:
+    """
+    Interpolate between SE(3) poses along the screw motion joining them, as Pose3d.interpolate.
+
+    Args:
+        a (np.ndarray): Start poses with shape (..., 7)
+        b (np.ndarray): End poses with shape (..., 7)
+        t (float | np.ndarray): Fraction of the way from a to b, from 0 to 1, broadcast against the poses
+
+    Returns:
+        np.ndarray: Poses with shape (..., 7)
+    """
+    t = np.clip(np.asarray(t, dtype=float), 0, 1)[..., None]
+    return se3_compose(a, se3_exp(se3_log(se3_compose(se3_inverse(a), b)) * t))
+
+
+def se3_from_euler(poses: np.ndarray) -> np.ndarray:
+    """
+    Convert (x, y, z, roll, pitch, yaw) poses, angles in radians, to SE(3) poses.
+
+    Args:
+        poses (np.ndarray): Poses with shape (..., 6)
+
+    Returns:
+        np.ndarray: Poses with shape (..., 7)
+    """
+    poses = np.asarray(poses, dtype=float)
+    return np.concatenate(
+        (poses[..., :3], quaternion_from_euler(poses[..., 3], poses[..., 4], poses[..., 5])), axis=-1
+    )
+
+
+def se3_to_matrix(poses: np.ndarray) -> np.ndarray:
+    """
+    Convert SE(3) poses to homogeneous transforms.
+
+    Args:
+        poses (np.ndarray): Poses with shape (..., 7)
+
+    Returns:
+        np.ndarray: Transforms with shape (..., 4, 4)
+    """
+    poses = np.asarray(poses, dtype=float)
+    matrices = np.zeros(poses.shape[:-1] + (4, 4))
+    matrices[..., :3, :3] = quaternion_to_matrix(poses[..., 3:])
+    matrices[..., :3, 3] = poses[..., :3]
+    matrices[..., 3, 3] = 1
+    return matrices
+
+
+def se3_from_matrix(matrices: np.ndarray) -> np.ndarray:
+    """
+    Convert homogeneous transforms to SE(3) poses.
+
+    Args:
+        matrices (np.ndarray): Transforms with shape (..., 4, 4)
+
+    Returns:
+        np.ndarray: Poses with shape (..., 7)
+    """
+    matrices = np.asarray(matrices, dtype=float)
+    return np.concatenate((matrices[..., :3, 3], matrix_to_quaternion(matrices[..., :3, :3])), axis=-1)
+
+
+# --- wpimath converters ---
+
+def pose2d_to_array(poses) -> np.ndarray:
+    """
+    Convert a Pose2d or Transform2d, or a list of them, to SE(2) poses.
+
+    Args:
+        poses (Pose2d | Transform2d | Iterable): Pose or poses
+
+    Returns:
+        np.ndarray: Poses with shape (3,) for a single pose, or (N, 3)
+    """
+    if hasattr(poses, "rotation"):
+        return np.array((poses.X(), poses.Y(), poses.rotation().radians()))
+    return np.array([(pose.X(), pose.Y(), pose.rotation().radians()) for pose in poses], dtype=float).reshape(-1, 3)
+
+
+def array_to_pose2d(poses: np.ndarray) -> Pose2d | list[Pose2d]:
+    """
+    Convert SE(2) poses to Pose2d.
+
+    Args:
+        poses (np.ndarray): Poses with shape (3,) or (N, 3)
+
+    Returns:
+        Pose2d | list[Pose2d]: A Pose2d for a single pose, or a list of them
+    """
+    poses = np.asarray(poses, dtype=float)
+    if poses.ndim == 1:
+        x, y, theta = poses.tolist()
+        return Pose2d(x, y, Rotation2d(theta))
+    return [Pose2d(x, y, Rotation2d(theta)) for x, y, theta in poses.tolist()]
+
+
+def pose3d_to_array(poses) -> np.ndarray:
+    """
+    Convert a Pose3d or Transform3d, or a list of them, to SE(3) poses.
+
+    Args:
+        poses (Pose3d | Transform3d | Iterable): Pose or poses
+
+    Returns:
+        np.ndarray: Poses with shape (7,) for a single pose, or (N, 7)
+    """
+    def row(pose):
+        translation, q = pose.translation(), pose.rotation().getQuaternion()
+        return translation.X(), translation.Y(), translation.Z(), q.W(), q.X(), q.Y(), q.Z()
+
+    if hasattr(poses, "rotation"):
+        return np.array(row(poses))
+    return np.array([row(pose) for pose in poses], dtype=float).reshape(-1, 7)
+
+
+def array_to_pose3d(poses: np.ndarray) -> Pose3d | list[Pose3d]:
+    """
+    Convert SE(3) poses to Pose3d.
+
+    Args:
+        poses (np.ndarray): Poses with shape (7,) or (N, 7)
+
+    Returns:
+        Pose3d | list[Pose3d]: A Pose3d for a single pose, or a list of them
+    """
+    def pose(x, y, z, qw, qx, qy, qz) -> Pose3d:
+        return Pose3d(Translation3d(x, y, z), Rotation3d(Quaternion(qw, qx, qy, qz)))
+
+    poses = np.asarray(poses, dtype=float)
+    if poses.ndim == 1:
+        return pose(*poses.tolist())
+    return [pose(*row) for row in poses.tolist()]
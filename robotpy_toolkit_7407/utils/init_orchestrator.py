@@ -0,0 +1,289 @@
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from robotpy_toolkit_7407.utils import logger
+from robotpy_toolkit_7407.utils.units import seconds
+
+
+@dataclass
+class InitTask:
+    """
+    A unit of device bring-up work scheduled by the InitOrchestrator
+
+    Args:
+        name: Unique name of the task, used for dependencies and the timing report
+        fn: Callable performing the init/config work
+        depends_on: Names of tasks that must finish successfully before this one starts
+        timeout: Maximum time to wait for a single attempt in seconds (None waits forever)
+        retries: Number of extra attempts made if the task raises. A timed-out attempt is never retried, since it
+            may still be running and would race the retry on the same device.
+    """
+    name: str
+    fn: Callable[[], None]
+    depends_on: tuple[str, ...] = ()
+    timeout: Optional[seconds] = None
+    retries: int = 0
+
+
+@dataclass
+class InitResult:
+    """
+    Outcome of a single InitTask
+
+    Args:
+        name: Name of the task
+        success: Whether the task completed
+        duration: Total wall time spent on the task in seconds, across all attempts
+        attempts: Number of attempts made
+        error: The last error raised, if the task failed
+    """
+    name: str
+    success: bool
+    duration: seconds
+    attempts: int
+    error: Optional[BaseException] = field(default=None, repr=False)
+
+
+class InitOrchestrator:
+    """
+    Runs device init/config work concurrently on a bounded thread pool.
+
+    Independent devices are brought up in parallel, so boot time tracks the slowest device instead of the sum of
+    all devices. Tasks with dependencies (for example motor group followers, which must wait for their leader)
+    only start once every dependency has finished.
+
+    Example usage:
+        orchestrator = InitOrchestrator(max_workers=8)
+        orchestrator.add_device("intake", intake_motor)
+        orchestrator.add_group("elevator", elevator_group)
+        orchestrator.run()
+    """
+
+    def __init__(self, max_workers: int = 8, default_timeout: Optional[seconds] = 5,
+                 default_retries: int = 1):
+        """
+        Args:
+            max_workers (int, optional): Maximum number of devices initialized at once. Defaults to 8.
+            default_timeout (seconds, optional): Per-attempt timeout used when a task does not specify one.
+                Defaults to 5.
+            default_retries (int, optional): Retry count used when a task does not specify one. Defaults to 1.
+        """
+        self.max_workers = max_workers
+        self.default_timeout = default_timeout
+        self.default_retries = default_retries
+        self.tasks: dict[str, InitTask] = {}
+        self.results: dict[str, InitResult] = {}
+
+    def add(self, name: str, fn: Callable[[], None], depends_on: tuple[str, ...] = (),
+            timeout: Optional[seconds] = None, retries: Optional[int] = None) -> InitTask:
+        """
+        Register a callable as an init task.
+
+        Args:
+            name (str): Unique name of the task
+            fn (Callable[[], None]): Init/config work to run
+            depends_on (tuple[str, ...], optional): Names of tasks that must finish first
+            timeout (seconds, optional): Per-attempt timeout. Defaults to the orchestrator default.
+            retries (int, optional): Extra attempts if the task raises. Defaults to the orchestrator default.
+
+        Returns:
+            InitTask: The registered task
+        """
+        if name in self.tasks:
+            raise ValueError(f"Init task '{name}' is already registered")
+        task = InitTask(
+            name,
+            fn,
+            tuple(depends_on),
+            self.default_timeout if timeout is None else timeout,
+            self.default_retries if retries is None else retries
+        )
+        self.tasks[name] = task
+        return task
+
+    def add_device(self, name: str, device, *args, depends_on: tuple[str, ...] = (),
+                   timeout: Optional[seconds] = None, retries: Optional[int] = None) -> InitTask:
+        """
+        Register a device whose init() method should be run by the orchestrator.
+
+        Args:
+            name (str): Unique name of the device
+            device: Any object with an init() method (motor, gyro, swerve node, ...)
+            *args: Extra arguments passed to device.init (for example a gyro start angle)
+            depends_on (tuple[str, ...], optional): Names of tasks that must finish first
+
+        Returns:
+            InitTask: The registered task
+        """
+        return self.add(name, lambda: device.init(*args), depends_on, timeout, retries)
+
+    def add_group(self, name: str, group, timeout: Optional[seconds] = None,
+                  retries: Optional[int] = None) -> list[InitTask]:
+        """
+        Register a motor group (e.g. TalonGroup, SparkMaxGroup). The leader is initialized first, then every follower
+        is initialized concurrently and set to follow the leader.
+
+        Args:
+            name (str): Name prefix for the group's tasks
+            group (MotorGroup): The motor group
+
+        Returns:
+            list[InitTask]: The registered tasks, leader first
+        """
+        leader_name = f"{name}[{group._leader_idx}]"
+        tasks = [self.add(leader_name, group._init_leader, timeout=timeout, retries=retries)]
+
+        for idx, motor in enumerate(group.motors):
+            if idx == group._leader_idx:
+                continue
+            tasks.append(self.add(
+                f"{name}[{idx}]",
+                functools.partial(group._init_follower, motor),
+                depends_on=(leader_name,),
+                timeout=timeout,
+                retries=retries
+            ))
+
+        return tasks
+
+    def run(self, raise_on_failure: bool = True) -> dict[str, InitResult]:
+        """
+        Run every registered task, respecting dependencies, and log a timing report.
+
+        Args:
+            raise_on_failure (bool, optional): Raise a RuntimeError after all tasks finish if any failed.
+                Defaults to True.
+
+        Returns:
+            dict[str, InitResult]: Results keyed by task name
+        """
+        self._check_dependencies()
+
+        start = time.perf_counter()
+        self.results = {}
+        waiting = dict(self.tasks)
+        running: dict[Future, _Attempt] = {}
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="init")
+        try:
+            while waiting or running:
+                for task in list(waiting.values()):
+                    if not all(dep in self.results for dep in task.depends_on):
+                        continue
+                    del waiting[task.name]
+                    failed_deps = [dep for dep in task.depends_on if not self.results[dep].success]
+                    if failed_deps:
+                        self.results[task.name] = InitResult(
+                            task.name, False, 0, 0, RuntimeError(f"dependencies failed: {', '.join(failed_deps)}")
+                        )
+                    else:
+                        attempt = _Attempt(task, 1, time.perf_counter())
+                        running[pool.submit(attempt.run)] = attempt
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, timeout=self._next_deadline(running), return_when=FIRST_COMPLETED)
+                now = time.perf_counter()
+
+                for future in list(running):
+                    attempt = running[future]
+                    timed_out = False
+                    if future in done:
+                        error = future.exception()
+                    elif attempt.timed_out(now):
+                        # Vendor calls cannot be interrupted, so the attempt is abandoned and left to finish in the
+                        # background. It is not retried: a retry would configure the device concurrently with it.
+                        error = TimeoutError(f"timed out after {attempt.task.timeout}s")
+                        timed_out = True
+                    else:
+                        continue
+
+                    del running[future]
+                    if error is None:
+                        self.results[attempt.task.name] = InitResult(
+                            attempt.task.name, True, now - attempt.first_start, attempt.number
+                        )
+                        continue
+
+                    logger.warning(f"{attempt.task.name} attempt {attempt.number} failed: {error}", "[init]")
+                    if attempt.number <= attempt.task.retries and not timed_out:
+                        retry = _Attempt(attempt.task, attempt.number + 1, attempt.first_start)
+                        running[pool.submit(retry.run)] = retry
+                    else:
+                        self.results[attempt.task.name] = InitResult(
+                            attempt.task.name, False, now - attempt.first_start, attempt.number, error
+                        )
+        finally:
+            pool.shutdown(wait=False)
+
+        self._report(time.perf_counter() - start)
+
+        failed = [result for result in self.results.values() if not result.success]
+        if failed and raise_on_failure:
+            raise RuntimeError(f"Device init failed for: {', '.join(result.name for result in failed)}")
+
+        return self.results
+
+    def _check_dependencies(self):
+        for task in self.tasks.values():
+            for dep in task.depends_on:
+                if dep not in self.tasks:
+                    raise ValueError(f"Init task '{task.name}' depends on unknown task '{dep}'")
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Circular init dependency involving '{name}'")
+            visiting.add(name)
+            for dep in self.tasks[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for task_name in self.tasks:
+            visit(task_name)
+
+    @staticmethod
+    def _next_deadline(running: dict[Future, "_Attempt"]) -> Optional[seconds]:
+        now = time.perf_counter()
+        deadlines = [
+            attempt.started + attempt.task.timeout - now
+            for attempt in running.values()
+            if attempt.started is not None and attempt.task.timeout is not None
+        ]
+        # Attempts still queued behind busy workers have no deadline yet, so poll until they start.
+        if any(attempt.started is None for attempt in running.values()):
+            deadlines.append(0.01)
+        return max(min(deadlines), 0) if deadlines else None
+
+    def _report(self, total: seconds):
+        serial = sum(result.duration for result in self.results.values())
+        for result in sorted(self.results.values(), key=lambda r: r.duration, reverse=True):
+            status = "ok" if result.success else f"FAILED ({result.error})"
+            logger.info(
+                f"{result.name: <24} {result.duration * 1000:8.1f} ms  attempts={result.attempts}  {status}",
+                "[init]"
+            )
+        logger.info(f"device init finished in {total * 1000:.1f} ms (serial sum {serial * 1000:.1f} ms)", "[init]")
+
+
+class _Attempt:
+    def __init__(self, task: InitTask, number: int, first_start: float):
+        self.task = task
+        self.number = number
+        self.first_start = first_start
+        self.started: Optional[float] = None
+
+    def run(self):
+        self.started = time.perf_counter()
+        self.task.fn()
+
+    def timed_out(self, now: float) -> bool:
+        return self.task.timeout is not None and self.started is not None and now - self.started > self.task.timeout